@@ -4,8 +4,26 @@ Base Agent - Foundation for all NimaCare agents
 
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
-import google.generativeai as genai
-import os
+import asyncio
+import functools
+import time
+
+from . import deadline
+from . import events
+from . import keywords
+from . import memory
+from . import model_registry
+from . import prompt_builder
+from . import response_cache
+from . import single_flight
+from .circuit_breaker import CircuitOpenError, get_breaker
+from .prompt_builder import PromptBuilder, PromptSection
+from .rate_limiter import Priority, gemini_limiter
+from .tokens import estimate_tokens
+
+
+# Tier decisions kept per session in agent_data["model_tier_decisions"]
+MAX_TIER_DECISIONS = 20
 
 
 class AgentMessage(BaseModel):
@@ -20,6 +38,7 @@ class AgentState(BaseModel):
     agent_data: Dict[str, Any] = {}
     user_id: Optional[str] = None
     current_agent: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 class BaseAgent:
@@ -29,6 +48,23 @@ class BaseAgent:
     Each agent uses Gemini models and maintains conversation state.
     """
 
+    # Opt in to the shared response cache (see response_cache). Only worth
+    # it for low-temperature agents whose prompts repeat across sessions.
+    cache_responses: bool = False
+    # Trailing messages that count towards the cache key
+    cache_history_window: int = 4
+    # Estimated tokens a prompt may use (see build_prompt)
+    prompt_token_budget: int = 3000
+    # Admission class for this agent's model calls (see rate_limiter)
+    priority: Priority = Priority.CONVERSATION
+    # Calls may move to a faster model under load (see model_registry.route).
+    # Off by default: agents are pinned to their configured model.
+    adaptive_tier: bool = False
+    # JSON schema the model's output must follow (None = free text)
+    response_schema: Optional[Dict[str, Any]] = None
+    # Closing line of every prompt
+    response_instruction: str = "Respond as the assistant (keep it concise, 2-3 sentences):"
+
     def __init__(
         self,
         agent_name: str,
@@ -41,17 +77,9 @@ class BaseAgent:
         self.temperature = temperature
         self.max_tokens = max_tokens
 
-        # Configure Gemini with API key only (no service account)
-        # Explicitly remove service account credentials to avoid SSL issues
-        if "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
-            del os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
-
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel(model_name)
-        else:
-            self.model = None
+        # Shared, process-wide model (see model_registry)
+        self.model = model_registry.get_model(model_name, temperature, max_tokens, self.response_schema)
+        if self.model is None:
             print(f"⚠️  {agent_name}: No API key - running in demo mode")
 
     def get_system_prompt(self) -> str:
@@ -70,9 +98,176 @@ class BaseAgent:
                 return msg.content
         return None
 
+    def resolve_system_prompt(self, state: AgentState) -> str:
+        """System prompt for this turn - pass state for context-aware prompts"""
+        try:
+            return self.get_system_prompt(state)
+        except TypeError:
+            # Fallback for agents that don't accept state parameter yet
+            return self.get_system_prompt()
+
+    def build_prompt(
+        self,
+        state: AgentState,
+        context: Optional[str] = None,
+        retrieved: Optional[List[str]] = None
+    ) -> str:
+        """
+        Build the full prompt sent to Gemini for this turn.
+
+        Sections are trimmed lowest priority first to fit
+        prompt_token_budget (see agents.prompt_builder): the oldest history,
+        then retrieved data, then the summary, then agent context.
+        The system prompt and closing instruction are always kept.
+
+        Args:
+            state: Current conversation state
+            context: Agent instructions for this specific response
+            retrieved: Data entries (therapists, groups) the response draws on
+        """
+        # Older turns come from the rolling summary (see agents.memory)
+        summary, recent = memory.history_for_prompt(state)
+
+        builder = PromptBuilder(budget=self.prompt_token_budget)
+        builder.add(PromptSection("system", [self.resolve_system_prompt(state)], required=True))
+        builder.add(PromptSection("context", [context or ""], priority=80))
+        builder.add(PromptSection("retrieved", retrieved or [], priority=50))
+        builder.add(PromptSection(
+            "summary", [summary], priority=60,
+            heading="Summary of the earlier conversation:"
+        ))
+        builder.add(PromptSection(
+            "history", [f"{msg.role}: {msg.content}" for msg in recent], priority=40,
+            drop_from="start", heading="Conversation history:"
+        ))
+        builder.add(PromptSection("instruction", [self.response_instruction], required=True))
+
+        prompt, report = builder.build()
+        prompt_builder.record(self.agent_name, report)
+        if report["trimmed"]:
+            print(
+                f"✂️  {self.agent_name}: prompt trimmed to ~{report['estimated_tokens']} tokens "
+                f"(requested {report['requested_tokens']}, trimmed: {', '.join(report['trimmed'])})"
+            )
+        return prompt
+
+    def get_fallback_response(self, state: AgentState) -> str:
+        """Context-aware fallback used when Gemini blocks a response"""
+        turn_count = len([m for m in state.messages if m.role == "user"])
+        user_message = self.get_last_user_message(state) or ""
+
+        # Detect topic areas
+        topics = keywords.scan(user_message)
+        is_career = "topic:career" in topics
+        is_relationship = "topic:relationship" in topics
+        is_anxiety = "topic:anxiety" in topics
+        is_depression = "topic:depression" in topics
+
+        # First response - always warm greeting
+        if turn_count == 1:
+            return "Hi there. I'm Nima, and I'm here to listen. How are you feeling right now, and what brings you here today?"
+
+        # Second response - acknowledge and explore
+        if turn_count == 2:
+            if is_career:
+                return "Work challenges can feel overwhelming, especially when they're affecting your well-being. Can you tell me more about what's been happening? What aspects of your work situation feel most difficult right now?"
+            elif is_relationship:
+                return "Relationship struggles can be really hard to navigate. I hear that this is weighing on you. What's been going on that made you decide to reach out today?"
+            elif is_anxiety:
+                return "Anxiety can be exhausting to deal with. Thank you for trusting me with this. Can you share more about when you tend to feel most anxious, or what situations trigger it for you?"
+            elif is_depression:
+                return "I'm glad you're here. Depression can make everything feel heavier. How long have you been feeling this way, and what does a typical day look like for you right now?"
+            else:
+                return "I appreciate you opening up about what you're going through. That takes courage. Can you tell me more about what's been weighing on you lately?"
+
+        # Third response - go deeper
+        if turn_count == 3:
+            if is_career:
+                return "It sounds like work has been taking a real toll on you. When you think about your career situation, what feels most urgent or concerning? Is it the day-to-day stress, or is it more about the bigger picture of where you're headed?"
+            elif is_anxiety or is_depression:
+                return "What you're experiencing sounds really challenging. Have these feelings been building up gradually, or was there a particular moment when things felt like they shifted? And how is this affecting other parts of your life?"
+            else:
+                return "I'm hearing that this is really affecting you. What would it look like if things were better? What are you hoping could change?"
+
+        # Fourth+ response - transition to counselor
+        return "Thank you for sharing all of this with me. It's clear you're dealing with something significant, and I think connecting with a professional counselor could really help. Would you like me to match you with someone who specializes in what you're going through?"
+
+    def get_error_fallback(self, state: AgentState) -> str:
+        """Context-aware fallback used when the Gemini call itself fails"""
+        turn_count = len([m for m in state.messages if m.role == "user"])
+        last_user_msg = self.get_last_user_message(state) or ""
+
+        # Context-aware fallback responses
+        topics = keywords.scan(last_user_msg)
+        is_career = "topic:career" in topics
+        is_anxiety = "topic:anxiety" in topics
+        is_depression = "topic:depression" in topics
+
+        if turn_count == 1:
+            return "Hi there. I'm Nima, and I'm here to listen. How are you feeling right now, and what brings you here today?"
+        elif turn_count == 2:
+            if is_career:
+                return "Work challenges can feel overwhelming, especially when they're affecting your well-being. Can you tell me more about what's been happening? What aspects of your work situation feel most difficult right now?"
+            elif is_anxiety or is_depression:
+                return "I'm glad you're here. What you're describing sounds really difficult. Can you tell me more about what you've been experiencing?"
+            else:
+                return "I appreciate you opening up about what you're going through. That takes courage. Can you tell me more about what's been weighing on you lately?"
+        else:
+            return "Thank you for sharing all of this with me. It's clear you're dealing with something significant, and I think connecting with a professional counselor could really help. Would you like me to match you with someone who specializes in what you're going through?"
+
+    def _is_fallback_text(self, state: AgentState, output: str) -> bool:
+        """Whether output is one of the fallbacks rather than model text"""
+        return output in (self.get_error_fallback(state), self.get_fallback_response(state))
+
+    def _response_text(self, response) -> Optional[str]:
+        """Pull the text out of a Gemini response (None if it was blocked)"""
+        # Check if response was blocked
+        if not response.candidates:
+            print(f"❌ {self.agent_name}: No candidates returned")
+            print(f"   Safety ratings: {response.prompt_feedback}")
+            return None
+
+        candidate = response.candidates[0]
+        if not candidate.content or not candidate.content.parts:
+            print(f"❌ {self.agent_name}: Content blocked")
+            print(f"   Finish reason: {candidate.finish_reason}")
+            print(f"   Safety ratings: {candidate.safety_ratings}")
+            return None
+
+        return response.text.strip()
+
+    def _extract_text(self, response, state: AgentState) -> str:
+        """Pull the text out of a Gemini response, falling back if it was blocked"""
+        return self._response_text(response) or self.get_fallback_response(state)
+
+    def _cache_key(
+        self,
+        state: AgentState,
+        context: Optional[str],
+        retrieved: Optional[List[str]] = None,
+        model_name: Optional[str] = None
+    ) -> Optional[str]:
+        """Response cache key for this call, or None if it must not be cached"""
+        if not self.cache_responses or not response_cache.is_enabled():
+            return None
+        if not response_cache.allows_caching(state.agent_data):
+            response_cache.record_bypass()
+            return None
+
+        window = state.messages[-self.cache_history_window:] if self.cache_history_window else []
+        return response_cache.make_key(
+            [self.agent_name, model_name or self.model_name, self.temperature, self.max_tokens],
+            self.resolve_system_prompt(state),
+            "\n".join([context or ""] + (retrieved or [])),
+            [msg.dict() for msg in window]
+        )
+
     def generate_response(self, state: AgentState, context: Optional[str] = None) -> str:
         """
-        Generate response using Gemini.
+        Generate response using Gemini (blocking).
+
+        Prefer agenerate_response() from async code - this variant holds the
+        event loop for the whole round trip.
 
         Args:
             state: Current conversation state
@@ -84,139 +279,272 @@ class BaseAgent:
         if not self.model:
             return f"[{self.agent_name} - Demo mode: API not configured]"
 
-        # Build prompt - pass state for context-aware system prompts
+        full_prompt = self.build_prompt(state, context)
+
         try:
-            system_prompt = self.get_system_prompt(state)
-        except TypeError:
-            # Fallback for agents that don't accept state parameter yet
-            system_prompt = self.get_system_prompt()
+            response = self.model.generate_content(full_prompt)
+            return self._extract_text(response, state)
+
+        except Exception as e:
+            print(f"❌ {self.agent_name} generation error: {e}")
+            # Use context-aware fallback on exception
+            return self.get_error_fallback(state)
+
+    async def agenerate_response(
+        self,
+        state: AgentState,
+        context: Optional[str] = None,
+        stream: bool = True,
+        retrieved: Optional[List[str]] = None,
+        priority: Optional[Priority] = None,
+        allow_downgrade: Optional[bool] = None
+    ) -> str:
+        """
+        Generate response using Gemini without blocking the event loop.
 
-        # Add conversation history
-        conversation = []
-        for msg in state.messages:
-            conversation.append(f"{msg.role}: {msg.content}")
+        The model call is awaited, so other sessions keep being served while
+        Gemini works. Cancelling the calling task (e.g. when the client
+        disconnects) cancels the in-flight request.
 
-        conversation_text = "\n".join(conversation)
+        When a streaming client is listening (see agents.events), tokens are
+        forwarded as "token" events as soon as Gemini produces them.
 
-        # Build full prompt
-        full_prompt = f"""{system_prompt}
+        Agents with cache_responses set reuse earlier output for an
+        equivalent prompt (see agents.response_cache).
 
-{context if context else ''}
+        The call is bounded by the request deadline (see agents.deadline);
+        past it, or while the model's circuit breaker is open (see
+        agents.circuit_breaker), the error fallback is returned straight away.
 
-Conversation history:
-{conversation_text}
+        Args:
+            state: Current conversation state
+            context: Additional context for this specific response
+            stream: Set False for output that isn't meant to be shown
+                verbatim (e.g. structured assessments)
+            retrieved: Data entries the response draws on; trimmed first
+                when the prompt is over budget
+            priority: Admission class for this call (default: the agent's)
+            allow_downgrade: Whether this call may run on a faster tier under
+                load (default: the agent's adaptive_tier)
 
-Respond as the assistant (keep it concise, 2-3 sentences):"""
+        Returns:
+            Generated response text
+        """
+        if not self.model:
+            return f"[{self.agent_name} - Demo mode: API not configured]"
+
+        streaming = stream and events.has_listener()
+
+        model_name, model = self.model_name, self.model
+        if self.adaptive_tier if allow_downgrade is None else allow_downgrade:
+            model_name, model = self._route_model(state)
+
+        cache_key = self._cache_key(state, context, retrieved, model_name)
+        if cache_key:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                if streaming:
+                    events.emit("token", {"agent": self.agent_name, "text": cached})
+                return cached
+
+        full_prompt = self.build_prompt(state, context, retrieved)
 
         # Debug logging disabled for production
         # Uncomment below to debug prompts
         # print(f"\n📝 {self.agent_name} Prompt: {full_prompt[:100]}...")
 
+        generate = functools.partial(
+            self._generate,
+            model_name,
+            model,
+            full_prompt,
+            streaming,
+            self.priority if priority is None else priority
+        )
+
         try:
-            # Configure safety settings for mental health content
-            # Allow mental health discussions while maintaining safety
-            from google.generativeai.types import HarmCategory, HarmBlockThreshold
-
-            safety_settings = {
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            }
-
-            # Generate with Gemini
-            response = self.model.generate_content(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens,
-                ),
-                safety_settings=safety_settings
-            )
+            # Bounded by the request's deadline (see agents.deadline)
+            if cache_key:
+                # A cacheable prompt that is already in flight (same
+                # greeting in several sessions before the first answer is
+                # cached) shares that call instead of starting another
+                text, shared = await asyncio.wait_for(
+                    single_flight.generations.do(cache_key, generate),
+                    timeout=deadline.remaining()
+                )
+            else:
+                text, shared = await asyncio.wait_for(generate(), timeout=deadline.remaining()), False
+            if shared and streaming and text:
+                # Tokens went to the first caller's stream
+                events.emit("token", {"agent": self.agent_name, "text": text})
 
-            # Context-aware fallback responses that reference what user said
-            def get_fallback(turn_count, user_message=""):
-                # Extract key topics from user message
-                user_lower = user_message.lower() if user_message else ""
-
-                # Detect topic areas
-                is_career = any(word in user_lower for word in ["work", "job", "career", "burnout", "boss"])
-                is_relationship = any(word in user_lower for word in ["relationship", "partner", "spouse", "marriage", "family"])
-                is_anxiety = any(word in user_lower for word in ["anxious", "anxiety", "panic", "worried", "stress"])
-                is_depression = any(word in user_lower for word in ["depressed", "depression", "sad", "hopeless", "empty"])
-
-                # First response - always warm greeting
-                if turn_count == 1:
-                    return "Hi there. I'm Nima, and I'm here to listen. How are you feeling right now, and what brings you here today?"
-
-                # Second response - acknowledge and explore
-                if turn_count == 2:
-                    if is_career:
-                        return "Work challenges can feel overwhelming, especially when they're affecting your well-being. Can you tell me more about what's been happening? What aspects of your work situation feel most difficult right now?"
-                    elif is_relationship:
-                        return "Relationship struggles can be really hard to navigate. I hear that this is weighing on you. What's been going on that made you decide to reach out today?"
-                    elif is_anxiety:
-                        return "Anxiety can be exhausting to deal with. Thank you for trusting me with this. Can you share more about when you tend to feel most anxious, or what situations trigger it for you?"
-                    elif is_depression:
-                        return "I'm glad you're here. Depression can make everything feel heavier. How long have you been feeling this way, and what does a typical day look like for you right now?"
-                    else:
-                        return "I appreciate you opening up about what you're going through. That takes courage. Can you tell me more about what's been weighing on you lately?"
-
-                # Third response - go deeper
-                if turn_count == 3:
-                    if is_career:
-                        return "It sounds like work has been taking a real toll on you. When you think about your career situation, what feels most urgent or concerning? Is it the day-to-day stress, or is it more about the bigger picture of where you're headed?"
-                    elif is_anxiety or is_depression:
-                        return "What you're experiencing sounds really challenging. Have these feelings been building up gradually, or was there a particular moment when things felt like they shifted? And how is this affecting other parts of your life?"
-                    else:
-                        return "I'm hearing that this is really affecting you. What would it look like if things were better? What are you hoping could change?"
-
-                # Fourth+ response - transition to counselor
-                return "Thank you for sharing all of this with me. It's clear you're dealing with something significant, and I think connecting with a professional counselor could really help. Would you like me to match you with someone who specializes in what you're going through?"
-
-            # Check if response was blocked
-            if not response.candidates:
-                print(f"❌ {self.agent_name}: No candidates returned")
-                print(f"   Safety ratings: {response.prompt_feedback}")
-                turn_count = len([m for m in state.messages if m.role == "user"])
-                last_user_msg = self.get_last_user_message(state) or ""
-                return get_fallback(turn_count, last_user_msg)
-
-            candidate = response.candidates[0]
-            if not candidate.content or not candidate.content.parts:
-                print(f"❌ {self.agent_name}: Content blocked")
-                print(f"   Finish reason: {candidate.finish_reason}")
-                print(f"   Safety ratings: {candidate.safety_ratings}")
-                turn_count = len([m for m in state.messages if m.role == "user"])
-                last_user_msg = self.get_last_user_message(state) or ""
-                return get_fallback(turn_count, last_user_msg)
-
-            return response.text.strip()
+        except asyncio.CancelledError:
+            # Client went away - let cancellation propagate to the caller
+            raise
+
+        except asyncio.TimeoutError:
+            print(f"⏱️  {self.agent_name}: request deadline reached - using fallback")
+            deadline.record_exceeded()
+            return self.get_error_fallback(state)
+
+        except CircuitOpenError:
+            # Model is degraded - answer now instead of waiting to fail
+            return self.get_error_fallback(state)
 
         except Exception as e:
             print(f"❌ {self.agent_name} generation error: {e}")
             # Use context-aware fallback on exception
-            turn_count = len([m for m in state.messages if m.role == "user"])
-            last_user_msg = self.get_last_user_message(state) or ""
-
-            # Context-aware fallback responses
-            user_lower = last_user_msg.lower() if last_user_msg else ""
-            is_career = any(word in user_lower for word in ["work", "job", "career", "burnout", "boss"])
-            is_relationship = any(word in user_lower for word in ["relationship", "partner", "spouse", "marriage", "family"])
-            is_anxiety = any(word in user_lower for word in ["anxious", "anxiety", "panic", "worried", "stress"])
-            is_depression = any(word in user_lower for word in ["depressed", "depression", "sad", "hopeless", "empty"])
-
-            if turn_count == 1:
-                return "Hi there. I'm Nima, and I'm here to listen. How are you feeling right now, and what brings you here today?"
-            elif turn_count == 2:
-                if is_career:
-                    return "Work challenges can feel overwhelming, especially when they're affecting your well-being. Can you tell me more about what's been happening? What aspects of your work situation feel most difficult right now?"
-                elif is_anxiety or is_depression:
-                    return "I'm glad you're here. What you're describing sounds really difficult. Can you tell me more about what you've been experiencing?"
-                else:
-                    return "I appreciate you opening up about what you're going through. That takes courage. Can you tell me more about what's been weighing on you lately?"
-            else:
-                return "Thank you for sharing all of this with me. It's clear you're dealing with something significant, and I think connecting with a professional counselor could really help. Would you like me to match you with someone who specializes in what you're going through?"
+            return self.get_error_fallback(state)
+
+        if not text:
+            return self.get_fallback_response(state)
+
+        if cache_key and self.is_cacheable(text):
+            response_cache.put(cache_key, text)
+        return text
+
+    def is_cacheable(self, text: str) -> bool:
+        """Whether a generated response may be stored in the response cache"""
+        return True
+
+    def _route_model(self, state: AgentState):
+        """Apply the registry's tiering policy and note the decision in the session"""
+        decision = model_registry.route(self.model_name)
+        decision["agent"] = self.agent_name
+        decision["turn"] = len([m for m in state.messages if m.role == "user"])
+
+        decisions = state.agent_data.setdefault("model_tier_decisions", [])
+        decisions.append(decision)
+        del decisions[:-MAX_TIER_DECISIONS]
+
+        if decision["model"] == self.model_name:
+            return self.model_name, self.model
+        model = model_registry.get_model(
+            decision["model"], self.temperature, self.max_tokens, self.response_schema
+        )
+        return decision["model"], model
+
+    async def _generate(
+        self,
+        model_name: str,
+        model,
+        full_prompt: str,
+        streaming: bool,
+        priority: Priority
+    ) -> Optional[str]:
+        """One Gemini call; None if the response was blocked or empty"""
+        # Charged against the shared quota: prompt plus the most it can return
+        tokens = estimate_tokens(full_prompt) + self.max_tokens
+
+        if streaming:
+            # Never hedged - tokens already shown can't be taken back - but
+            # its latency still feeds the p95 other calls hedge on
+            with get_breaker(model_name).call() as call:
+                async with gemini_limiter.admit(priority, tokens):
+                    call.start()
+                    started = time.monotonic()
+                    try:
+                        text = await self._stream_response(model, full_prompt)
+                    except asyncio.CancelledError:
+                        # Abandoned mid-stream: how long it ran is a lower bound
+                        model_registry.record_latency(model_name, time.monotonic() - started)
+                        raise
+                    model_registry.record_latency(model_name, time.monotonic() - started)
+                    return text
+
+        hedge = model_registry.hedge_for(
+            model_name, self.temperature, self.max_tokens, self.response_schema
+        )
+        if hedge is None:
+            return await self._call_model(model_name, model, full_prompt, priority, tokens)
+        return await self._hedged_call(model_name, model, full_prompt, priority, tokens, hedge)
+
+    async def _call_model(
+        self,
+        model_name: str,
+        model,
+        full_prompt: str,
+        priority: Priority,
+        tokens: int
+    ) -> Optional[str]:
+        """Guarded, admitted, timed, non-streamed call to one model"""
+        with get_breaker(model_name).call() as call:
+            async with gemini_limiter.admit(priority, tokens):
+                call.start()
+                started = time.monotonic()
+                response = await model.generate_content_async(full_prompt)
+                model_registry.record_latency(model_name, time.monotonic() - started)
+                return self._response_text(response)
+
+    async def _hedged_call(
+        self,
+        model_name: str,
+        model,
+        full_prompt: str,
+        priority: Priority,
+        tokens: int,
+        hedge
+    ) -> Optional[str]:
+        """
+        Call the primary model; if it outlives its p95 latency, also call the
+        hedge model and take whichever usable answer arrives first.
+        """
+        hedge_name, hedge_model, delay = hedge
+
+        launched = time.monotonic()
+        primary = asyncio.create_task(
+            self._call_model(model_name, model, full_prompt, priority, tokens)
+        )
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        print(f"🔀 {self.agent_name}: {model_name} slower than {delay:.1f}s - hedging with {hedge_name}")
+        secondary = asyncio.create_task(
+            self._call_model(hedge_name, hedge_model, full_prompt, priority, tokens)
+        )
+        try:
+            pending = {primary, secondary}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result():
+                        model_registry.record_hedge(won=task is secondary)
+                        return task.result()
+
+            # Neither produced usable text - report the primary's outcome
+            model_registry.record_hedge(won=False)
+            return primary.result()
+        finally:
+            if not primary.done():
+                # A primary that lost the race never reports its latency; record
+                # how long it had run so far, or its slowness would vanish from p95
+                model_registry.record_latency(model_name, time.monotonic() - launched)
+            for task in (primary, secondary):
+                if not task.done():
+                    task.cancel()
+
+    async def _stream_response(self, model, full_prompt: str) -> Optional[str]:
+        """Stream a completion, emitting each chunk as a token event"""
+        response = await model.generate_content_async(full_prompt, stream=True)
+
+        chunks = []
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunk carried no parts (e.g. blocked by safety filters)
+                continue
+            if text:
+                chunks.append(text)
+                events.emit("token", {"agent": self.agent_name, "text": text})
+
+        full_text = "".join(chunks).strip()
+        if not full_text:
+            print(f"❌ {self.agent_name}: Streamed response was empty or blocked")
+            return None
+
+        return full_text
 
     async def process(self, state: AgentState) -> AgentState:
         """
@@ -0,0 +1,208 @@
+"""
+Circuit Breaker - Fail fast while a Gemini model is degraded
+============================================================
+
+One breaker per model name watches the outcome of its last calls:
+- closed: calls go through; once at least CIRCUIT_MIN_CALLS are recorded
+  and the share of errors or slow calls (over CIRCUIT_SLOW_CALL_SECONDS)
+  reaches CIRCUIT_FAILURE_RATE, the breaker opens
+- open: calls are refused with CircuitOpenError straight away, so agents
+  answer with their deterministic fallback instead of waiting on a
+  timeout; after CIRCUIT_OPEN_SECONDS the breaker goes half-open
+- half-open: a single trial call is let through; success closes the
+  breaker, failure (or another slow call) opens it again
+
+CIRCUIT_MIN_CALLS: calls needed before the breaker can trip (default: 10)
+CIRCUIT_FAILURE_RATE: error/slow share that trips it (default: 0.5)
+CIRCUIT_SLOW_CALL_SECONDS: calls slower than this count as failures (default: 20)
+CIRCUIT_OPEN_SECONDS: time before a trial call is allowed (default: 30)
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Optional
+import asyncio
+import os
+import time
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+WINDOW_SIZE = 20
+
+
+class CircuitOpenError(Exception):
+    """The model's breaker is open - don't call it"""
+
+
+class _Call:
+    """Outcome tracking for one call admitted by a breaker"""
+
+    __slots__ = ("started",)
+
+    def __init__(self):
+        self.started: Optional[float] = None
+
+    def start(self) -> None:
+        """Mark when the model request actually went out (after any queueing)"""
+        self.started = time.monotonic()
+
+
+class CircuitBreaker:
+    """Error- and latency-rate breaker for one model"""
+
+    def __init__(
+        self,
+        name: str,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.clock = clock
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        # True = call failed or was slow
+        self._outcomes: Deque[bool] = deque(maxlen=WINDOW_SIZE)
+
+        # Metrics
+        self.times_opened = 0
+        self.short_circuited = 0
+        self.failures = 0
+        self.slow_calls = 0
+
+    @contextmanager
+    def call(self):
+        """
+        Guard one model call.
+
+        Usage:
+            with breaker.call() as call:
+                async with limiter.admit(...):
+                    call.start()
+                    response = await model.generate_content_async(prompt)
+
+        Raises:
+            CircuitOpenError: If the breaker refuses the call
+        """
+        trial = self._acquire()
+        call = _Call()
+        try:
+            yield call
+        except asyncio.CancelledError:
+            # Abandoned (client gone, deadline hit). Only a call that already
+            # outlived the slow threshold says anything about the model.
+            elapsed = None if call.started is None else time.monotonic() - call.started
+            if elapsed is not None and elapsed >= self.slow_call_seconds:
+                self._record(failed=True, slow=True)
+            elif trial:
+                self._trial_in_flight = False
+            raise
+        except Exception:
+            if call.started is None:
+                # Never reached the model
+                if trial:
+                    self._trial_in_flight = False
+                raise
+            self._record(failed=True)
+            raise
+        else:
+            elapsed = time.monotonic() - call.started if call.started is not None else 0.0
+            slow = elapsed >= self.slow_call_seconds
+            self._record(failed=slow, slow=slow)
+
+    def _acquire(self) -> bool:
+        """Admit or refuse a call; returns True if it is the half-open trial"""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+
+        if self.state == CLOSED:
+            return False
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+
+        self.short_circuited += 1
+        raise CircuitOpenError(f"Circuit for {self.name} is open")
+
+    def _record(self, failed: bool, slow: bool = False) -> None:
+        if slow:
+            self.slow_calls += 1
+        elif failed:
+            self.failures += 1
+
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+            if failed:
+                self._open()
+            else:
+                self.state = CLOSED
+                self._outcomes.clear()
+                print(f"✅ Circuit for {self.name} closed again")
+            return
+
+        self._outcomes.append(failed)
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+            if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.times_opened += 1
+        self._outcomes.clear()
+        print(f"⚡ Circuit for {self.name} opened - using fallbacks for {self.open_seconds:.0f}s")
+
+    def current_state(self) -> str:
+        """State as callers will see it (open turns half-open after the cool-down)"""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.open_seconds:
+            return HALF_OPEN
+        return self.state
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.current_state(),
+            "recent_calls": len(self._outcomes),
+            "recent_failure_rate": round(sum(self._outcomes) / len(self._outcomes), 3)
+            if self._outcomes else 0.0,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model_name: str) -> CircuitBreaker:
+    """Breaker for a model, created on first use"""
+    breaker = _breakers.get(model_name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            model_name,
+            min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "10")),
+            failure_rate=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "20")),
+            open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+        )
+        _breakers[model_name] = breaker
+    return breaker
+
+
+def any_open() -> bool:
+    return any(breaker.current_state() != CLOSED for breaker in _breakers.values())
+
+
+def stats() -> Dict[str, Any]:
+    return {name: breaker.stats() for name, breaker in _breakers.items()}
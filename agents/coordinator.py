@@ -8,17 +8,56 @@ This agent orchestrates the workflow between all agents:
 3. Maintains conversation flow
 4. Ensures smooth handoffs
 
+Stages, their order and re-entry transitions are a declarative table in
+agents.workflow; the coordinator maps each stage to its agent's handler.
+
+Crisis fast lane: a crisis signal - force_crisis set by any agent, or crisis
+keywords / immediate-risk language in the newest message (agents.keywords,
+agents.risk_state) - preempts the sequential workflow (the table's wildcard
+transition) and hands the turn straight to the Crisis Agent, whose calls
+run at CRISIS priority with the limiter's crisis reserve. Time from
+picking up the message to the crisis response is tracked against
+CRISIS_SLO_SECONDS (default: 5). Once an assessment is in, keywords only
+preempt again if the risk screen puts the conversation above the assessed
+level.
+
+With CONCURRENT_CRISIS_SCREEN=true every intake turn also runs the Crisis
+Agent's background screen (local scorer, then the model if the scorer
+found risk language it can't settle) next to the intake reply. A HIGH or
+IMMEDIATE result hands over to the crisis stage in the same turn; either
+way the crisis stage uses the screen's assessment instead of calling the
+model again while no new risk evidence has arrived (default: false).
+
 Powered by: Gemini 2.0 Flash thinking mode (complex decision-making)
 """
 
-from typing import Optional
+from typing import Any, Dict, Optional, Set
+import asyncio
+import os
+import time
 from .base_agent import BaseAgent, AgentState
+from . import events
+from . import keywords
+from . import memory
+from . import risk_scorer
+from . import risk_state
+from . import speculation
+from .slo import LatencyHistogram
+from .workflow import WORKFLOW
 from .intake_agent import IntakeAgent
 from .privacy_agent import PrivacyAgent
-from .crisis_agent import CrisisAgent
+from .crisis_agent import SCREEN_KEY, CrisisAgent
 from .resource_agent import ResourceAgent
 from .scheduling_agent import SchedulingAgent
 from .habit_agent import HabitAgent
+from .support_group_agent import SupportGroupAgent
+
+
+CRISIS_SLO_SECONDS = float(os.getenv("CRISIS_SLO_SECONDS", "5"))
+
+CONCURRENT_CRISIS_SCREEN = os.getenv("CONCURRENT_CRISIS_SCREEN", "false").lower() == "true"
+# Background screen levels that hand over to the crisis stage right away
+SCREEN_ESCALATION_LEVELS = ("high", "immediate")
 
 
 class CoordinatorAgent(BaseAgent):
@@ -49,6 +88,26 @@ class CoordinatorAgent(BaseAgent):
         self.resource_agent = ResourceAgent()
         self.scheduling_agent = SchedulingAgent()
         self.habit_agent = HabitAgent()
+        # Not a workflow stage - lists groups for the scheduling stage ahead of time
+        self.support_group_agent = SupportGroupAgent()
+
+        # Stage -> handler (stages and their order live in agents.workflow)
+        self.handlers = {
+            "intake": self._intake_with_screen if CONCURRENT_CRISIS_SCREEN else self.intake_agent.process,
+            "privacy": self.privacy_agent.process,
+            "crisis": self.crisis_agent.process,
+            "resource": self.resource_agent.process,
+            "scheduling": self.scheduling_agent.process,
+            "habit": self.habit_agent.process,
+            "complete": self._complete,
+        }
+        missing = set(WORKFLOW.names) - set(self.handlers)
+        if missing:
+            raise ValueError(f"No handler for workflow stages: {sorted(missing)}")
+
+        # Crisis fast lane metrics
+        self.preemptions = {"flag": 0, "matcher": 0, "suppressed": 0}
+        self.crisis_latency = LatencyHistogram(CRISIS_SLO_SECONDS)
 
     def get_system_prompt(self) -> str:
         """System prompt for coordination"""
@@ -68,97 +127,115 @@ Make intelligent routing decisions based on conversation state."""
         """
         Orchestrate the multi-agent workflow.
         """
-        print("\n" + "="*60)
-        print("🎯 COORDINATOR: Determining next agent...")
-        print("="*60)
-
-        # Determine which agent should handle next
-        next_agent = self._determine_next_agent(state)
-
-        print(f"➡️  Routing to: {next_agent}")
-
-        # Route to appropriate agent
-        if next_agent == "intake":
-            state.current_agent = "intake"
-            state = await self.intake_agent.process(state)
-
-        elif next_agent == "privacy":
-            state.current_agent = "privacy"
-            state = await self.privacy_agent.process(state)
+        started = time.monotonic()
+
+        # Pick up the summary folded in the background after the last turn
+        memory.apply_pending(state)
+        # ...and the downstream results precomputed once the category was known
+        speculation.apply_pending(state)
+        # Score the new user message into the running risk state
+        risk_state.update(state)
+
+        # Determine which agent should handle next - a crisis signal jumps the queue
+        labels = keywords.scan(self.get_last_user_message(state))
+        signal = self._crisis_signal(state, labels)
+        if signal:
+            self._preempt(state, signal)
+        next_agent = WORKFLOW.resolve(state.agent_data, labels)
+
+        state = await self._dispatch(state, next_agent)
+        if signal:
+            self.crisis_latency.observe(time.monotonic() - started)
+
+        # An agent raised a crisis signal during its turn: hand over now
+        # rather than on the user's next message
+        elif state.agent_data.get("force_crisis"):
+            self._preempt(state, "flag")
+            state = await self._dispatch(state, WORKFLOW.resolve(state.agent_data))
+            self.crisis_latency.observe(time.monotonic() - started)
+
+        # Fold older turns into the summary while the user reads the reply
+        memory.schedule(state)
+        # Precompute the stages after the crisis assessment once its category is in
+        speculation.schedule(state, self._speculative_jobs(state))
 
-        elif next_agent == "crisis":
-            state.current_agent = "crisis"
-            state = await self.crisis_agent.process(state)
-
-        elif next_agent == "resource":
-            state.current_agent = "resource"
-            state = await self.resource_agent.process(state)
-
-        elif next_agent == "scheduling":
-            state.current_agent = "scheduling"
-            state = await self.scheduling_agent.process(state)
-
-        elif next_agent == "habit":
-            state.current_agent = "habit"
-            state = await self.habit_agent.process(state)
-
-        elif next_agent == "complete":
-            # Workflow complete
-            final_message = self._generate_completion_message(state)
-            state = self.add_message(state, "assistant", final_message)
-            state.agent_data["workflow_complete"] = True
+        return state
 
+    def _speculative_jobs(self, state: AgentState) -> Dict[str, speculation.Job]:
+        """Parts the session's upcoming stages can take from agents.speculation"""
+        data = state.agent_data
+        jobs: Dict[str, speculation.Job] = {}
+        if not data.get("therapists_presented"):
+            jobs["resource"] = self.resource_agent.precompute
+        if not data.get("scheduling_presented") and not data.get("scheduling_complete"):
+            jobs["groups"] = self.support_group_agent.precompute
+        if not data.get("habit_complete"):
+            jobs["habit"] = self.habit_agent.precompute
+        return jobs
+
+    async def _dispatch(self, state: AgentState, stage: str) -> AgentState:
+        events.emit("agent", {"agent": stage})
+        state.current_agent = stage
+        return await self.handlers[stage](state)
+
+    async def _intake_with_screen(self, state: AgentState) -> AgentState:
+        """Intake reply and the Crisis Agent's background screen, concurrently"""
+        # The screen reads a snapshot - the intake reply updates the live state
+        snapshot = state.model_copy(deep=True)
+        async with asyncio.TaskGroup() as group:
+            reply = group.create_task(self.intake_agent.process(state))
+            screen = group.create_task(self.crisis_agent.screen(snapshot))
+
+        state = reply.result()
+        result = screen.result()
+        if result:
+            state.agent_data[SCREEN_KEY] = result
+            if result["level"] in SCREEN_ESCALATION_LEVELS and not state.agent_data.get("crisis_complete"):
+                print(f"🚨 Background screen assessed {result['level'].upper()} during intake")
+                state.agent_data["force_crisis"] = True
         return state
 
-    def _determine_next_agent(self, state: AgentState) -> str:
-        """
-        Determine which agent should process next based on state.
+    async def _complete(self, state: AgentState) -> AgentState:
+        """Workflow complete"""
+        final_message = self._generate_completion_message(state)
+        state = self.add_message(state, "assistant", final_message)
+        state.agent_data["workflow_complete"] = True
+        return state
 
-        Flow: Intake → Privacy → Crisis → Resource → Scheduling (Support Groups) → Habit → Complete
-        """
-        # Check workflow flags
-        intake_complete = state.agent_data.get("intake_complete", False)
-        privacy_complete = state.agent_data.get("privacy_complete", False)
-        crisis_complete = state.agent_data.get("crisis_complete", False)
-        resource_complete = state.agent_data.get("resource_complete", False)
-        scheduling_complete = state.agent_data.get("scheduling_complete", False)
-        habit_complete = state.agent_data.get("habit_complete", False)
-
-        # Debug: Show completion status
-        print(f"📊 Workflow Status:")
-        print(f"   - Intake: {'✅ Complete' if intake_complete else '❌ Incomplete'}")
-        print(f"   - Privacy: {'✅ Complete' if privacy_complete else '❌ Incomplete'}")
-        print(f"   - Crisis: {'✅ Complete' if crisis_complete else '❌ Incomplete'}")
-        print(f"   - Resource: {'✅ Complete' if resource_complete else '❌ Incomplete'}")
-        print(f"   - Scheduling (Support Groups): {'✅ Complete' if scheduling_complete else '❌ Incomplete'}")
-        print(f"   - Habit: {'✅ Complete' if habit_complete else '❌ Incomplete'}")
-
-        # Sequential workflow: Intake → Privacy → Crisis → Resource → Scheduling → Habit → Complete
-        if not intake_complete:
-            return "intake"
-
-        if not privacy_complete:
-            return "privacy"
-
-        if not crisis_complete:
-            return "crisis"
-
-        # After crisis assessment, show counselor options
-        # (Crisis agent suggests a category, Resource agent filters by it)
-        if not resource_complete:
-            return "resource"
-
-        # After selecting counselor, show support group signup
-        if not scheduling_complete:
-            return "scheduling"
-
-        # After support group signup, setup habit tracker
-        # (Habit agent creates personalized habits and redirects to tracker)
-        if not habit_complete:
-            return "habit"
-
-        # All done - user has counselor, support group, and habit tracker
-        return "complete"
+    def _crisis_signal(self, state: AgentState, labels: Set[str]) -> Optional[str]:
+        """Source of a pending crisis signal ("flag" or "matcher"), if any"""
+        if state.agent_data.get("force_crisis"):
+            return "flag"
+        # Crisis keywords or immediate-risk language in the message just received
+        if "crisis" in labels or risk_state.seen_within(state.agent_data, ("immediate",), 1):
+            assessed = state.agent_data.get("crisis_level")
+            if assessed is None or self._signal_level(state) > risk_scorer.level_index(assessed):
+                return "matcher"
+            # Already assessed at this level or above: reopening would throw
+            # away the user's progress (e.g. "my brother died by suicide")
+            self.preemptions["suppressed"] += 1
+        return None
+
+    def _signal_level(self, state: AgentState) -> int:
+        """Level the conversation indicates now (IMMEDIATE without a risk model)"""
+        features = risk_state.features(state.agent_data)
+        if not risk_scorer.ENABLED or features is None:
+            return risk_scorer.level_index("immediate")
+        return risk_scorer.level_index(risk_scorer.get_model().decide(features).level)
+
+    def _preempt(self, state: AgentState, source: str) -> None:
+        """Send the session to a fresh crisis assessment (see WORKFLOW's transitions)"""
+        self.preemptions[source] += 1
+        print(f"🚨 Crisis fast lane ({source}) - routing straight to crisis assessment")
+        state.agent_data["crisis_preempted"] = True
+        # The crisis assessment takes over from intake, as IntakeAgent does
+        state.agent_data["intake_complete"] = True
+
+    def fast_lane_stats(self) -> Dict[str, Any]:
+        return {
+            "preemptions": dict(self.preemptions),
+            "latency": self.crisis_latency.stats(),
+        }
 
     def _generate_completion_message(self, state: AgentState) -> str:
         """
@@ -10,9 +10,17 @@ This agent uses Reason + Act (ReAct) pattern to:
 Powered by: Gemini 2.0 Flash (fast, accurate crisis detection)
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from enum import Enum
+import asyncio
+import json
+import time
+from pydantic import BaseModel, ValidationError
 from .base_agent import BaseAgent, AgentState
+from . import keywords
+from . import risk_scorer
+from . import risk_state
+from .rate_limiter import Priority
 
 
 class CrisisLevel(str, Enum):
@@ -37,6 +45,70 @@ class CounselorCategory(str, Enum):
     GENERAL = "general"
 
 
+class CrisisAssessment(BaseModel):
+    """Structured output of the crisis assessment call"""
+    level: CrisisLevel
+    category: CounselorCategory
+    reasoning: str
+    response: str
+
+
+# Gemini response_schema for CrisisAssessment (OpenAPI subset, enums inline)
+CRISIS_ASSESSMENT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "level": {"type": "string", "enum": [level.value for level in CrisisLevel]},
+        "category": {"type": "string", "enum": [cat.value for cat in CounselorCategory]},
+        "reasoning": {"type": "string", "description": "1 sentence why this category fits"},
+        "response": {
+            "type": "string",
+            "description": "2-3 sentences providing support and explaining the suggestion"
+        },
+    },
+    "required": ["level", "category", "reasoning", "response"],
+}
+
+# Used when neither the assessment nor its repair could be parsed: assume a
+# therapist is needed rather than silently treating it as no risk
+UNPARSED_ASSESSMENT = CrisisAssessment(
+    level=CrisisLevel.MODERATE,
+    category=CounselorCategory.GENERAL,
+    reasoning="Assessment output could not be parsed",
+    response=(
+        "Thank you for sharing this with me. What you're going through matters, "
+        "and talking with a professional counselor could really help."
+    )
+)
+
+# The conversation is in the prompt's history section and the accumulated
+# risk evidence in the system prompt - neither is replayed here
+ASSESSMENT_CONTEXT = (
+    "Assess the crisis level and suggest appropriate counselor category "
+    "based on the conversation below."
+)
+
+# Background screen of intake turns (see screen())
+SCREEN_KEY = "crisis_screen"
+
+# Responses for assessments settled or raised by the local risk screen
+LOCAL_RESPONSES = {
+    CrisisLevel.IMMEDIATE: (
+        "I'm really concerned about your safety, and I'm glad you told me. "
+        "You don't have to face this alone - please reach out to one of these services right now."
+    ),
+    CrisisLevel.HIGH: (
+        "Thank you for trusting me with this - it sounds like you're carrying a lot right now, "
+        "and I'm concerned about how you're doing. You deserve support from someone trained "
+        "to help, and I'd like to connect you with a counselor soon. If you ever feel unsafe, "
+        "you can call or text 988 at any time."
+    ),
+    CrisisLevel.MODERATE: (
+        "Thank you for sharing this with me. What you're going through sounds really hard, "
+        "and talking it through with a counselor could help."
+    ),
+}
+
+
 class CrisisAgent(BaseAgent):
     """
     Crisis Agent for risk assessment and intervention.
@@ -47,6 +119,16 @@ class CrisisAgent(BaseAgent):
     - Provide appropriate resources
     """
 
+    # Same conversation -> same assessment; safe to reuse
+    cache_responses = True
+    # Never queued behind other agents
+    priority = Priority.CRISIS
+    # Safety-critical: always the configured model, whatever the load
+    adaptive_tier = False
+    # Output is a CrisisAssessment as JSON, never free text
+    response_schema = CRISIS_ASSESSMENT_SCHEMA
+    response_instruction = "Respond with the JSON assessment only:"
+
     def __init__(self):
         super().__init__(
             agent_name="Crisis Specialist",
@@ -55,23 +137,26 @@ class CrisisAgent(BaseAgent):
             max_tokens=400
         )
 
+        # Metrics
+        self.parsed = 0
+        self.parse_failures = 0
+        self.repairs_succeeded = 0
+        self.repairs_failed = 0
+        self.unavailable = 0
+        self.repair_seconds = 0.0
+        self.screens = {"local": 0, "clear": 0, "model": 0, "unchanged": 0, "failed": 0, "reused": 0}
+
     def get_system_prompt(self, state: AgentState = None) -> str:
         """System prompt for crisis assessment with context from previous agents"""
         
-        # Get context from Intake Agent
+        # Get context from Intake Agent (risk evidence accumulated per message;
+        # also available to the background screen while intake is running)
         intake_context = ""
-        if state and state.agent_data.get("intake_complete"):
-            user_concerns = []
-            # Extract key concerns from intake
-            for msg in state.messages:
-                if msg.role == "user":
-                    user_concerns.append(msg.content)
-            
-            if user_concerns:
-                intake_context = f"""
+        if state:
+            intake_context = f"""
 CONTEXT FROM INTAKE AGENT:
-Our Intake Agent gathered that the user is experiencing: {', '.join(user_concerns[-3:])}
-Use this context to inform your assessment.
+{risk_state.describe(state.agent_data)}
+Use this context, together with the conversation, to inform your assessment.
 """
         
         return f"""You are a Crisis Assessment AI trained to evaluate mental health needs and suggest appropriate counselor types.
@@ -101,9 +186,10 @@ Counselor Categories:
 - GENERAL: Life coaching, general wellness support
 
 Provide:
-1. Crisis level assessment
-2. Suggested counselor category (and why)
-3. Brief supportive message
+1. level: crisis level assessment
+2. category: suggested counselor category
+3. reasoning: why this category fits
+4. response: brief supportive message
 
 When appropriate, acknowledge the information gathered by our Intake Agent.
 Be direct, clear, and compassionate."""
@@ -118,8 +204,7 @@ Be direct, clear, and compassionate."""
         if state.agent_data.get("crisis_category_suggested"):
             last_message = self.get_last_user_message(state)
             if last_message:
-                confirm_words = ["yes", "sounds good", "that's right", "okay", "sure", "proceed", "continue", "absolutely"]
-                if any(word in last_message.lower() for word in confirm_words):
+                if "crisis:confirm" in keywords.scan(last_message):
                     state.agent_data["crisis_complete"] = True
                     print("✅ Crisis assessment complete - moving to resource matching")
                     response_text = "Great! Let me connect you with the right resources."
@@ -133,32 +218,42 @@ Be direct, clear, and compassionate."""
             return state
 
         # First time - do assessment
-        # Build assessment context
-        conversation = "\n".join([
-            f"{msg.role}: {msg.content}"
-            for msg in state.messages[-10:]  # Last 10 messages
-        ])
-
-        context = f"""Assess the crisis level and suggest appropriate counselor category based on this conversation:
-
-{conversation}
+        # Clear emergencies are settled by the local screen without a model call
+        verdict = risk_scorer.screen(risk_state.features(state.agent_data))
+        if verdict:
+            state.agent_data["risk_screen"] = verdict.to_dict()
+        if verdict and verdict.settled:
+            assessment = self._local_assessment(verdict)
+        else:
+            assessment = self._screened_assessment(state) or await self._assess(state, ASSESSMENT_CONTEXT)
+            # The screen may raise the LLM's level, never lower it
+            level = CrisisLevel(risk_scorer.apply_floor(assessment.level.value, verdict))
+            if level != assessment.level:
+                # The model's reply was written for the lower level
+                assessment.level = level
+                assessment.response = LOCAL_RESPONSES[level]
 
-Provide your assessment in this format:
-LEVEL: [none/low/moderate/high/immediate]
-CATEGORY: [depression/anxiety/career/marriage/adhd/trauma/addiction/grief/general]
-REASONING: [1 sentence why this category fits]
-RESPONSE: [2-3 sentences providing support and explaining the suggestion]"""
+        # Later screens only weigh evidence that arrives after this assessment
+        risk_state.mark_assessed(state.agent_data)
 
-        # Generate assessment
-        assessment_text = self.generate_response(state, context)
+        crisis_level = assessment.level
+        category = assessment.category.value
+        response_text = assessment.response
 
-        # Parse assessment
-        crisis_level, category, response_text = self._parse_assessment(assessment_text)
+        # Add emergency resources for immediate crisis
+        if crisis_level == CrisisLevel.IMMEDIATE:
+            response_text = (
+                f"{response_text}\n\n"
+                "🚨 EMERGENCY RESOURCES:\n"
+                "• Call 988 (Suicide & Crisis Lifeline)\n"
+                "• Text 'HELLO' to 741741 (Crisis Text Line)\n"
+                "• Call 911 if in immediate danger"
+            )
 
         # Store assessment in state
         state.agent_data["crisis_level"] = crisis_level
         state.agent_data["suggested_category"] = category
-        state.agent_data["crisis_assessment"] = assessment_text
+        state.agent_data["crisis_assessment"] = assessment.model_dump(mode="json")
         state.agent_data["crisis_category_suggested"] = True
 
         # Add confirmation question
@@ -186,55 +281,175 @@ RESPONSE: [2-3 sentences providing support and explaining the suggestion]"""
 
         return state
 
-    def _parse_assessment(self, assessment_text: str) -> tuple[CrisisLevel, str, str]:
-        """
-        Parse the AI's assessment into crisis level, counselor category, and response.
+    def _local_assessment(self, verdict: risk_scorer.RiskVerdict) -> CrisisAssessment:
+        """Assessment for a case the local risk screen settled"""
+        level = CrisisLevel(verdict.level)
+        print(f"⚡ {self.agent_name}: settled locally as {level.value.upper()} (p={verdict.probability:.2f})")
+        return CrisisAssessment(
+            level=level,
+            category=CounselorCategory(verdict.category),
+            reasoning=f"Local risk screen ({', '.join(verdict.matches) or 'no risk language'})",
+            response=LOCAL_RESPONSES[level]
+        )
+
+    async def screen(self, state: AgentState) -> Optional[Dict[str, Any]]:
         """
-        lines = assessment_text.split("\n")
-
-        crisis_level = CrisisLevel.NONE
-        category = "general"
-        response_text = ""
-
-        for line in lines:
-            line_upper = line.upper()
-            if "LEVEL:" in line_upper:
-                # Extract level
-                level_text = line.split(":", 1)[1].strip().lower()
-                if "immediate" in level_text:
-                    crisis_level = CrisisLevel.IMMEDIATE
-                elif "high" in level_text:
-                    crisis_level = CrisisLevel.HIGH
-                elif "moderate" in level_text:
-                    crisis_level = CrisisLevel.MODERATE
-                elif "low" in level_text:
-                    crisis_level = CrisisLevel.LOW
-
-            elif "CATEGORY:" in line_upper:
-                # Extract category
-                category_text = line.split(":", 1)[1].strip().lower()
-                # Match to valid categories
-                for cat in CounselorCategory:
-                    if cat.value in category_text:
-                        category = cat.value
-                        break
-
-            elif "RESPONSE:" in line_upper:
-                # Extract response
-                response_text = line.split(":", 1)[1].strip()
-
-        # If no clear response, use the whole text
-        if not response_text:
-            response_text = assessment_text
+        Crisis screen of an intake turn, run next to the intake reply.
 
-        # Add emergency resources for immediate crisis
-        if crisis_level == CrisisLevel.IMMEDIATE:
-            response_text = (
-                f"{response_text}\n\n"
-                "🚨 EMERGENCY RESOURCES:\n"
-                "• Call 988 (Suicide & Crisis Lifeline)\n"
-                "• Text 'HELLO' to 741741 (Crisis Text Line)\n"
-                "• Call 911 if in immediate danger"
-            )
+        The local scorer decides first; the model only sees a case the
+        scorer can't settle but puts a floor on (any risk language at all).
+        Each user turn is screened once, and a model assessment stands - in
+        the screen and for process(), which uses it instead of calling the
+        model again - until new risk evidence arrives (risk_state totals
+        change), however many turns later the crisis stage runs.
+
+        Args:
+            state: Snapshot of the session (the live state is being
+                updated by the intake reply meanwhile)
 
-        return crisis_level, category, response_text
+        Returns:
+            Screen result for agent_data[SCREEN_KEY] (None if unchanged)
+        """
+        risk = risk_state.get(state.agent_data)
+        turn, evidence = risk["turn"], risk["totals"]
+        previous = state.agent_data.get(SCREEN_KEY)
+        if previous and (previous["turn"] == turn
+                         or (previous["assessment"] and previous["evidence"] == evidence)):
+            self.screens["unchanged"] += 1
+            return None
+
+        verdict = risk_scorer.screen(risk_state.features(state.agent_data))
+        if verdict is None:
+            # No scorer - leave the assessment to the crisis stage
+            return None
+
+        result = {
+            "turn": turn,
+            "evidence": dict(evidence),
+            "verdict": verdict.to_dict(),
+            "level": verdict.level,
+            "assessment": None,
+        }
+        if verdict.settled:
+            self.screens["local"] += 1
+            return result
+        if verdict.floor == "none":
+            # Nothing for the model to weigh yet - the crisis stage assesses later
+            self.screens["clear"] += 1
+            return result
+
+        try:
+            assessment = await self._assess(state, ASSESSMENT_CONTEXT, priority=Priority.CONVERSATION)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Must not take the intake reply down with it
+            self.screens["failed"] += 1
+            print(f"❌ {self.agent_name}: background screen failed: {e}")
+            return result
+
+        if assessment is UNPARSED_ASSESSMENT:
+            # Model unavailable - the crisis stage will try again
+            self.screens["failed"] += 1
+            return result
+
+        self.screens["model"] += 1
+        result["assessment"] = assessment.model_dump(mode="json")
+        if risk_scorer.level_index(assessment.level.value) > risk_scorer.level_index(verdict.floor):
+            result["level"] = assessment.level.value
+        print(f"🔎 {self.agent_name}: background screen assessed {result['level'].upper()}")
+        return result
+
+    def _screened_assessment(self, state: AgentState) -> Optional[CrisisAssessment]:
+        """The background screen's model assessment, if no risk evidence arrived since"""
+        screen = state.agent_data.get(SCREEN_KEY)
+        if not screen or not screen["assessment"]:
+            return None
+        if screen["evidence"] != risk_state.get(state.agent_data)["totals"]:
+            return None
+        self.screens["reused"] += 1
+        print(f"⚡ {self.agent_name}: reusing the background screen of turn {screen['turn']}")
+        return CrisisAssessment(**screen["assessment"])
+
+    async def _assess(
+        self,
+        state: AgentState,
+        context: str,
+        priority: Optional[Priority] = None
+    ) -> CrisisAssessment:
+        """
+        Run the assessment call and validate its JSON.
+
+        Output that doesn't validate gets exactly one repair call, which is
+        shown the validation error and the rejected output. If that fails
+        too (or the model isn't reachable) the conservative
+        UNPARSED_ASSESSMENT is used.
+        """
+        if not self.model:
+            self.unavailable += 1
+            return UNPARSED_ASSESSMENT
+
+        output = await self.agenerate_response(state, context, stream=False, priority=priority)
+        assessment, error = self._validate(output)
+        if assessment:
+            self.parsed += 1
+            return assessment
+
+        if self._is_fallback_text(state, output):
+            # Call failed or timed out - nothing to repair
+            self.unavailable += 1
+            print(f"⚠️  {self.agent_name}: model unavailable - using conservative assessment")
+            return UNPARSED_ASSESSMENT
+
+        self.parse_failures += 1
+        print(f"⚠️  {self.agent_name}: invalid assessment JSON - retrying once ({error})")
+
+        repair_context = f"""{context}
+
+Your previous assessment was rejected because it did not match the required JSON schema.
+
+Validation error:
+{error}
+
+Previous output:
+{output[:1000]}
+
+Return a corrected assessment."""
+
+        started = time.monotonic()
+        output = await self.agenerate_response(state, repair_context, stream=False, priority=priority)
+        self.repair_seconds += time.monotonic() - started
+
+        assessment, error = self._validate(output)
+        if assessment:
+            self.repairs_succeeded += 1
+            return assessment
+
+        self.repairs_failed += 1
+        print(f"⚠️  {self.agent_name}: repair failed - using conservative assessment ({error})")
+        return UNPARSED_ASSESSMENT
+
+    def _validate(self, output: str) -> Tuple[Optional[CrisisAssessment], Optional[str]]:
+        """Parse model output into a CrisisAssessment; returns (assessment, error)"""
+        try:
+            return CrisisAssessment(**json.loads(output)), None
+        except (ValueError, TypeError, ValidationError) as e:
+            # JSONDecodeError is a ValueError; TypeError covers non-object JSON
+            return None, str(e).splitlines()[0] if str(e) else type(e).__name__
+
+    def is_cacheable(self, text: str) -> bool:
+        """Only cache output that validates, so a bad assessment isn't replayed"""
+        return self._validate(text)[0] is not None
+
+    def assessment_stats(self) -> Dict[str, Any]:
+        failures = self.parse_failures
+        return {
+            "parsed": self.parsed,
+            "parse_failures": failures,
+            "repairs_succeeded": self.repairs_succeeded,
+            "repairs_failed": self.repairs_failed,
+            "unavailable": self.unavailable,
+            "repair_ms_total": round(self.repair_seconds * 1000, 2),
+            "avg_repair_ms": round(self.repair_seconds / failures * 1000, 2) if failures else 0.0,
+            "background_screens": dict(self.screens),
+        }
@@ -0,0 +1,64 @@
+"""
+Deadlines - Time budget of the request an agent call belongs to
+===============================================================
+
+The HTTP layer opens a scope() per turn; every model call made inside it
+sees the remaining time through remaining(). When the budget runs out the
+call is abandoned and the agent answers with its fallback text, so one
+slow Gemini response can't hold a request open indefinitely.
+
+Scopes nest - an inner scope can only shorten the deadline.
+
+REQUEST_DEADLINE_SECONDS: budget per chat turn (default: 30)
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import os
+import time
+
+
+DEFAULT_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+
+# Absolute time.monotonic() deadline of the current request (None = no limit)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+exceeded = 0
+
+
+@contextmanager
+def scope(seconds: Optional[float] = None):
+    """Give the calls made inside this block at most `seconds` in total"""
+    seconds = DEFAULT_SECONDS if seconds is None else seconds
+    deadline = time.monotonic() + seconds if seconds > 0 else None
+
+    current = _deadline.get()
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request (None if it has no deadline)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def record_exceeded() -> None:
+    global exceeded
+    exceeded += 1
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "default_seconds": DEFAULT_SECONDS,
+        "exceeded": exceeded,
+    }
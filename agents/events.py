@@ -0,0 +1,41 @@
+"""
+Conversation Events - Push channel from agents to streaming clients
+===================================================================
+
+Agents emit events (generated tokens, routing decisions) while they work.
+A transport such as the SSE endpoint installs a queue with listen(); every
+agent call made inside that context pushes onto it. With no listener
+installed, emit() is a no-op, so the plain request/response path pays
+nothing.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import asyncio
+
+
+# Queue of the transport serving the current turn (None = nobody listening)
+_listener: ContextVar[Optional[asyncio.Queue]] = ContextVar("conversation_events", default=None)
+
+
+def has_listener() -> bool:
+    """True if a streaming client is attached to the current turn"""
+    return _listener.get() is not None
+
+
+def emit(event: str, data: Dict[str, Any]) -> None:
+    """Push an event to the current turn's listener, if any"""
+    queue = _listener.get()
+    if queue is not None:
+        queue.put_nowait({"event": event, "data": data})
+
+
+@contextmanager
+def listen(queue: asyncio.Queue):
+    """Route events emitted inside this block to the given queue"""
+    token = _listener.set(queue)
+    try:
+        yield queue
+    finally:
+        _listener.reset(token)
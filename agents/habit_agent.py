@@ -11,9 +11,11 @@ This agent:
 Powered by: Gemini 2.0 Flash (fast recommendations)
 """
 
-from typing import List
+from typing import Any, Dict, List, Optional
 import os
 from .base_agent import BaseAgent, AgentState
+from . import speculation
+from .rate_limiter import Priority
 from models.habit import Habit, HabitFrequency
 
 
@@ -24,6 +26,9 @@ class HabitAgent(BaseAgent):
     Recommends habits, tracks progress, provides encouragement.
     """
 
+    # Can wait behind conversation and crisis calls
+    priority = Priority.BACKGROUND
+
     def __init__(self):
         super().__init__(
             agent_name="Habit Coach",
@@ -86,23 +91,37 @@ Keep recommendations warm and encouraging (2-3 sentences)."""
 
         print(f"📋 Creating habits for category: {selected_category}")
 
-        # Deterministically select habits based on category
-        recommended_habits = self._get_category_habits(selected_category)
+        # Selected in the background once the category was known (see agents.speculation)
+        precomputed = speculation.take(state, "habit", selected_category)
+        if precomputed:
+            habits, response_text = precomputed["habits"], precomputed["response"]
+        else:
+            # Deterministically select habits based on category
+            recommended_habits = self._get_category_habits(selected_category)
+            habits = [h.model_dump(mode="json") for h in recommended_habits]
 
-        # Build human-friendly response
-        response_text = self._format_habit_response(selected_category, recommended_habits)
+            # Build human-friendly response
+            response_text = self._format_habit_response(selected_category, recommended_habits)
 
         # Add response
         state = self.add_message(state, "assistant", response_text)
 
         # Store habit data
-        state.agent_data["recommended_habits"] = [h.dict() for h in recommended_habits]
+        state.agent_data["recommended_habits"] = habits
         state.agent_data["habit_complete"] = True
 
-        print(f"✅ Recommended {len(recommended_habits)} evidence-based habits")
+        print(f"✅ Recommended {len(habits)} evidence-based habits")
 
         return state
 
+    async def precompute(self, state: AgentState, category: str) -> Optional[Dict[str, Any]]:
+        """Habit selection and tracker message ahead of this stage (see agents.speculation)"""
+        habits = self._get_category_habits(category)
+        return {
+            "habits": [h.model_dump(mode="json") for h in habits],
+            "response": self._format_habit_response(category, habits),
+        }
+
     def _get_category_habits(self, category: str) -> List[Habit]:
         """
         Deterministic habit library mapped to counselor categories.
@@ -14,6 +14,9 @@ KEY PRINCIPLES:
 
 from typing import Optional
 from .base_agent import BaseAgent, AgentState
+from . import keywords
+from . import risk_state
+from .rate_limiter import Priority
 
 
 class IntakeAgent(BaseAgent):
@@ -31,12 +34,6 @@ class IntakeAgent(BaseAgent):
     STAGE_EXPLORE = "explore"
     STAGE_READY = "ready_for_assessment"
 
-    # Crisis keywords for immediate escalation
-    CRISIS_KEYWORDS = {
-        "kill myself", "end it all", "suicide", "hurt myself",
-        "take my life", "die", "overdose", "can't go on"
-    }
-
     def __init__(self):
         super().__init__(
             agent_name="Nima (Intake)",
@@ -84,9 +81,10 @@ Remember: Go deep, not surface level. Each response should build on what they've
         # Track failed generations to auto-progress
         failed_count = state.agent_data.get("intake_failed_count", 0)
 
-        # Check for crisis keywords
-        last_message = self.get_last_user_message(state)
-        if last_message and self._contains_crisis_language(last_message):
+        # Check for crisis keywords (one scan covers every check on this message)
+        last_message = self.get_last_user_message(state) or ""
+        labels = keywords.scan(last_message)
+        if "crisis" in labels:
             print("🚨 Crisis language detected!")
             response = (
                 "Thank you for trusting me. Your safety is the most important thing. "
@@ -102,25 +100,15 @@ Remember: Go deep, not surface level. Each response should build on what they've
         turn_count = len([m for m in state.messages if m.role == "user"])
         
         # Check if user has agreed to counselor matching
-        last_message = self.get_last_user_message(state) or ""
-        user_agreed = any(word in last_message.lower() for word in ["yes", "absolutely", "sure", "ok", "okay", "please", "that would be helpful", "yep", "yeah", "connect"])
+        user_agreed = "intake:agree" in labels
 
         # Check if we've asked about counselor matching in the last 3 messages
         asked_about_matching = False
         messages_to_check = min(3, len(state.messages))
         for msg in state.messages[-messages_to_check:]:
-            if msg.role == "assistant":
-                msg_lower = msg.content.lower()
-                if any(phrase in msg_lower for phrase in [
-                    "would you like me to match",
-                    "connecting with a professional counselor",
-                    "match you with someone",
-                    "counselor could really help",
-                    "connect you with",
-                    "find the best match"
-                ]):
-                    asked_about_matching = True
-                    break
+            if msg.role == "assistant" and "intake:matching_offer" in keywords.scan(msg.content):
+                asked_about_matching = True
+                break
 
         print(f"🔍 User message: '{last_message[:50]}'")
         print(f"🔍 Asked about matching: {asked_about_matching}, User agreed: {user_agreed}")
@@ -150,8 +138,16 @@ Remember: Go deep, not surface level. Each response should build on what they've
             context = "This is your first message. Greet them warmly as Nima. Let them know you're here to listen. Ask how they're feeling and what brings them here today."
             next_stage = self.STAGE_CHECK_IN
 
-        # Generate response
-        response_text = self.generate_response(state, context)
+        # Generate response - ahead of other traffic if crisis language came up
+        # recently. Exploration turns (2-4) may run on flash under load; the
+        # greeting, the hand-off and anything crisis-adjacent stay on pro.
+        crisis_adjacent = self._recent_crisis_language(state)
+        response_text = await self.agenerate_response(
+            state,
+            context,
+            priority=Priority.CRISIS if crisis_adjacent else None,
+            allow_downgrade=2 <= turn_count <= 4 and not crisis_adjacent
+        )
 
         # Check if this was a fallback response (indicates AI filter block)
         is_fallback = response_text.startswith("Thank you for sharing") or \
@@ -185,7 +181,6 @@ Remember: Go deep, not surface level. Each response should build on what they've
 
         return state
 
-    def _contains_crisis_language(self, text: str) -> bool:
-        """Check if message contains crisis keywords"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.CRISIS_KEYWORDS)
+    def _recent_crisis_language(self, state: AgentState, user_turns: int = 3) -> bool:
+        """Whether immediate- or high-risk language came up in the last few user messages"""
+        return risk_state.seen_within(state.agent_data, ("immediate", "high"), user_turns)
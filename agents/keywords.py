@@ -0,0 +1,195 @@
+"""
+Keywords - Shared multi-pattern matcher
+=======================================
+
+Every keyword check in the agents (crisis language, agreement and
+confirmation words, category and topic detection, privacy choices) runs
+through one Aho-Corasick automaton built once at import. A single pass
+over a message returns all matched labels, so the scan cost depends on
+the message length, not on how many phrases the vocabularies hold.
+
+Phrases match on word boundaries ("ok" doesn't match "book", "die"
+doesn't match "diet"). A trailing "*" makes a prefix pattern ("suicid*"
+matches "suicide" and "suicidal"). Matching is case-insensitive and
+treats typographic apostrophes as plain ones.
+
+Labels are namespaced by the check that uses them, e.g. "crisis",
+"intake:agree", "category:anxiety", "privacy:no_records".
+
+Usage:
+    labels = keywords.scan(message)
+    if "crisis" in labels:
+        ...
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+def normalize(text: str) -> str:
+    return text.lower().replace("’", "'").replace("‘", "'")
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over labelled phrases"""
+
+    def __init__(self, vocabulary: Mapping[str, Iterable[str]]):
+        # Trie transitions, failure links and the patterns ending at each node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        # pattern id -> (label, phrase, starts with a word char, needs a word end)
+        self._patterns: List[Tuple[str, str, bool, bool]] = []
+
+        for label, phrases in vocabulary.items():
+            for phrase in phrases:
+                self._add(label, phrase)
+        self._build()
+
+    def _add(self, label: str, phrase: str) -> None:
+        phrase = normalize(phrase.strip())
+        prefix = phrase.endswith("*")
+        phrase = phrase.rstrip("*")
+        if not phrase:
+            return
+
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+
+        self._out[node].append(len(self._patterns))
+        self._patterns.append((label, phrase, _is_word(phrase[0]), not prefix and _is_word(phrase[-1])))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                if node:
+                    fail = self._fail[node]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def matches(self, text: str) -> List[Tuple[str, str]]:
+        """All (label, phrase) matches in text, in order of where they end"""
+        text = normalize(text)
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        found: List[Tuple[str, str]] = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_id in out[node]:
+                label, phrase, word_start, word_end = patterns[pattern_id]
+                start = i - len(phrase) + 1
+                if word_start and start > 0 and _is_word(text[start - 1]):
+                    continue
+                if word_end and i + 1 < len(text) and _is_word(text[i + 1]):
+                    continue
+                found.append((label, phrase))
+        return found
+
+    def scan(self, text: str) -> Set[str]:
+        """Labels of every phrase found in text"""
+        return {label for label, _ in self.matches(text)}
+
+
+VOCABULARY: Dict[str, List[str]] = {
+    # Crisis language - immediate escalation from intake
+    "crisis": [
+        "kill myself", "end it all", "suicid*", "hurt myself", "take my life",
+        "die", "overdos*", "can't go on"
+    ],
+
+    # Intake: user agrees to counselor matching / assistant offered it
+    "intake:agree": [
+        "yes", "absolutely", "sure", "ok", "okay", "please", "that would be helpful",
+        "yep", "yeah", "connect*"
+    ],
+    "intake:matching_offer": [
+        "would you like me to match", "connecting with a professional counselor",
+        "match you with someone", "counselor could really help", "connect you with",
+        "find the best match"
+    ],
+
+    # Confirmations of a suggestion
+    "crisis:confirm": [
+        "yes", "sounds good", "that's right", "okay", "sure", "proceed", "continue", "absolutely"
+    ],
+    "resource:confirm": ["yes", "sounds good", "okay", "sure", "great", "thanks", "perfect"],
+    "scheduling:join": ["yes", "sure", "okay", "ok", "join", "sign up", "interested", "sounds good"],
+
+    # User asks to go back to counselor matching (see agents.workflow)
+    "workflow:rematch": [
+        "different counselor", "different therapist", "another counselor", "another therapist",
+        "other counselors", "other therapists", "change my counselor", "back to matching"
+    ],
+
+    # Counselor category the user asks for
+    "category:depression": ["depression", "depressed"],
+    "category:anxiety": ["anxiety", "anxious", "panic*"],
+    "category:career": ["career*", "job*", "work*"],
+    "category:marriage": ["marriage", "couple*", "relationship*"],
+    "category:adhd": ["adhd", "attention", "focus*"],
+    "category:trauma": ["trauma*", "ptsd", "abuse*"],
+    "category:addiction": ["addiction*", "substance*", "alcohol*", "drugs"],
+    "category:grief": ["grief", "loss", "bereavement"],
+
+    # Concerns mentioned in the conversation (resource agent summary)
+    "issue:anxiety": ["anxiety"],
+    "issue:depression": ["depression"],
+    "issue:stress": ["stress*"],
+    "issue:trauma": ["trauma*"],
+    "issue:relationships": ["relationships"],
+
+    # Topics for the deterministic fallback replies
+    "topic:career": ["work*", "job*", "career*", "burnout", "boss*"],
+    "topic:relationship": ["relationship*", "partner*", "spouse*", "marriage", "family"],
+    "topic:anxiety": ["anxious", "anxiety", "panic*", "worried", "stress*"],
+    "topic:depression": ["depressed", "depression", "sad", "sadness", "hopeless*", "empty"],
+
+    # Privacy tier choice, by name or by number
+    "privacy:full_support": ["full support", "full", "maximum support", "all the way"],
+    "privacy:assisted_handoff": ["assisted handoff", "assisted", "help connect", "transitions"],
+    "privacy:your_private_notes": ["private notes", "your private", "high level", "my notes"],
+    "privacy:no_records": ["no records", "nothing saved", "totally private", "anonymous"],
+    "privacy_number:full_support": ["1", "1st", "first"],
+    "privacy_number:assisted_handoff": ["2", "2nd", "second"],
+    "privacy_number:your_private_notes": ["3", "3rd", "third"],
+    "privacy_number:no_records": ["4", "4th", "fourth"],
+}
+
+_matcher = KeywordMatcher(VOCABULARY)
+
+
+def scan(text: Optional[str]) -> Set[str]:
+    """Labels matched anywhere in text (one pass over the shared automaton)"""
+    return _matcher.scan(text) if text else set()
+
+
+def first(labels: Set[str], namespace: str) -> Optional[str]:
+    """
+    First label of a namespace, in VOCABULARY order, with the namespace stripped.
+
+    e.g. first(labels, "category") -> "anxiety"
+    """
+    prefix = namespace + ":"
+    for label in VOCABULARY:
+        if label.startswith(prefix) and label in labels:
+            return label[len(prefix):]
+    return None
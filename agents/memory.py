@@ -0,0 +1,213 @@
+"""
+Conversation Memory - Rolling summary plus recent turns verbatim
+================================================================
+
+Prompts used to carry the whole transcript, so they grew with every turn.
+Instead, each prompt gets:
+- a running summary of older messages (agent_data["conversation_summary"])
+- the messages after it, newest first, up to a hard token budget
+
+The summary is extended incrementally in the background: once more than
+MEMORY_KEEP_MESSAGES messages sit outside it, a flash call folds the
+oldest of them into the previous summary. The result waits in a bounded
+pending table and is applied at the start of the session's next turn, so
+no request ever waits on summarization and state is only mutated while
+the session's lock is held.
+
+MEMORY_KEEP_MESSAGES: messages always kept verbatim (default: 8)
+MEMORY_FOLD_BATCH: extra messages to collect before summarizing (default: 4)
+MEMORY_HISTORY_TOKEN_BUDGET: max tokens of summary + history per prompt (default: 1500)
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import os
+
+from . import model_registry
+from .circuit_breaker import OPEN, get_breaker
+from .rate_limiter import Priority, gemini_limiter
+from .tokens import estimate_tokens
+
+
+SUMMARY_KEY = "conversation_summary"
+SUMMARY_MODEL = "gemini-2.5-flash"
+
+KEEP_MESSAGES = int(os.getenv("MEMORY_KEEP_MESSAGES", "8"))
+FOLD_BATCH = int(os.getenv("MEMORY_FOLD_BATCH", "4"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("MEMORY_HISTORY_TOKEN_BUDGET", "1500"))
+SUMMARY_MAX_TOKENS = 300
+
+SUMMARY_PROMPT = """You maintain a running summary of a mental health support conversation.
+Update the summary with the new messages. Keep what matters for the rest of the
+conversation: the user's concerns, feelings, risk indicators, preferences and any
+decisions made. Be factual and brief (at most 150 words). Do not add advice.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+# session_id -> in-flight summarization task
+_tasks: Dict[str, asyncio.Task] = {}
+# session_id -> {"base": int, "covered": int, "text": str}, waiting for the next turn
+_pending = None
+
+summaries_started = 0
+summaries_applied = 0
+summaries_discarded = 0
+summary_failures = 0
+
+
+def _get_pending():
+    """Create the pending-results LRU on first use"""
+    global _pending
+    if _pending is None:
+        # Imported here: the storage package imports agents.base_agent
+        from storage.lru_cache import LRUCache
+
+        _pending = LRUCache(max_entries=10000, ttl_seconds=3600)
+    return _pending
+
+
+def get_summary(agent_data: Dict[str, Any]) -> Tuple[str, int]:
+    """Current summary text and how many leading messages it covers"""
+    summary = agent_data.get(SUMMARY_KEY) or {}
+    return summary.get("text", ""), summary.get("covered", 0)
+
+
+def history_for_prompt(state) -> Tuple[str, List[Any]]:
+    """
+    Summary and verbatim messages to put in a prompt.
+
+    Messages not yet folded into the summary are kept newest first until
+    the token budget runs out; anything older is left to the summary.
+
+    Returns:
+        (summary text, messages in chronological order)
+    """
+    summary, covered = get_summary(state.agent_data)
+    covered = min(covered, len(state.messages))
+
+    budget = HISTORY_TOKEN_BUDGET - estimate_tokens(summary)
+    recent: List[Any] = []
+    for msg in reversed(state.messages[covered:]):
+        cost = estimate_tokens(f"{msg.role}: {msg.content}")
+        if cost > budget and recent:
+            break
+        recent.append(msg)
+        budget -= cost
+
+    recent.reverse()
+    return summary, recent
+
+
+def apply_pending(state) -> bool:
+    """
+    Merge a finished background summary into the state.
+
+    Call at the start of a turn, with the session's lock held.
+
+    Returns:
+        True if the stored summary changed
+    """
+    global summaries_applied, summaries_discarded
+
+    if not state.session_id:
+        return False
+    result = _get_pending().pop(state.session_id)
+    if result is None:
+        return False
+
+    _, covered = get_summary(state.agent_data)
+    if result["base"] != covered or result["covered"] > len(state.messages):
+        # The session was reset or summarized elsewhere meanwhile
+        summaries_discarded += 1
+        return False
+
+    state.agent_data[SUMMARY_KEY] = {"text": result["text"], "covered": result["covered"]}
+    summaries_applied += 1
+    return True
+
+
+def schedule(state) -> Optional[asyncio.Task]:
+    """
+    Start folding older messages into the summary if enough have piled up.
+
+    Call at the end of a turn. Only message text is captured, so the task
+    never touches the live state.
+    """
+    global summaries_started
+
+    session_id = state.session_id
+    if not session_id or session_id in _tasks or session_id in _get_pending():
+        return None
+
+    summary, covered = get_summary(state.agent_data)
+    fold_until = len(state.messages) - KEEP_MESSAGES
+    if fold_until - covered < FOLD_BATCH:
+        return None
+
+    model = model_registry.get_model(SUMMARY_MODEL, 0.2, SUMMARY_MAX_TOKENS)
+    if model is None:
+        # Demo mode - the history budget still bounds the prompt
+        return None
+    if get_breaker(SUMMARY_MODEL).current_state() == OPEN:
+        # Model is degraded - try again after a later turn
+        return None
+
+    transcript = "\n".join(
+        f"{msg.role}: {msg.content}" for msg in state.messages[covered:fold_until]
+    )
+    prompt = SUMMARY_PROMPT.format(summary=summary or "(none yet)", messages=transcript)
+
+    task = asyncio.create_task(_summarize(session_id, model, prompt, covered, fold_until))
+    _tasks[session_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(session_id, None))
+    summaries_started += 1
+    return task
+
+
+def forget(session_id: str) -> None:
+    """Drop in-flight and pending summaries of a deleted session"""
+    task = _tasks.pop(session_id, None)
+    if task is not None:
+        task.cancel()
+    _get_pending().pop(session_id)
+
+
+async def _summarize(session_id: str, model, prompt: str, base: int, covered: int) -> None:
+    global summary_failures
+
+    try:
+        with get_breaker(SUMMARY_MODEL).call() as call:
+            async with gemini_limiter.admit(Priority.BACKGROUND, estimate_tokens(prompt) + SUMMARY_MAX_TOKENS):
+                call.start()
+                response = await model.generate_content_async(prompt)
+        text = response.text.strip()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # Try again after the next turn
+        summary_failures += 1
+        print(f"❌ Conversation summary failed for {session_id}: {e}")
+        return
+
+    if text:
+        _get_pending().set(session_id, {"base": base, "covered": covered, "text": text})
+
+
+def stats() -> Dict[str, Any]:
+    """Summarizer activity for the metrics endpoint"""
+    return {
+        "in_flight": len(_tasks),
+        "pending": len(_get_pending()),
+        "started": summaries_started,
+        "applied": summaries_applied,
+        "discarded": summaries_discarded,
+        "failures": summary_failures,
+        "keep_messages": KEEP_MESSAGES,
+        "history_token_budget": HISTORY_TOKEN_BUDGET,
+    }
@@ -0,0 +1,286 @@
+"""
+Model Registry - One Gemini client and model cache per process
+==============================================================
+
+genai.configure() is called once, so every agent shares the same
+underlying client (and its pooled connections). GenerativeModel objects
+are cached by (model_name, generation config); agents with the same
+settings share one instance, and constructing an agent costs a dict
+lookup.
+
+The registry also tracks recent call latencies per model. With
+GEMINI_HEDGING=true, a non-streamed call that runs past its model's p95
+gets a hedged duplicate on the faster model from FASTER_MODELS, and
+whichever answers first wins.
+
+Adaptive tiering (route()) moves calls that agents mark as eligible to
+the faster model while the slow one is overloaded: p95 latency above
+TIER_DOWN_P95_SECONDS or a rate-limiter queue of TIER_DOWN_QUEUE_DEPTH.
+It moves back once p95 is under TIER_UP_P95_SECONDS and the queue is at
+most TIER_UP_QUEUE_DEPTH. The gap between the thresholds, plus a
+minimum time between switches, keeps the tier from flapping.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+import google.generativeai as genai
+from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
+from .rate_limiter import gemini_limiter
+
+
+# Allow mental health discussions while maintaining safety
+SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+# Slow model -> faster model used for hedged duplicates and downgrades
+FASTER_MODELS = {
+    "gemini-2.5-pro": "gemini-2.5-flash",
+}
+HEDGING_ENABLED = os.getenv("GEMINI_HEDGING", "false").lower() == "true"
+# Latencies remembered per model, and how many before hedging kicks in
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+# Adaptive tiering thresholds
+TIERING_ENABLED = os.getenv("MODEL_TIERING", "true").lower() == "true"
+TIER_DOWN_P95_SECONDS = float(os.getenv("TIER_DOWN_P95_SECONDS", "8"))
+TIER_UP_P95_SECONDS = float(os.getenv("TIER_UP_P95_SECONDS", "5"))
+TIER_DOWN_QUEUE_DEPTH = int(os.getenv("TIER_DOWN_QUEUE_DEPTH", "4"))
+TIER_UP_QUEUE_DEPTH = int(os.getenv("TIER_UP_QUEUE_DEPTH", "1"))
+TIER_MIN_DWELL_SECONDS = 30.0
+# Only latencies this recent count for tiering, so a downgraded model
+# whose old samples age out gets retried
+TIER_LATENCY_MAX_AGE = 300.0
+
+_lock = threading.Lock()
+_configured = False
+_api_key_present = False
+_models: Dict[Tuple, genai.GenerativeModel] = {}
+# model_name -> (recorded_at, seconds) of recent calls
+_latencies: Dict[str, Deque[Tuple[float, float]]] = {}
+# model_name -> {"downgraded": bool, "changed_at": float, "switches": int}
+_tiers: Dict[str, Dict[str, Any]] = {}
+
+hedges_sent = 0
+hedges_won = 0
+
+
+def configure() -> bool:
+    """
+    Configure the Gemini client once per process.
+
+    Returns:
+        True if an API key is available
+    """
+    global _configured, _api_key_present
+
+    with _lock:
+        if _configured:
+            return _api_key_present
+
+        # Configure Gemini with API key only (no service account)
+        # Explicitly remove service account credentials to avoid SSL issues
+        if "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
+            del os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
+
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if api_key:
+            genai.configure(api_key=api_key)
+
+        _api_key_present = bool(api_key)
+        _configured = True
+        return _api_key_present
+
+
+def get_model(
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    response_schema: Optional[Dict[str, Any]] = None
+) -> Optional[genai.GenerativeModel]:
+    """
+    Get the shared model for a name and generation config.
+
+    Args:
+        response_schema: Constrain output to JSON matching this schema
+
+    Returns:
+        Cached GenerativeModel, or None when no API key is configured
+    """
+    if not configure():
+        return None
+
+    schema_key = json.dumps(response_schema, sort_keys=True) if response_schema else None
+    key = (model_name, temperature, max_tokens, schema_key)
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                config = {"temperature": temperature, "max_output_tokens": max_tokens}
+                if response_schema:
+                    config.update(response_mime_type="application/json", response_schema=response_schema)
+                model = genai.GenerativeModel(
+                    model_name,
+                    generation_config=genai.types.GenerationConfig(**config),
+                    safety_settings=SAFETY_SETTINGS
+                )
+                _models[key] = model
+    return model
+
+
+def record_latency(model_name: str, seconds: float) -> None:
+    """Remember how long a call took (for an abandoned call: how long it ran, a lower bound)"""
+    window = _latencies.get(model_name)
+    if window is None:
+        window = _latencies.setdefault(model_name, deque(maxlen=LATENCY_WINDOW))
+    window.append((time.monotonic(), seconds))
+
+
+def latency_percentile(
+    model_name: str,
+    percentile: float,
+    max_age: Optional[float] = None
+) -> Optional[float]:
+    """Latency percentile over the recent window (None without samples)"""
+    window = _latencies.get(model_name) or ()
+    if max_age is not None:
+        cutoff = time.monotonic() - max_age
+        samples = [seconds for recorded_at, seconds in window if recorded_at >= cutoff]
+    else:
+        samples = [seconds for _, seconds in window]
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+
+def hedge_for(
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    response_schema: Optional[Dict[str, Any]] = None
+) -> Optional[Tuple[str, genai.GenerativeModel, float]]:
+    """
+    Hedge plan for a call, if hedging applies.
+
+    Returns:
+        (hedge model name, hedge model, delay in seconds before sending it),
+        or None
+    """
+    hedge_name = FASTER_MODELS.get(model_name)
+    if not HEDGING_ENABLED or hedge_name is None:
+        return None
+
+    window = _latencies.get(model_name)
+    if window is None or len(window) < HEDGE_MIN_SAMPLES:
+        # Not enough history to know what "slow" is yet
+        return None
+
+    model = get_model(hedge_name, temperature, max_tokens, response_schema)
+    if model is None:
+        return None
+    return hedge_name, model, latency_percentile(model_name, 0.95)
+
+
+def route(model_name: str) -> Dict[str, Any]:
+    """
+    Pick the tier for a call that may be downgraded.
+
+    Returns:
+        Decision: configured and chosen model, the reason for the choice,
+        and the p95 / queue depth it was based on
+    """
+    faster = FASTER_MODELS.get(model_name)
+    p95 = latency_percentile(model_name, 0.95, max_age=TIER_LATENCY_MAX_AGE)
+    depth = gemini_limiter.queue_depth()
+    decision = {
+        "configured": model_name,
+        "model": model_name,
+        "reason": "no faster tier",
+        "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        "queue_depth": depth,
+    }
+    if faster is None:
+        return decision
+    if not TIERING_ENABLED:
+        decision["reason"] = "tiering disabled"
+        return decision
+
+    tier = _tiers.setdefault(model_name, {"downgraded": False, "changed_at": 0.0, "switches": 0})
+    can_switch = time.monotonic() - tier["changed_at"] >= TIER_MIN_DWELL_SECONDS
+
+    if not tier["downgraded"]:
+        overloaded = (p95 is not None and p95 > TIER_DOWN_P95_SECONDS) or depth >= TIER_DOWN_QUEUE_DEPTH
+        if overloaded and can_switch:
+            tier.update(downgraded=True, changed_at=time.monotonic(), switches=tier["switches"] + 1)
+            print(f"⬇️  Routing eligible {model_name} calls to {faster} (p95={p95}, queue={depth})")
+            decision["reason"] = "downgraded: p95 or queue depth over threshold"
+        else:
+            decision["reason"] = "within thresholds" if not overloaded else "overloaded, holding tier"
+    else:
+        recovered = (p95 is None or p95 < TIER_UP_P95_SECONDS) and depth <= TIER_UP_QUEUE_DEPTH
+        if recovered and can_switch:
+            tier.update(downgraded=False, changed_at=time.monotonic(), switches=tier["switches"] + 1)
+            print(f"⬆️  Routing {model_name} calls back to {model_name}")
+            decision["reason"] = "upgraded: load back under threshold"
+        else:
+            decision["reason"] = "still downgraded" if not recovered else "recovered, holding tier"
+
+    if tier["downgraded"]:
+        decision["model"] = faster
+    return decision
+
+
+def record_hedge(won: bool) -> None:
+    global hedges_sent, hedges_won
+    hedges_sent += 1
+    if won:
+        hedges_won += 1
+
+
+def stats() -> Dict[str, Any]:
+    """Registry contents for the metrics endpoint"""
+    return {
+        "configured": _configured,
+        "api_key_present": _api_key_present,
+        "models": [
+            {
+                "model_name": name,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "json_schema": schema_key is not None,
+            }
+            for name, temperature, max_tokens, schema_key in _models
+        ],
+        "tiers": {
+            name: {
+                "downgraded": tier["downgraded"],
+                "switches": tier["switches"],
+            }
+            for name, tier in _tiers.items()
+        },
+        "latency_ms": {
+            name: {
+                "samples": len(window),
+                "p50": round(latency_percentile(name, 0.5) * 1000, 1),
+                "p95": round(latency_percentile(name, 0.95) * 1000, 1),
+            }
+            for name, window in _latencies.items() if window
+        },
+        "hedging": {
+            "enabled": HEDGING_ENABLED,
+            "sent": hedges_sent,
+            "won": hedges_won,
+        },
+    }
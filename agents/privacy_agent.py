@@ -16,6 +16,7 @@ Powered by: Deterministic (no LLM needed)
 from typing import Optional
 import os
 from .base_agent import BaseAgent, AgentState
+from . import keywords
 from models.user import PrivacyTier
 
 
@@ -109,32 +110,11 @@ Pick what feels safest. You can always change your mind later."""
 
     def _detect_privacy_choice(self, message: str) -> Optional[str]:
         """Detect which privacy tier user selected"""
-        message_lower = message.lower()
+        labels = keywords.scan(message)
 
-        # Check for each tier
-        if any(word in message_lower for word in ["full support", "full", "maximum support", "all the way"]):
-            return PrivacyTier.FULL_SUPPORT.value
-
-        if any(word in message_lower for word in ["assisted handoff", "assisted", "help connect", "transitions"]):
-            return PrivacyTier.ASSISTED_HANDOFF.value
-
-        if any(word in message_lower for word in ["private notes", "your private", "high level", "my notes"]):
-            return PrivacyTier.YOUR_PRIVATE_NOTES.value
-
-        if any(word in message_lower for word in ["no records", "nothing saved", "totally private", "anonymous"]):
-            return PrivacyTier.NO_RECORDS.value
-
-        # Check for numbers (1-4)
-        if "1" in message_lower or "first" in message_lower:
-            return PrivacyTier.FULL_SUPPORT.value
-        if "2" in message_lower or "second" in message_lower:
-            return PrivacyTier.ASSISTED_HANDOFF.value
-        if "3" in message_lower or "third" in message_lower:
-            return PrivacyTier.YOUR_PRIVATE_NOTES.value
-        if "4" in message_lower or "fourth" in message_lower:
-            return PrivacyTier.NO_RECORDS.value
-
-        return None
+        # Check for each tier by name, then by number (1-4)
+        tier = keywords.first(labels, "privacy") or keywords.first(labels, "privacy_number")
+        return PrivacyTier(tier).value if tier else None
 
     def _get_tier_display_name(self, tier_value: str) -> str:
         """Get display name for privacy tier"""
@@ -0,0 +1,183 @@
+"""
+Prompt Builder - Fit prompts into a token budget by section priority
+====================================================================
+
+A prompt is a list of named sections (system prompt, agent context,
+retrieved data, summary, history, ...). Each section has a priority; when
+the estimated total exceeds the agent's budget, the lowest-priority
+sections are trimmed first:
+- sections made of items (history messages, therapist entries) drop whole
+  items, oldest or last first
+- plain text sections are cut short
+- required sections are never touched
+
+Token counts are local estimates (see agents.tokens), so building a prompt
+costs no network call. Every build is recorded per agent for /metrics.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .tokens import estimate_tokens
+
+
+TRUNCATION_MARK = " [...]"
+
+# agent_name -> running totals
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+class PromptSection:
+    """
+    One named part of a prompt.
+
+    Args:
+        name: Label used in reports
+        items: Pieces of the section, joined with separator
+        priority: Higher survives longer when trimming
+        required: Never trimmed
+        drop_from: "start" drops the oldest items first, "end" the last ones
+        heading: Optional line rendered above the items (kept while any item is)
+        separator: String joining the items
+    """
+
+    def __init__(
+        self,
+        name: str,
+        items: List[str],
+        priority: int = 50,
+        required: bool = False,
+        drop_from: str = "end",
+        heading: Optional[str] = None,
+        separator: str = "\n"
+    ):
+        self.name = name
+        self.items = [item for item in items if item]
+        self.priority = priority
+        self.required = required
+        self.drop_from = drop_from
+        self.heading = heading
+        self.separator = separator
+
+    def render(self) -> str:
+        if not self.items:
+            return ""
+        body = self.separator.join(self.items)
+        return f"{self.heading}\n{body}" if self.heading else body
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+    def shrink(self, excess: int) -> int:
+        """Remove roughly `excess` tokens; returns how many were removed"""
+        before = self.tokens()
+
+        while len(self.items) > 1 and before - self.tokens() < excess:
+            self.items.pop(0 if self.drop_from == "start" else -1)
+
+        remaining = excess - (before - self.tokens())
+        if remaining > 0 and self.items:
+            # One item left and still too big - cut the text itself
+            text = self.items[0]
+            keep_tokens = estimate_tokens(text) - remaining
+            cut = len(text) * max(keep_tokens, 0) // estimate_tokens(text)
+            # Estimates aren't linear in length - shorten until it fits
+            while cut > 0 and estimate_tokens(text[:cut] + TRUNCATION_MARK) > keep_tokens:
+                cut = cut * 9 // 10
+            self.items = [text[:cut].rstrip() + TRUNCATION_MARK] if cut > 0 else []
+
+        return before - self.tokens()
+
+
+class PromptBuilder:
+    """
+    Assemble sections into a prompt that fits a token budget.
+
+    Usage:
+        builder = PromptBuilder(budget=3000)
+        builder.add(PromptSection("system", [system_prompt], required=True))
+        builder.add(PromptSection("history", lines, priority=50, drop_from="start"))
+        prompt, report = builder.build()
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.sections: List[PromptSection] = []
+
+    def add(self, section: PromptSection) -> "PromptBuilder":
+        self.sections.append(section)
+        return self
+
+    def build(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns:
+            (prompt text, report with per-section token counts)
+        """
+        trimmed: List[str] = []
+        sizes = {section.name: section.tokens() for section in self.sections}
+        total = sum(sizes.values())
+
+        if self.budget is not None and total > self.budget:
+            trimmable = sorted(
+                (s for s in self.sections if not s.required and s.items),
+                key=lambda s: s.priority
+            )
+            for section in trimmable:
+                excess = total - self.budget
+                if excess <= 0:
+                    break
+                removed = section.shrink(excess)
+                if removed:
+                    total -= removed
+                    trimmed.append(section.name)
+
+        parts = [section.render() for section in self.sections]
+        prompt = "\n\n".join(part for part in parts if part)
+
+        report = {
+            "budget": self.budget,
+            "estimated_tokens": estimate_tokens(prompt),
+            "sections": {section.name: section.tokens() for section in self.sections},
+            "requested_tokens": sum(sizes.values()),
+            "trimmed": trimmed,
+        }
+        return prompt, report
+
+
+def record(agent_name: str, report: Dict[str, Any]) -> None:
+    """Add one build report to the agent's totals"""
+    totals = _stats.setdefault(agent_name, {
+        "calls": 0,
+        "tokens_total": 0,
+        "tokens_max": 0,
+        "trimmed_calls": 0,
+        "section_tokens": {},
+        "last": None,
+    })
+
+    tokens = report["estimated_tokens"]
+    totals["calls"] += 1
+    totals["tokens_total"] += tokens
+    totals["tokens_max"] = max(totals["tokens_max"], tokens)
+    if report["trimmed"]:
+        totals["trimmed_calls"] += 1
+    for name, count in report["sections"].items():
+        totals["section_tokens"][name] = totals["section_tokens"].get(name, 0) + count
+    totals["last"] = report
+
+
+def stats() -> Dict[str, Any]:
+    """Per-agent prompt sizes for the metrics endpoint"""
+    return {
+        agent_name: {
+            "calls": totals["calls"],
+            "avg_tokens": round(totals["tokens_total"] / totals["calls"], 1),
+            "max_tokens": totals["tokens_max"],
+            "trimmed_calls": totals["trimmed_calls"],
+            "avg_section_tokens": {
+                name: round(count / totals["calls"], 1)
+                for name, count in totals["section_tokens"].items()
+            },
+            "last": totals["last"],
+        }
+        for agent_name, totals in _stats.items()
+    }
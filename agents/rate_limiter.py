@@ -0,0 +1,252 @@
+"""
+Rate Limiter - Priority admission for Gemini calls
+==================================================
+
+All agents share one API key and quota. Every model call is admitted
+here first:
+- at most GEMINI_MAX_CONCURRENCY calls run at once
+- GEMINI_RPM / GEMINI_TPM token buckets keep within requests and tokens
+  per minute (a call is charged its estimated prompt plus max output tokens)
+
+Waiting calls are served strictly by priority class, then arrival order,
+so crisis assessments go ahead of queued intake chatter, and both go
+ahead of habit and support-group recommendations or background summaries.
+GEMINI_CRISIS_RESERVE of the concurrent slots are held back for crisis
+calls, so one never waits for a slot to free up behind other traffic.
+
+GEMINI_MAX_CONCURRENCY: concurrent model calls (default: 8)
+GEMINI_CRISIS_RESERVE: slots only crisis calls may use (default: 1)
+GEMINI_RPM: requests per minute (default: unlimited)
+GEMINI_TPM: tokens per minute (default: unlimited)
+"""
+
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import heapq
+import itertools
+import os
+import time
+
+
+class Priority(IntEnum):
+    """Admission classes - lower values are served first"""
+    CRISIS = 0          # Crisis assessment, turns with crisis language
+    CONVERSATION = 1    # Regular user-facing replies
+    BACKGROUND = 2      # Recommendations and summaries nobody is blocked on
+
+
+class TokenBucket:
+    """Refills continuously at rate_per_minute, holding at most one minute's worth"""
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "future", "enqueued_at")
+
+    def __init__(self, priority: Priority, seq: int, tokens: int, future: asyncio.Future, enqueued_at: float):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ModelRateLimiter:
+    """
+    Concurrency semaphore plus RPM/TPM token buckets with a priority queue.
+
+    Usage:
+        async with limiter.admit(Priority.CRISIS, estimated_tokens):
+            response = await model.generate_content_async(prompt)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        crisis_reserve: int = 0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_concurrency = max_concurrency
+        # Always leave at least one slot for everyone else
+        self.crisis_reserve = max(0, min(crisis_reserve, max_concurrency - 1))
+        self.clock = clock
+        self._requests = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # Metrics
+        self._queued = {p: 0 for p in Priority}
+        self._admitted = {p: 0 for p in Priority}
+        self._wait_total = {p: 0.0 for p in Priority}
+        self._wait_max = {p: 0.0 for p in Priority}
+        self.max_queue_depth = 0
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority, tokens: int = 0):
+        """Hold one admission for the duration of the block"""
+        await self._acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._dispatch()
+
+    async def _acquire(self, priority: Priority, tokens: int) -> None:
+        enqueued_at = self.clock()
+
+        if not self._queue and self._try_take(priority, tokens):
+            self._granted(priority, enqueued_at)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, _Waiter(priority, next(self._seq), tokens, future, enqueued_at))
+        self._queued[priority] += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled - hand the slot back
+                self._in_flight -= 1
+            else:
+                future.cancel()
+                self._queued[priority] -= 1
+            self._dispatch()
+            raise
+
+    def _slots(self, priority: Priority) -> int:
+        """Concurrent slots a call of this priority may occupy"""
+        if priority == Priority.CRISIS:
+            return self.max_concurrency
+        return self.max_concurrency - self.crisis_reserve
+
+    def _try_take(self, priority: Priority, tokens: int) -> bool:
+        """Claim a slot and bucket capacity if all are available now"""
+        if self._in_flight >= self._slots(priority) or self._bucket_wait(tokens) > 0:
+            return False
+        if self._requests:
+            self._requests.take(1)
+        if self._tokens:
+            self._tokens.take(tokens)
+        self._in_flight += 1
+        return True
+
+    def _bucket_wait(self, tokens: int) -> float:
+        wait = 0.0
+        if self._requests:
+            wait = max(wait, self._requests.wait_time(1))
+        if self._tokens:
+            wait = max(wait, self._tokens.wait_time(tokens))
+        return wait
+
+    def _dispatch(self) -> None:
+        """Admit waiters from the head of the queue while capacity lasts"""
+        while self._queue:
+            head = self._queue[0]
+            if head.future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+
+            # Anyone behind the head has the same or a lower priority, so
+            # they couldn't use the crisis reserve either
+            if self._in_flight >= self._slots(head.priority):
+                return
+
+            wait = self._bucket_wait(head.tokens)
+            if wait > 0:
+                # Strict priority: nothing jumps the head, wake up when it fits
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._on_timer)
+                return
+
+            heapq.heappop(self._queue)
+            self._try_take(head.priority, head.tokens)
+            self._queued[head.priority] -= 1
+            self._granted(head.priority, head.enqueued_at)
+            head.future.set_result(None)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _granted(self, priority: Priority, enqueued_at: float) -> None:
+        waited = self.clock() - enqueued_at
+        self._admitted[priority] += 1
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+    def queue_depth(self) -> int:
+        """Calls currently waiting for admission"""
+        return sum(self._queued.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "crisis_reserve": self.crisis_reserve,
+            "queue_depth": self.queue_depth(),
+            "max_queue_depth": self.max_queue_depth,
+            "requests_per_minute": self._requests.capacity if self._requests else None,
+            "tokens_per_minute": self._tokens.capacity if self._tokens else None,
+            "classes": {
+                p.name.lower(): {
+                    "queued": self._queued[p],
+                    "admitted": self._admitted[p],
+                    "avg_wait_ms": round(self._wait_total[p] / self._admitted[p] * 1000, 2)
+                    if self._admitted[p] else 0.0,
+                    "max_wait_ms": round(self._wait_max[p] * 1000, 2),
+                }
+                for p in Priority
+            },
+        }
+
+
+def _env_number(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+# Shared by every Gemini call in the process
+gemini_limiter = ModelRateLimiter(
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    requests_per_minute=_env_number("GEMINI_RPM"),
+    tokens_per_minute=_env_number("GEMINI_TPM"),
+    crisis_reserve=int(os.getenv("GEMINI_CRISIS_RESERVE", "1"))
+)
@@ -11,11 +11,14 @@ This agent:
 Powered by: Gemini 2.0 Flash thinking mode (complex reasoning for matching logic)
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import json
 import random
 from pathlib import Path
 from .base_agent import BaseAgent, AgentState
+from . import keywords
+from . import speculation
+from .rate_limiter import Priority
 from models.therapist import Therapist, TherapistSpecialization
 
 
@@ -26,6 +29,11 @@ class ResourceAgent(BaseAgent):
     Uses Gemini 2.0 Flash thinking mode for complex matching logic.
     """
 
+    # Recommendations for the same category and therapist list repeat often
+    cache_responses = True
+    # Recommendation prose can move to flash when pro is overloaded
+    adaptive_tier = True
+
     def __init__(self):
         super().__init__(
             agent_name="Resource Coordinator",
@@ -88,30 +96,18 @@ Be warm but professional."""
                 state.agent_data["selected_category"] = override_category
                 print(f"✏️  User selected category: {override_category}")
 
-        # Search therapists filtered by category
-        available_therapists = self._get_available_therapists(category_filter=selected_category)
-
-        print(f"📋 Found {len(available_therapists)} therapists for category: {selected_category}")
+        # First presentation: use the shortlist and prose precomputed while the
+        # user read the crisis assessment, if they're for this category
+        precomputed = None
+        if not state.agent_data.get("therapists_presented"):
+            precomputed = speculation.take(state, "resource", selected_category)
 
-        if not available_therapists:
-            # No therapists for this category
-            response_text = (
-                f"I apologize, but we don't currently have available counselors specializing in {selected_category}. "
-                f"However, our general counselors are trained to help with a wide range of issues. "
-                f"Would you like me to connect you with a general counselor instead?"
-            )
+        if precomputed:
+            available_therapists = [Therapist(**t) for t in precomputed["therapists"]]
+            response_text = precomputed["response"]
+            print(f"⚡ Using precomputed {selected_category} matches")
         else:
-            # Build matching context
-            context = f"""User needs a {selected_category} counselor.
-
-Available {selected_category} counselors:
-{self._format_therapist_list(available_therapists)}
-
-Present the top 2-3 counselors as options. Be warm and explain briefly what makes each a good fit.
-Keep response conversational (3-4 sentences)."""
-
-            # Generate matching recommendation
-            response_text = self.generate_response(state, context)
+            available_therapists, response_text = await self._recommend(state, selected_category)
 
         # Add response
         state = self.add_message(state, "assistant", response_text)
@@ -126,8 +122,7 @@ Keep response conversational (3-4 sentences)."""
         # Only complete after user engages with therapist options
         last_message = self.get_last_user_message(state)
         if last_message and state.agent_data.get("therapists_presented"):
-            confirm_words = ["yes", "sounds good", "okay", "sure", "great", "thanks", "perfect"]
-            if any(word in last_message.lower() for word in confirm_words):
+            if "resource:confirm" in keywords.scan(last_message):
                 state.agent_data["resource_complete"] = True
                 print("✅ Therapist matching complete")
             else:
@@ -138,39 +133,76 @@ Keep response conversational (3-4 sentences)."""
 
         return state
 
-    def _detect_category_override(self, message: str) -> Optional[str]:
-        """Detect if user wants a different counselor category"""
-        message_lower = message.lower()
-
-        categories = {
-            "depression": ["depression", "depressed"],
-            "anxiety": ["anxiety", "anxious", "panic"],
-            "career": ["career", "job", "work"],
-            "marriage": ["marriage", "couple", "relationship"],
-            "adhd": ["adhd", "attention", "focus"],
-            "trauma": ["trauma", "ptsd", "abuse"],
-            "addiction": ["addiction", "substance", "alcohol", "drugs"],
-            "grief": ["grief", "loss", "bereavement"],
-        }
+    async def _recommend(
+        self,
+        state: AgentState,
+        category: str,
+        stream: bool = True,
+        priority: Optional[Priority] = None
+    ) -> Tuple[List[Therapist], str]:
+        """Shortlist for a category and the message presenting it"""
+        # Search therapists filtered by category
+        available_therapists = self._get_available_therapists(category_filter=category)
+
+        print(f"📋 Found {len(available_therapists)} therapists for category: {category}")
+
+        if not available_therapists:
+            # No therapists for this category
+            response_text = (
+                f"I apologize, but we don't currently have available counselors specializing in {category}. "
+                f"However, our general counselors are trained to help with a wide range of issues. "
+                f"Would you like me to connect you with a general counselor instead?"
+            )
+            return available_therapists, response_text
+
+        # Build matching context
+        context = f"""User needs a {category} counselor.
+
+Present the top 2-3 counselors from the list below as options. Be warm and explain briefly what makes each a good fit.
+Keep response conversational (3-4 sentences).
+
+Available {category} counselors:"""
 
-        for category, keywords in categories.items():
-            if any(keyword in message_lower for keyword in keywords):
-                return category
+        # Generate matching recommendation (one retrieved entry per therapist)
+        response_text = await self.agenerate_response(
+            state,
+            context,
+            stream=stream,
+            retrieved=[self._format_therapist_list([t]) for t in available_therapists],
+            priority=priority
+        )
+        return available_therapists, response_text
 
-        return None
+    async def precompute(self, state: AgentState, category: str) -> Optional[Dict[str, Any]]:
+        """Shortlist and recommendation ahead of this stage (see agents.speculation)"""
+        therapists, response_text = await self._recommend(
+            state, category, stream=False, priority=Priority.BACKGROUND
+        )
+        if self._is_fallback_text(state, response_text):
+            # Model unavailable - the stage will try again itself
+            return None
+        return {
+            "therapists": [t.model_dump(mode="json") for t in therapists],
+            "response": response_text,
+        }
+
+    def _detect_category_override(self, message: str) -> Optional[str]:
+        """Detect if user wants a different counselor category"""
+        return keywords.first(keywords.scan(message), "category")
 
     def _extract_user_issues(self, state: AgentState) -> List[str]:
         """Extract user's main concerns from conversation"""
         # Simple keyword extraction (in production, use NLP)
-        keywords = ["anxiety", "depression", "stress", "trauma", "relationships"]
-
-        conversation_text = " ".join([
-            msg.content.lower()
-            for msg in state.messages
-            if msg.role == "user"
-        ])
-
-        issues = [kw for kw in keywords if kw in conversation_text]
+        labels = set()
+        for msg in state.messages:
+            if msg.role == "user":
+                labels |= keywords.scan(msg.content)
+
+        issues = [
+            label.split(":", 1)[1]
+            for label in keywords.VOCABULARY
+            if label.startswith("issue:") and label in labels
+        ]
 
         return issues if issues else ["general support"]
 
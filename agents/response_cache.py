@@ -0,0 +1,105 @@
+"""
+Response Cache - Reuse Gemini output for repeated low-temperature prompts
+=========================================================================
+
+Agents opt in with `cache_responses = True`. The key is a hash of the
+agent's model settings, the system prompt, the per-call context and the
+last `cache_history_window` messages, with whitespace and case
+normalized, so near-identical calls (same category, same therapist list)
+skip the Gemini round trip.
+
+Only real model output is stored - blocked or failed calls fall back
+without touching the cache. Sessions on the "no_records" privacy tier
+neither read from nor write to it.
+
+RESPONSE_CACHE_MAX_ENTRIES: LRU bound (default: 1000, 0 disables the cache)
+RESPONSE_CACHE_TTL_SECONDS: lifetime of an entry (default: 600)
+"""
+
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+
+
+# Privacy tiers whose conversations must not be retained anywhere
+NO_RETENTION_TIERS = {"no_records"}
+
+_cache = None
+stores = 0
+bypassed = 0
+
+
+def _get_cache():
+    """Create the LRU on first use"""
+    global _cache
+    if _cache is None:
+        # Imported here: the storage package imports agents.base_agent
+        from storage.lru_cache import LRUCache
+
+        ttl_seconds = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+        _cache = LRUCache(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+            ttl_seconds=ttl_seconds or None
+        )
+    return _cache
+
+
+def is_enabled() -> bool:
+    return _get_cache().max_entries != 0
+
+
+def allows_caching(agent_data: Dict[str, Any]) -> bool:
+    """False for sessions whose privacy tier forbids keeping their content"""
+    tier = agent_data.get("privacy_tier") or agent_data.get("selected_privacy_tier")
+    return tier not in NO_RETENTION_TIERS
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").split()).casefold()
+
+
+def make_key(
+    model_settings: List[Any],
+    system_prompt: str,
+    context: Optional[str],
+    history: List[Dict[str, str]]
+) -> str:
+    """Stable hash of everything that shapes the response"""
+    payload = json.dumps(
+        {
+            "model": model_settings,
+            "system": _normalize(system_prompt),
+            "context": _normalize(context),
+            "history": [[msg["role"], _normalize(msg["content"])] for msg in history],
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    return _get_cache().get(key)
+
+
+def put(key: str, text: str) -> None:
+    global stores
+    _get_cache().set(key, text)
+    stores += 1
+
+
+def record_bypass() -> None:
+    global bypassed
+    bypassed += 1
+
+
+def stats() -> Dict[str, Any]:
+    """Cache contents and hit rate for the metrics endpoint"""
+    cache = _get_cache()
+    lookups = cache.hits + cache.misses
+    return {
+        **cache.stats(),
+        "stores": stores,
+        "privacy_bypassed": bypassed,
+        "hit_rate": round(cache.hits / lookups, 3) if lookups else 0.0,
+    }
@@ -0,0 +1,333 @@
+"""
+Risk Scorer - Local first-stage crisis screen
+=============================================
+
+Scores the user's messages on the CPU before the crisis assessment, so
+clear emergencies don't wait for a Gemini call:
+- weighted lexicons per risk level give one feature each
+- a small linear model (logistic regression over those features, trained
+  offline by scripts/train_risk_scorer.py) turns them into the probability
+  that the conversation needs at least a MODERATE assessment
+
+Immediate-level phrases are attributed per clause (split on punctuation
+and conjunctions):
+- intent: the user speaking about themselves now - the phrase is about
+  "myself"/"my life", or the clause has "I" and names no one else
+- reported: quoted text, a clause with a past marker ("used to", "years
+  ago"), or one about someone or something else ("my brother", "a
+  movie") - counted as MODERATE evidence instead
+- unattributed: anything else ("feeling suicidal lately")
+
+The verdict is one of:
+- settled IMMEDIATE: a first-person intent or plan ("I have pills saved
+  up", "I'm going to end my life")
+- anything else: the LLM assesses it; the scorer's floor level is applied
+  afterwards, so the screen can escalate the LLM's level but never lower it
+  (HIGH for unattributed immediate phrases or strong high-level language)
+
+Lower levels are never settled locally: a lexicon only knows the phrases
+it lists, and finding none of them says nothing about what the user
+actually wrote. Feature weights are non-negative, so mild words can't
+cancel risk language either.
+
+Lexicons, weights and thresholds live in RISK_MODEL_PATH; without that
+file every assessment goes to the LLM.
+scripts/evaluate_risk_scorer.py reports recall per level on a labeled set.
+
+LOCAL_RISK_SCREEN: use the scorer (default: true)
+RISK_MODEL_PATH: model file (default: data/risk_model.json)
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json
+import math
+import os
+import re
+import time
+
+from .keywords import KeywordMatcher, normalize
+
+
+LEVELS = ["none", "low", "moderate", "high", "immediate"]
+FEATURES = ["immediate", "high", "moderate", "low"]
+
+ENABLED = os.getenv("LOCAL_RISK_SCREEN", "true").lower() == "true"
+MODEL_PATH = Path(os.getenv(
+    "RISK_MODEL_PATH",
+    str(Path(__file__).parent.parent / "data" / "risk_model.json")
+))
+
+_model: Optional["RiskModel"] = None
+_loaded = False
+
+# Metrics
+_scored = 0
+_settled = {level: 0 for level in LEVELS}
+_deferred = 0
+_escalated = 0
+_score_seconds = 0.0
+
+
+# Quoted spans (double quotes, or single quotes not part of a contraction)
+QUOTED = re.compile(r'"[^"]*"|“[^”]*”' + r"|(?<!\w)'[^']*'(?!\w)")
+SENTENCE_BREAK = re.compile(r"[.!?;]+")
+CLAUSE_BREAK = re.compile(r"[,:]+|\b(?:and|but|because|cause|since|so|though|although|after)\b")
+FIRST_PERSON = "i"
+SELF_REFERENCE = re.compile(r"\b(?:myself|my|me)\b")
+
+
+def level_index(level: str) -> int:
+    return LEVELS.index(level)
+
+
+class RiskVerdict:
+    """Outcome of the local screen for one conversation"""
+
+    __slots__ = ("level", "settled", "floor", "probability", "category", "features", "matches")
+
+    def __init__(
+        self,
+        level: str,
+        settled: bool,
+        floor: str,
+        probability: float,
+        category: str,
+        features: Dict[str, float],
+        matches: List[str]
+    ):
+        self.level = level              # Settled level, or the floor when ambiguous
+        self.settled = settled          # True = no LLM call needed
+        self.floor = floor              # Lowest level the final assessment may have
+        self.probability = probability  # P(at least moderate)
+        self.category = category        # Counselor category guessed from topic words
+        self.features = features
+        self.matches = matches
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "level": self.level,
+            "settled": self.settled,
+            "floor": self.floor,
+            "probability": round(self.probability, 4),
+            "category": self.category,
+            "matches": self.matches,
+        }
+
+
+class RiskModel:
+    """Lexicons plus linear weights, as stored in the model file"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        # feature -> {phrase as matched: weight}
+        self.lexicons: Dict[str, Dict[str, float]] = {
+            feature: {
+                normalize(phrase).rstrip("*"): float(weight)
+                for phrase, weight in spec["lexicons"].get(feature, {}).items()
+            }
+            for feature in FEATURES
+        }
+        self.weights: Dict[str, float] = dict(spec["weights"])
+        for feature in FEATURES:
+            if self.weights.get(feature, 0.0) < 0:
+                # Totals never decay, so a negative weight would cancel risk for good
+                print(f"⚠️  Risk scorer: negative weight for {feature} clamped to 0")
+                self.weights[feature] = 0.0
+        self.thresholds: Dict[str, float] = spec["thresholds"]
+        self.categories: Dict[str, List[str]] = spec.get("categories", {})
+
+        attribution = spec.get("attribution", {})
+        self._past = self._any_of(attribution.get("past", []))
+        # Who a clause can be about: the user or someone/something else
+        self._subjects = self._any_of([FIRST_PERSON] + attribution.get("others", []))
+
+        # One automaton for the level lexicons and the category words
+        vocabulary = {feature: list(spec["lexicons"].get(feature, {})) for feature in FEATURES}
+        vocabulary.update({f"category:{c}": words for c, words in self.categories.items()})
+        self._matcher = KeywordMatcher(vocabulary)
+
+    @staticmethod
+    def _any_of(markers: List[str]) -> Optional["re.Pattern"]:
+        if not markers:
+            return None
+        return re.compile(r"\b(?:" + "|".join(re.escape(normalize(m)) for m in markers) + r")\b")
+
+    def _clauses(self, text: str) -> Iterator[Tuple[str, bool, Optional[str]]]:
+        """
+        (clause, is reported speech, subject carried over from the sentence's
+        earlier clauses) for a normalized message
+        """
+        for quoted in QUOTED.findall(text):
+            yield quoted, True, None
+        for sentence in SENTENCE_BREAK.split(QUOTED.sub(" ", text)):
+            subject = None
+            for clause in CLAUSE_BREAK.split(sentence):
+                yield clause, bool(self._past and self._past.search(clause)), subject
+                subjects = self._subjects.findall(clause)
+                if subjects:
+                    subject = subjects[-1]
+
+    def _attribute(self, phrase: str, clause: str, reported: bool, inherited: Optional[str]) -> str:
+        """Who an immediate-level phrase is about: intent, reported or unattributed"""
+        if reported:
+            return "reported"
+        if SELF_REFERENCE.search(phrase):
+            return "intent"
+        # The nearest subject before the phrase, else the clause's, else the sentence's
+        position = max(clause.find(phrase), 0)
+        before = self._subjects.findall(clause, 0, position)
+        after = self._subjects.findall(clause, position)
+        subject = before[-1] if before else (after[0] if after else inherited)
+        if subject is None:
+            return "unattributed"
+        return "intent" if subject == FIRST_PERSON else "reported"
+
+    def extract(self, text: str) -> Dict[str, Any]:
+        """
+        Features of one message: lexicon weight per level (each phrase
+        counted once), the phrases matched per level, the first-person
+        intent phrases and topic-word hits per category.
+        """
+        text = normalize(text)
+        values = {feature: 0.0 for feature in FEATURES}
+        phrases: Dict[str, List[str]] = {}
+        intent: List[str] = []
+        found = set()
+        for clause, reported, inherited in self._clauses(text):
+            for feature, phrase in self._matcher.matches(clause):
+                if feature == "immediate":
+                    who = self._attribute(phrase, clause, reported, inherited)
+                    if who == "reported":
+                        # Someone else's, past or quoted: serious, but not the user's plan
+                        feature = "moderate"
+                    elif who == "intent" and phrase not in intent:
+                        intent.append(phrase)
+                found.add((feature, phrase))
+
+        for feature, phrase in sorted(m for m in found if m[0] in values):
+            weight = self.lexicons[feature].get(phrase, self.lexicons["immediate"].get(phrase, 0.0))
+            values[feature] += weight
+            phrases.setdefault(feature, []).append(phrase)
+        categories = Counter(label.split(":", 1)[1] for label, _ in found if label.startswith("category:"))
+        return {"values": values, "phrases": phrases, "intent": intent, "categories": dict(categories)}
+
+    def features(self, texts: List[str]) -> Dict[str, Any]:
+        """Conversation features: per-message features summed over texts"""
+        values = {feature: 0.0 for feature in FEATURES}
+        matches: List[str] = []
+        intent: List[str] = []
+        category_hits: Counter = Counter()
+        for text in texts:
+            extracted = self.extract(text)
+            for feature in FEATURES:
+                values[feature] += extracted["values"][feature]
+                matches.extend(f"{feature}:{phrase}" for phrase in extracted["phrases"].get(feature, []))
+            intent.extend(extracted["intent"])
+            category_hits.update(extracted["categories"])
+        return {
+            "values": values,
+            "matches": matches,
+            "intent": intent,
+            "category": self.best_category(category_hits),
+        }
+
+    def best_category(self, hits: Dict[str, int]) -> str:
+        """Category with the most topic-word hits (general if none)"""
+        category, best_hits = "general", 0
+        for name in self.categories:
+            if hits.get(name, 0) > best_hits:
+                category, best_hits = name, hits[name]
+        return category
+
+    def probability(self, values: Dict[str, float]) -> float:
+        z = self.weights.get("bias", 0.0) + sum(self.weights.get(f, 0.0) * values[f] for f in FEATURES)
+        return 1.0 / (1.0 + math.exp(-max(-60.0, min(60.0, z))))
+
+    def score(self, texts: List[str]) -> RiskVerdict:
+        return self.decide(self.features(texts))
+
+    def decide(self, features: Dict[str, Any]) -> RiskVerdict:
+        """Verdict for conversation features (as returned by features())"""
+        values = features["values"]
+        matches = features["matches"]
+        category = features["category"]
+        p = self.probability(values)
+        t = self.thresholds
+
+        if sum(self.lexicons["immediate"][phrase] for phrase in features.get("intent", ())) >= t["settle_immediate"]:
+            return RiskVerdict("immediate", True, "immediate", p, category, values, matches)
+
+        # Everything below IMMEDIATE goes to the LLM, with a floor
+        if values["immediate"] > 0 or values["high"] >= t["high_floor"]:
+            floor = "high"
+        elif p >= t["moderate_floor"]:
+            floor = "moderate"
+        else:
+            floor = "none"
+        return RiskVerdict(floor, False, floor, p, category, values, matches)
+
+
+def load(path: Path = MODEL_PATH) -> Optional[RiskModel]:
+    try:
+        with open(path) as f:
+            return RiskModel(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Risk scorer model not loaded ({e}) - all assessments go to the LLM")
+        return None
+
+
+def get_model() -> Optional[RiskModel]:
+    global _model, _loaded
+    if not _loaded:
+        _model = load()
+        _loaded = True
+    return _model
+
+
+def screen(features: Optional[Dict[str, Any]]) -> Optional[RiskVerdict]:
+    """
+    Decide on conversation features (see agents.risk_state.features).
+
+    Returns:
+        RiskVerdict, or None when the screen is disabled or has no model
+    """
+    global _scored, _deferred, _score_seconds
+    if not ENABLED or features is None:
+        return None
+    model = get_model()
+    if model is None:
+        return None
+
+    started = time.perf_counter()
+    verdict = model.decide(features)
+    _score_seconds += time.perf_counter() - started
+    _scored += 1
+    if verdict.settled:
+        _settled[verdict.level] += 1
+    else:
+        _deferred += 1
+    return verdict
+
+
+def apply_floor(level: str, verdict: Optional[RiskVerdict]) -> str:
+    """Raise an LLM-assessed level to the screen's floor (never lowers it)"""
+    global _escalated
+    if verdict is None or level_index(verdict.floor) <= level_index(level):
+        return level
+    _escalated += 1
+    print(f"⬆️  Risk screen raised assessed level {level} -> {verdict.floor}")
+    return verdict.floor
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "enabled": ENABLED,
+        "model_loaded": _model is not None,
+        "scored": _scored,
+        "settled": dict(_settled),
+        "deferred_to_llm": _deferred,
+        "escalated": _escalated,
+        "avg_score_us": round(_score_seconds / _scored * 1e6, 1) if _scored else 0.0,
+    }
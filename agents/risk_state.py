@@ -0,0 +1,212 @@
+"""
+Risk State - Running crisis risk accumulator per session
+========================================================
+
+Each incoming user message is scored once, with the risk screen's
+lexicons (see agents.risk_scorer), and folded into
+agent_data["risk_state"]:
+- scores: per indicator class (immediate/high/moderate/low), decayed on
+  every user turn so recent signals weigh more than old ones
+- totals: undecayed sums - the conversation features the screen decides
+  on, so an earlier disclosure keeps its full weight (feature weights are
+  non-negative, so later mild words can only add to the risk)
+- evidence: the latest turns (1-based user turn numbers) and phrases that
+  triggered each class
+- intent: the same for first-person intent or plan phrases (the only
+  evidence the screen settles on)
+- cleared: totals and turn as of the last crisis assessment (see
+  mark_assessed()) - evidence the assessment already weighed stops
+  driving the screen's floor
+- categories: topic-word hits per counselor category
+
+Signals spread over several turns are kept even though each keyword
+check only sees the latest message, and readers (coordinator, intake,
+crisis stage) get them in O(1) instead of rescanning the history. The
+crisis prompt receives describe()'s compact evidence instead of the
+replayed transcript.
+
+The coordinator calls update() at the start of every turn; messages
+already folded in are skipped, so calling it again is harmless.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+import time
+
+from . import keywords
+from . import risk_scorer
+
+
+STATE_KEY = "risk_state"
+
+CLASSES = risk_scorer.FEATURES
+
+# Per-turn decay of each class's score - the most severe signals fade slowest
+DECAY = {"immediate": 0.9, "high": 0.8, "moderate": 0.7, "low": 0.5}
+
+# Evidence entries kept per class
+EVIDENCE_PER_CLASS = 3
+
+# Scores below this are left out of describe()
+DESCRIBE_MIN_SCORE = 0.05
+
+# Metrics
+_messages_scored = 0
+_update_seconds = 0.0
+
+
+def _empty() -> Dict[str, Any]:
+    return {
+        "messages_seen": 0,     # Messages in state.messages already examined
+        "turn": 0,              # User messages folded in
+        "scores": {c: 0.0 for c in CLASSES},
+        "totals": {c: 0.0 for c in CLASSES},
+        "evidence": {c: [] for c in CLASSES},
+        "intent": [],
+        "last_turn": {},
+        "categories": {},
+        "cleared": None,
+    }
+
+
+def get(agent_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Current risk state (empty if no message was scored yet)"""
+    return agent_data.get(STATE_KEY) or _empty()
+
+
+def _extract(text: str) -> Dict[str, Any]:
+    model = risk_scorer.get_model()
+    if model is not None:
+        return model.extract(text)
+    # No model file: the shared crisis keywords still count as immediate
+    immediate = "crisis" in keywords.scan(text)
+    return {
+        "values": {c: 1.0 if c == "immediate" and immediate else 0.0 for c in CLASSES},
+        "phrases": {"immediate": ["crisis keyword"]} if immediate else {},
+        "intent": [],
+        "categories": {},
+    }
+
+
+def update(state) -> Dict[str, Any]:
+    """Fold the user messages added since the last call into the risk state"""
+    global _messages_scored, _update_seconds
+    risk = state.agent_data.get(STATE_KEY)
+    if risk is None or risk["messages_seen"] > len(state.messages):
+        risk = _empty()
+
+    new_messages = state.messages[risk["messages_seen"]:]
+    if not new_messages:
+        return risk
+
+    started = time.perf_counter()
+    for msg in new_messages:
+        if msg.role != "user":
+            continue
+        risk["turn"] += 1
+        turn = risk["turn"]
+        extracted = _extract(msg.content)
+
+        for c in CLASSES:
+            value = extracted["values"][c]
+            risk["scores"][c] = round(risk["scores"][c] * DECAY[c] + value, 4)
+            risk["totals"][c] = round(risk["totals"][c] + value, 4)
+            phrases = extracted["phrases"].get(c)
+            if phrases:
+                risk["evidence"][c] = (risk["evidence"][c] + [[turn, phrases]])[-EVIDENCE_PER_CLASS:]
+                risk["last_turn"][c] = turn
+
+        if extracted["intent"]:
+            risk["intent"] = (risk["intent"] + [[turn, extracted["intent"]]])[-EVIDENCE_PER_CLASS:]
+
+        for category, hits in extracted["categories"].items():
+            risk["categories"][category] = risk["categories"].get(category, 0) + hits
+        _messages_scored += 1
+
+    risk["messages_seen"] = len(state.messages)
+    state.agent_data[STATE_KEY] = risk
+    _update_seconds += time.perf_counter() - started
+    return risk
+
+
+def seen_within(agent_data: Dict[str, Any], classes: Iterable[str], turns: int) -> bool:
+    """Whether any of the classes was triggered in the last `turns` user turns"""
+    risk = get(agent_data)
+    return any(
+        c in risk["last_turn"] and risk["turn"] - risk["last_turn"][c] < turns
+        for c in classes
+    )
+
+
+def mark_assessed(agent_data: Dict[str, Any]) -> None:
+    """
+    Record that a crisis assessment weighed the evidence so far.
+
+    Later screens only count what arrives after it, so a mention the
+    assessment judged lower doesn't hold every later turn at its floor.
+    """
+    risk = agent_data.get(STATE_KEY)
+    if risk is not None:
+        risk["cleared"] = {"turn": risk["turn"], "totals": dict(risk["totals"])}
+
+
+def features(agent_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Conversation features for risk_scorer.screen (None without a model).
+
+    Built from the undecayed totals since the last assessment: a disclosure
+    doesn't fade from the screen's decision after a few calmer turns
+    (decay only orders the evidence in describe()), but one an assessment
+    already weighed stops counting.
+    """
+    model = risk_scorer.get_model()
+    if model is None:
+        return None
+    risk = get(agent_data)
+    cleared = risk.get("cleared") or {"turn": 0, "totals": {}}
+    since = cleared["turn"]
+    matches: List[str] = [
+        f"{c}:{phrase}"
+        for c in CLASSES
+        for turn, phrases in risk["evidence"][c] if turn > since
+        for phrase in phrases
+    ]
+    return {
+        "values": {
+            c: round(max(0.0, risk["totals"][c] - cleared["totals"].get(c, 0.0)), 4)
+            for c in CLASSES
+        },
+        "matches": matches,
+        "intent": [phrase for turn, phrases in risk.get("intent", []) if turn > since for phrase in phrases],
+        "category": model.best_category(risk["categories"]),
+    }
+
+
+def describe(agent_data: Dict[str, Any]) -> str:
+    """Compact evidence for a prompt, one line per active indicator class"""
+    risk = get(agent_data)
+    lines = []
+    for c in CLASSES:
+        score = risk["scores"][c]
+        if score < DESCRIBE_MIN_SCORE:
+            continue
+        evidence = "; ".join(
+            f"turn {turn}: " + ", ".join(f'"{phrase}"' for phrase in phrases)
+            for turn, phrases in risk["evidence"][c]
+        )
+        lines.append(f"- {c.upper()} indicators (score {score:.2f}): {evidence}")
+    if risk.get("intent"):
+        evidence = "; ".join(
+            f"turn {turn}: " + ", ".join(f'"{phrase}"' for phrase in phrases)
+            for turn, phrases in risk["intent"]
+        )
+        lines.append(f"- First-person intent or plan: {evidence}")
+    if not lines:
+        return f"No risk indicators detected in {risk['turn']} user messages."
+    return f"Risk indicators across {risk['turn']} user messages (most recent weigh more):\n" + "\n".join(lines)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "messages_scored": _messages_scored,
+        "avg_update_us": round(_update_seconds / _messages_scored * 1e6, 1) if _messages_scored else 0.0,
+    }
@@ -15,6 +15,12 @@ from datetime import datetime
 import uuid
 import os
 from .base_agent import BaseAgent, AgentState
+from . import keywords
+from . import speculation
+
+
+# Groups named in the signup offer
+MAX_GROUPS_LISTED = 3
 
 
 class SchedulingAgent(BaseAgent):
@@ -63,8 +69,7 @@ class SchedulingAgent(BaseAgent):
             last_message = self.get_last_user_message(state)
             if last_message:
                 # Check if user wants to join
-                affirmative_words = ["yes", "sure", "okay", "ok", "join", "sign up", "interested", "sounds good"]
-                wants_to_join = any(word in last_message.lower() for word in affirmative_words)
+                wants_to_join = "scheduling:join" in keywords.scan(last_message)
 
                 if wants_to_join:
                     print(f"✅ User wants to join support group")
@@ -86,17 +91,28 @@ class SchedulingAgent(BaseAgent):
         selected_category = state.agent_data.get("selected_category") or \
                           state.agent_data.get("suggested_category", "general")
 
+        # Groups with open spots, listed in the background once the category
+        # was known (see agents.speculation)
+        precomputed = speculation.take(state, "groups", selected_category)
+        groups = precomputed["groups"] if precomputed else []
+        if groups:
+            state.agent_data["available_support_groups"] = groups
+
         # Present support group signup
-        response_text = self._format_support_group_offer(selected_category)
+        response_text = self._format_support_group_offer(selected_category, groups)
         state = self.add_message(state, "assistant", response_text)
         state.agent_data["scheduling_presented"] = True
 
         print("✅ Support group option presented")
         return state
 
-    def _format_support_group_offer(self, category: str) -> str:
+    def _format_support_group_offer(self, category: str, groups: Optional[List[dict]] = None) -> str:
         """Format support group signup offer"""
         category_display = category.title()
+        upcoming = "".join(
+            f"• {g['name']} - {g['meeting_time']}\n" for g in (groups or [])[:MAX_GROUPS_LISTED]
+        )
+        groups_section = f"**Groups with open spots:**\n{upcoming}\n" if upcoming else ""
 
         response = (
             f"While you're connecting with your {category_display} specialist, "
@@ -108,6 +124,8 @@ class SchedulingAgent(BaseAgent):
             f"• Get support between your therapy sessions\n"
             f"• Completely anonymous - use any name you like\n\n"
 
+            f"{groups_section}"
+
             f"Support groups meet weekly via video chat. "
             f"Would you like me to add you to the waitlist?"
         )
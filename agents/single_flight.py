@@ -0,0 +1,86 @@
+"""
+Single Flight - Coalesce identical in-flight calls
+==================================================
+
+When several sessions send an equivalent cacheable prompt (the same
+greeting, the same resource question) before the first answer reaches the
+response cache, the duplicates await the first call's result instead of
+starting more Gemini requests. Calls are keyed by their response cache
+key, so prompts that may not be cached (No Records sessions, uncached
+agents) never share a call.
+
+The shared call runs in its own task. Each caller can still be cancelled
+on its own; the call itself is only cancelled once nobody is waiting for
+it any more.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+import asyncio
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Group of keyed calls where concurrent duplicates share one execution"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+        # Metrics
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() unless a call with the same key is already in flight.
+
+        Returns:
+            (result, shared) - shared is True if another caller started the call
+
+        Raises:
+            Whatever fn() raised, for every caller awaiting it
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Last caller gave up - stop the shared call too
+                self.abandoned += 1
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
+
+
+# Gemini generations, keyed by response cache key
+generations = SingleFlight()
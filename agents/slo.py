@@ -0,0 +1,70 @@
+"""
+SLO Histogram - Latency distribution against a target
+=====================================================
+
+Fixed-bucket latency histogram (cumulative "le" counts, as Prometheus
+reports them) plus the share of observations within an SLO target.
+Percentiles are estimated as the upper bound of the bucket they fall in
+(capped at the largest observation).
+"""
+
+from typing import Any, Dict, Sequence
+import bisect
+
+
+# Upper bounds in seconds; anything slower lands in the overflow bucket
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0)
+
+
+class LatencyHistogram:
+    """Latency observations for one operation"""
+
+    def __init__(self, target_seconds: float, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.target_seconds = target_seconds
+        self.buckets = sorted(buckets)
+        # counts[i] = observations in (buckets[i-1], buckets[i]]; last one is overflow
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.within_target = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if seconds <= self.target_seconds:
+            self.within_target += 1
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th observation (0 if empty)"""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            buckets[f"le_{bound * 1000:g}ms"] = cumulative
+        buckets["le_inf"] = self.count
+
+        return {
+            "target_ms": round(self.target_seconds * 1000),
+            "count": self.count,
+            "within_target": self.within_target,
+            "within_target_ratio": round(self.within_target / self.count, 4) if self.count else 1.0,
+            "avg_ms": round(self.total_seconds / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "buckets": buckets,
+        }
@@ -0,0 +1,250 @@
+"""
+Speculation - Precompute downstream stages once the category is known
+=====================================================================
+
+Therapist matching, the support-group list and the habit selection only
+depend on the counselor category, yet each used to wait for its own turn
+(and the matching prose for its own Gemini round trip) after the user
+confirmed. As soon as the Crisis Agent stores suggested_category, the
+coordinator starts one background task that builds every part still
+ahead of the session, concurrently:
+- "resource": therapist shortlist plus the recommendation prose
+- "groups": support groups with open spots
+- "habit": habit library selection plus the tracker message
+
+Parts are computed on a snapshot of the state and are JSON-serializable.
+Like the conversation summary (see agents.memory), the result waits in a
+bounded pending table and is applied to agent_data["speculative"] at the
+start of the session's next turn, with its lock held.
+
+A stage uses its part through take(), which checks the category the
+session is on now (selected_category, else suggested_category). If the
+user picked another category, the whole speculation is thrown away and
+the stage computes its result as before; the coordinator then speculates
+again for the new category. A stage that has to compute its part itself
+(the user moved on before the result was applied) cancels that part's
+background job, so the same Gemini call doesn't run twice.
+
+SPECULATIVE_PRECOMPUTE: start background precomputation (default: true)
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import contextvars
+import os
+import time
+
+from . import deadline
+
+
+STATE_KEY = "speculative"
+
+ENABLED = os.getenv("SPECULATIVE_PRECOMPUTE", "true").lower() == "true"
+
+# part name -> coroutine building it from (state snapshot, category); None = nothing to offer
+Job = Callable[[Any, str], Awaitable[Optional[Dict[str, Any]]]]
+
+# session_id -> (category, in-flight task)
+_tasks: Dict[str, Tuple[str, asyncio.Task]] = {}
+# session_id -> part name -> task building it, while _tasks[session_id] runs
+_parts: Dict[str, Dict[str, asyncio.Task]] = {}
+# session_id -> {"category": str, "parts": {...}}, waiting for the next turn
+_pending = None
+
+# Metrics
+_started = 0
+_applied = 0
+_discarded = 0
+_cancelled = 0
+_failures = 0
+_builds = 0
+_used: Dict[str, int] = {}
+_build_seconds = 0.0
+
+
+def _get_pending():
+    """Create the pending-results LRU on first use"""
+    global _pending
+    if _pending is None:
+        # Imported here: the storage package imports agents.base_agent
+        from storage.lru_cache import LRUCache
+
+        _pending = LRUCache(max_entries=10000, ttl_seconds=3600)
+    return _pending
+
+
+def category_of(agent_data: Dict[str, Any]) -> Optional[str]:
+    """Category the session is on now (None before the crisis assessment)"""
+    return agent_data.get("selected_category") or agent_data.get("suggested_category")
+
+
+def schedule(state, jobs: Dict[str, Job]) -> Optional[asyncio.Task]:
+    """
+    Start precomputing the given parts for the session's category.
+
+    Call at the end of a turn. Does nothing before a category is known or
+    when this category was already speculated on; an in-flight run for a
+    previous category is cancelled.
+    """
+    global _started, _cancelled
+
+    session_id = state.session_id
+    category = category_of(state.agent_data)
+    if not ENABLED or not session_id or not category or not jobs:
+        return None
+
+    stored = state.agent_data.get(STATE_KEY)
+    if stored and stored["category"] == category:
+        return None
+    pending = _get_pending().peek(session_id)
+    if pending and pending["category"] == category:
+        return None
+
+    running = _tasks.get(session_id)
+    if running:
+        if running[0] == category:
+            return None
+        running[1].cancel()
+        _cancelled += 1
+
+    snapshot = state.model_copy(deep=True)
+    # Own context: no request deadline or event stream is inherited from this turn
+    task = asyncio.create_task(_run(session_id, category, snapshot, jobs), context=contextvars.Context())
+    _tasks[session_id] = (category, task)
+    task.add_done_callback(lambda done: _untrack(session_id, done))
+    _started += 1
+    print(f"🔮 Precomputing {', '.join(jobs)} for category {category}")
+    return task
+
+
+def _untrack(session_id: str, task: asyncio.Task) -> None:
+    running = _tasks.get(session_id)
+    if running is not None and running[1] is task:
+        del _tasks[session_id]
+        _parts.pop(session_id, None)
+
+
+async def _run(session_id: str, category: str, snapshot, jobs: Dict[str, Job]) -> None:
+    global _builds, _failures, _build_seconds
+
+    started = time.perf_counter()
+    with deadline.scope():
+        tasks = {name: asyncio.create_task(job(snapshot, category)) for name, job in jobs.items()}
+        _parts[session_id] = tasks
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    _build_seconds += time.perf_counter() - started
+    _builds += 1
+
+    parts: Dict[str, Any] = {}
+    for name, result in zip(jobs, results):
+        if isinstance(result, asyncio.CancelledError):
+            # The stage computed this part itself (see take())
+            continue
+        if isinstance(result, Exception):
+            _failures += 1
+            print(f"❌ Precomputing {name} failed for {session_id}: {result}")
+        elif result is not None:
+            parts[name] = result
+
+    if parts:
+        _get_pending().set(session_id, {"category": category, "parts": parts})
+
+
+def apply_pending(state) -> bool:
+    """
+    Store a finished precomputation in the state.
+
+    Call at the start of a turn, with the session's lock held.
+
+    Returns:
+        True if a result was stored
+    """
+    global _applied, _discarded
+
+    if not state.session_id:
+        return False
+    result = _get_pending().pop(state.session_id)
+    if result is None:
+        return False
+
+    if result["category"] != category_of(state.agent_data):
+        # The user moved to another category meanwhile
+        _discarded += 1
+        return False
+
+    state.agent_data[STATE_KEY] = result
+    _applied += 1
+    return True
+
+
+def take(state, part: str, category: str) -> Optional[Dict[str, Any]]:
+    """
+    Use a precomputed part (once) if it was built for this category.
+
+    A speculation for another category is discarded entirely. Without a
+    usable part the caller computes it itself, so the part is no longer
+    built in the background.
+    """
+    global _discarded
+
+    stored = state.agent_data.get(STATE_KEY)
+    if stored and stored["category"] != category:
+        print(f"🗑️  Discarding precomputed {', '.join(stored['parts']) or 'results'} for {stored['category']}")
+        state.agent_data.pop(STATE_KEY)
+        _discarded += 1
+    elif stored:
+        value = stored["parts"].pop(part, None)
+        if value is not None:
+            _used[part] = _used.get(part, 0) + 1
+            return value
+
+    if state.session_id:
+        _abandon(state.session_id, part, category)
+    return None
+
+
+def _abandon(session_id: str, part: str, category: str) -> None:
+    """Stop building a part the session's stage computes itself"""
+    global _cancelled
+
+    pending = _get_pending().peek(session_id)
+    if pending and pending["category"] == category:
+        pending["parts"].pop(part, None)
+
+    running = _tasks.get(session_id)
+    if running is None:
+        return
+    if running[0] != category:
+        # Built for a category the user left; schedule() restarts it at turn end
+        running[1].cancel()
+        _cancelled += 1
+        return
+    task = _parts.get(session_id, {}).get(part)
+    if task is not None and not task.done():
+        print(f"✂️  Cancelling background {part} for {session_id} - computed in the turn")
+        task.cancel()
+        _cancelled += 1
+
+
+def forget(session_id: str) -> None:
+    """Drop in-flight and pending precomputation of a deleted session"""
+    running = _tasks.pop(session_id, None)
+    _parts.pop(session_id, None)
+    if running is not None:
+        running[1].cancel()
+    _get_pending().pop(session_id)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "enabled": ENABLED,
+        "in_flight": len(_tasks),
+        "pending": len(_get_pending()),
+        "started": _started,
+        "applied": _applied,
+        "used": dict(_used),
+        "discarded": _discarded,
+        "cancelled": _cancelled,
+        "failures": _failures,
+        "avg_build_ms": round(_build_seconds / _builds * 1000, 2) if _builds else 0.0,
+    }
@@ -16,6 +16,7 @@ Powered by: Gemini 2.0 Flash (fast matching with smart recommendations)
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from .base_agent import BaseAgent, AgentState
+from .rate_limiter import Priority
 from enum import Enum
 
 
@@ -73,6 +74,11 @@ class SupportGroupAgent(BaseAgent):
     - Provide personalized recommendations
     """
 
+    # Recommendations for the same category and group list repeat often
+    cache_responses = True
+    # Can wait behind conversation and crisis calls
+    priority = Priority.BACKGROUND
+
     def __init__(self):
         super().__init__(
             agent_name="Support Group Coordinator",
@@ -147,23 +153,37 @@ Keep recommendations concise (2-3 sentences per group)."""
             )
         else:
             # Build context for AI recommendation
-            groups_context = self._format_groups_for_ai(available_groups)
-            
-            context = f"""Here are the available support groups for {selected_category}:
-
-{groups_context}
+            context = f"""Based on the user's conversation, recommend the 2-3 BEST matches from the support groups below and explain why each would be a good fit.
+Be concise but personal.
 
-Based on the user's conversation, recommend the 2-3 BEST matches and explain why each would be a good fit.
-Be concise but personal."""
+Here are the available support groups for {selected_category}:"""
 
-            # Generate personalized recommendation
-            response_text = self.generate_response(state, context)
+            # Generate personalized recommendation (one retrieved entry per group)
+            response_text = await self.agenerate_response(
+                state,
+                context,
+                retrieved=[self._format_groups_for_ai([g]) for g in available_groups]
+            )
         
         # Add response to state
         state = self.add_message(state, "assistant", response_text)
 
         # Store matched groups in state
-        state.agent_data["available_support_groups"] = [
+        state.agent_data["available_support_groups"] = self._group_summaries(available_groups)
+        
+        state.agent_data["support_group_matching_complete"] = True
+
+        print(f"✅ Matched {len(available_groups)} support groups")
+
+        return state
+
+    async def precompute(self, state: AgentState, category: str) -> Optional[Dict[str, Any]]:
+        """Groups with open spots for a category (see agents.speculation)"""
+        return {"groups": self._group_summaries(self._get_available_groups(category))}
+
+    def _group_summaries(self, groups: List[SupportGroup]) -> List[Dict[str, Any]]:
+        """Groups as stored in agent_data["available_support_groups"]"""
+        return [
             {
                 "id": g.id,
                 "name": g.name,
@@ -174,14 +194,8 @@ Be concise but personal."""
                 "current_members": g.current_members,
                 "description": g.description
             }
-            for g in available_groups
+            for g in groups
         ]
-        
-        state.agent_data["support_group_matching_complete"] = True
-
-        print(f"✅ Matched {len(available_groups)} support groups")
-
-        return state
 
     def _get_available_groups(self, category: str) -> List[SupportGroup]:
         """
@@ -0,0 +1,27 @@
+"""
+Token Estimates - Local prompt size accounting
+==============================================
+
+Gemini bills and schedules by tokens, but counting them exactly needs a
+network call. For budgeting prompts a local estimate is enough: words
+cost about one token per 4 characters and every punctuation mark or
+symbol is a token of its own, which tracks the SentencePiece tokenizer
+within a few percent on English chat text.
+"""
+
+import re
+
+
+CHARS_PER_TOKEN = 4
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a piece of text"""
+    if not text:
+        return 0
+    return sum(
+        (len(piece) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+        for piece in _PIECES.findall(text)
+    )
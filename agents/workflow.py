@@ -0,0 +1,194 @@
+"""
+Workflow - Declarative stage table for the coordinator
+======================================================
+
+The session's journey is described as data instead of if-chains:
+- stages, in order, each handled by one agent and finished once its done
+  guard holds; a stage whose skip guard holds is passed over
+- transitions out of a stage, checked before the stage order: when their
+  guard holds the listed flags are reset and the target stage is entered
+  directly - re-entry (back to resource matching from the support-group
+  step) or preemption (the crisis fast lane, from any stage)
+
+Guards are named predicates over agent_data and the labels matched in the
+user's newest message (see agents.keywords), so the table can be exported
+with table() and checked in tests.
+
+The table is compiled once: stage order into a tuple and transitions into
+a dict keyed by source stage, so each turn costs one lookup for the
+current stage's transitions plus a walk over the (few) stages.
+
+Adding an agent means adding a Stage here and a handler in the
+coordinator's dispatch table.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+STAGE_KEY = "workflow_stage"
+ANY = "*"
+
+
+class Guard:
+    """Named predicate over (agent_data, message labels)"""
+
+    __slots__ = ("name", "fn")
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, Any], Set[str]], bool]):
+        self.name = name
+        self.fn = fn
+
+    def __call__(self, agent_data: Dict[str, Any], labels: Set[str]) -> bool:
+        return bool(self.fn(agent_data, labels))
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+def flag(name: str) -> Guard:
+    """Guard that holds once agent_data[name] is truthy"""
+    return Guard(name, lambda data, labels: data.get(name, False))
+
+
+def said(label: str) -> Guard:
+    """Guard that holds when the newest user message matched a keyword label"""
+    return Guard(f"said({label})", lambda data, labels: label in labels)
+
+
+class Stage:
+    """One step of the workflow"""
+
+    __slots__ = ("name", "done", "skip")
+
+    def __init__(self, name: str, done: Optional[Guard] = None, skip: Optional[Guard] = None):
+        self.name = name
+        self.done = done        # None = terminal stage, never finished
+        self.skip = skip
+
+
+class Transition:
+    """Re-entry edge: from any of sources to target when guard holds"""
+
+    __slots__ = ("sources", "target", "guard", "resets")
+
+    def __init__(self, sources: Iterable[str], target: str, guard: Guard, resets: Sequence[str] = ()):
+        self.sources = tuple(sources)
+        self.target = target
+        self.guard = guard
+        self.resets = tuple(resets)
+
+
+class Workflow:
+    """Compiled stage order plus transitions by source stage"""
+
+    def __init__(self, stages: Sequence[Stage], transitions: Sequence[Transition] = ()):
+        self.stages: Tuple[Stage, ...] = tuple(stages)
+        self.index: Dict[str, int] = {stage.name: i for i, stage in enumerate(self.stages)}
+        if len(self.index) != len(self.stages):
+            raise ValueError("Duplicate stage names")
+
+        self.edges: Tuple[Transition, ...] = tuple(transitions)
+        # Wildcard transitions come first and also apply before any stage is recorded
+        self._wildcard: List[Transition] = [t for t in transitions if ANY in t.sources]
+        self.transitions: Dict[str, List[Transition]] = {name: list(self._wildcard) for name in self.index}
+        for transition in transitions:
+            for name in (transition.target, *transition.sources):
+                if name != ANY and name not in self.index:
+                    raise ValueError(f"Unknown stage: {name}")
+            for source in transition.sources:
+                if source != ANY:
+                    self.transitions[source].append(transition)
+
+    @property
+    def names(self) -> List[str]:
+        return [stage.name for stage in self.stages]
+
+    def resolve(self, agent_data: Dict[str, Any], labels: Optional[Set[str]] = None) -> str:
+        """
+        Stage that should handle this turn; records it in agent_data.
+
+        The first transition out of the current stage whose guard holds
+        resets its flags and enters its target; otherwise it's the first
+        stage that is neither done nor skipped. Prints one line when the
+        stage changes.
+        """
+        labels = labels or set()
+        current = agent_data.get(STAGE_KEY)
+        target = None
+        for transition in self.transitions.get(current, self._wildcard):
+            if transition.guard(agent_data, labels):
+                print(f"↩️  Workflow: {current} -> {transition.target} ({transition.guard.name})")
+                for name in transition.resets:
+                    agent_data.pop(name, None)
+                target = transition.target
+                break
+
+        if target is None:
+            for stage in self.stages:
+                target = stage.name
+                if stage.done is None:
+                    break
+                if stage.skip is not None and stage.skip(agent_data, labels):
+                    continue
+                if not stage.done(agent_data, labels):
+                    break
+            if target != current:
+                print(f"➡️  Workflow: {current or 'start'} -> {target}")
+
+        agent_data[STAGE_KEY] = target
+        return target
+
+    def table(self) -> Dict[str, List[Dict[str, Any]]]:
+        """The workflow as plain data (for tests and docs)"""
+        return {
+            "stages": [
+                {
+                    "stage": stage.name,
+                    "done_when": stage.done.name if stage.done else None,
+                    "skip_when": stage.skip.name if stage.skip else None,
+                }
+                for stage in self.stages
+            ],
+            "transitions": [
+                {
+                    "from": list(transition.sources),
+                    "to": transition.target,
+                    "when": transition.guard.name,
+                    "resets": list(transition.resets),
+                }
+                for transition in self.edges
+            ],
+        }
+
+
+# Intake → Privacy → Crisis → Resource → Scheduling (Support Groups) → Habit → Complete
+WORKFLOW = Workflow(
+    stages=[
+        Stage("intake", done=flag("intake_complete")),
+        Stage("privacy", done=flag("privacy_complete")),
+        Stage("crisis", done=flag("crisis_complete")),
+        # Crisis agent suggests a category, Resource agent filters by it
+        Stage("resource", done=flag("resource_complete")),
+        Stage("scheduling", done=flag("scheduling_complete")),
+        # Habit agent creates personalized habits and redirects to tracker
+        Stage("habit", done=flag("habit_complete")),
+        Stage("complete"),
+    ],
+    transitions=[
+        # Crisis fast lane: straight to a fresh assessment from wherever the
+        # session is (the coordinator raises crisis_preempted)
+        Transition(
+            sources=[ANY],
+            target="crisis",
+            guard=flag("crisis_preempted"),
+            resets=["crisis_preempted", "force_crisis", "crisis_category_suggested", "crisis_complete"]
+        ),
+        # Back to therapist matching when the user asks for someone else
+        Transition(
+            sources=["scheduling", "habit", "complete"],
+            target="resource",
+            guard=said("workflow:rematch"),
+            resets=["resource_complete", "therapists_presented", "workflow_complete"]
+        ),
+    ]
+)
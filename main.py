@@ -6,28 +6,65 @@ FastAPI backend for multi-agent system.
 Deploys to Google Cloud Run.
 """
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import List, Optional
 from datetime import datetime
+import asyncio
+import copy
+import functools
+import hashlib
+import json
 import os
+import uuid
 from dotenv import load_dotenv
 
+# Load environment variables before the agents: several of them read their
+# settings (concurrency, deadlines, feature switches) at import time
+load_dotenv()
+
 from agents.coordinator import CoordinatorAgent
+from agents.support_group_agent import SupportGroupAgent
 from agents.base_agent import AgentState, AgentMessage
+from agents import (
+    circuit_breaker, deadline, events, memory, model_registry, prompt_builder, response_cache,
+    risk_scorer, risk_state, single_flight, speculation
+)
+from agents.rate_limiter import gemini_limiter
+from agents.workflow import WORKFLOW
+from storage import IdempotencyConflict, IdempotencyStore, SessionLockManager, create_session_store
+
+# Session storage (backend chosen by SESSION_STORE, see storage/)
+session_store = create_session_store()
+
+# Serializes mutating requests per session (other sessions run in parallel)
+session_locks = SessionLockManager()
+
+# Results of /chat requests sent with an idempotency key, replayed on retry
+idempotency_store = IdempotencyStore(
+    ttl_seconds=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the session store on startup and flush it on shutdown"""
+    await session_store.start()
+    yield
+    await session_store.close()
 
-# Load environment variables
-load_dotenv()
 
 # Initialize FastAPI
 app = FastAPI(
     title="NimaCare API",
     description="AI-powered mental health support with multi-agent system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware - production-ready configuration
@@ -38,7 +75,7 @@ app.add_middleware(
     allow_origins=allowed_origins,  # Specific origins only
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "Idempotency-Key"],
 )
 
 # Initialize templates
@@ -47,11 +84,36 @@ templates = Jinja2Templates(directory="templates")
 # Mount static files (if any)
 # app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Initialize coordinator
+# Initialize agents once; they share the Gemini client (agents/model_registry.py)
 coordinator = CoordinatorAgent()
+support_group_agent = SupportGroupAgent()
 
-# In-memory session storage (use Redis/Firestore in production)
-sessions = {}
+# How often a running turn checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
+
+
+async def run_until_disconnected(http_request: Request, coro):
+    """
+    Run a coroutine, cancelling it if the HTTP client disconnects.
+
+    Keeps abandoned turns from holding Gemini calls open after the
+    browser has given up on them.
+
+    Raises:
+        asyncio.CancelledError: If the client disconnected before completion
+    """
+    task = asyncio.create_task(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise asyncio.CancelledError("Client disconnected")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
 
 
 # Request/Response models
@@ -60,14 +122,25 @@ class ChatRequest(BaseModel):
     user_id: str
     message: str
     session_id: Optional[str] = None
+    since: Optional[int] = None  # Cursor: number of messages the client already has
+    full_history: bool = False  # Resend the whole transcript
+    idempotency_key: Optional[str] = None  # Or the Idempotency-Key header (/chat)
 
 
 class ChatResponse(BaseModel):
-    """AI response"""
+    """
+    AI response.
+
+    messages holds only what the client hasn't seen: messages[since:] when a
+    cursor is given, otherwise this turn's messages. Pass cursor back as
+    `since` on the next request.
+    """
     session_id: str
     messages: List[dict]
     current_agent: Optional[str] = None
     workflow_complete: bool = False
+    history_start: int = 0  # Index of messages[0] in the full transcript
+    cursor: int = 0  # Total messages in the transcript after this turn
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -98,8 +171,45 @@ async def api_info():
 
 @app.get("/health")
 async def health():
-    """Health check for Cloud Run"""
-    return {"status": "healthy"}
+    """
+    Health check for Cloud Run.
+
+    Stays 200 while a Gemini circuit breaker is open - the service still
+    answers (with fallback responses) - but reports "degraded".
+    """
+    return {
+        "status": "degraded" if circuit_breaker.any_open() else "healthy",
+        "circuit_breakers": circuit_breaker.stats()
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics (session store occupancy, hit rates, evictions, lock contention, models)"""
+    return {
+        "session_store": session_store.stats(),
+        "session_locks": session_locks.stats(),
+        "model_registry": model_registry.stats(),
+        "response_cache": response_cache.stats(),
+        "conversation_memory": memory.stats(),
+        "prompts": prompt_builder.stats(),
+        "single_flight": single_flight.generations.stats(),
+        "rate_limiter": gemini_limiter.stats(),
+        "deadlines": deadline.stats(),
+        "circuit_breakers": circuit_breaker.stats(),
+        "idempotency": idempotency_store.stats(),
+        "crisis_assessments": coordinator.crisis_agent.assessment_stats(),
+        "risk_screen": risk_scorer.stats(),
+        "risk_state": risk_state.stats(),
+        "crisis_fast_lane": coordinator.fast_lane_stats(),
+        "speculation": speculation.stats()
+    }
+
+
+@app.get("/workflow")
+async def workflow():
+    """The coordinator's stage table: stages with their guards, and transitions"""
+    return WORKFLOW.table()
 
 
 @app.exception_handler(404)
@@ -108,57 +218,380 @@ async def not_found(request: Request, exc):
     return templates.TemplateResponse("404.html", {"request": request}, status_code=404)
 
 
+def with_session_lock(handler):
+    """
+    Run an endpoint with its session's lock held.
+
+    The session ID is taken from a `session_id` path parameter or from the
+    `session_id` field of the `request` body. Requests without a session
+    run unlocked.
+    """
+    @functools.wraps(handler)
+    async def locked_handler(**kwargs):
+        session_id = kwargs.get("session_id") or getattr(kwargs.get("request"), "session_id", None)
+        if not session_id:
+            return await handler(**kwargs)
+
+        async with session_locks.hold(session_id):
+            return await handler(**kwargs)
+
+    return locked_handler
+
+
+async def load_session(session_id: str) -> AgentState:
+    """
+    Load a session or fail with 404.
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        Session state
+    """
+    state = await session_store.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return state
+
+
+def new_session_id(user_id: str) -> str:
+    """Generate an ID for a new chat session"""
+    return f"session_{user_id}_{uuid.uuid4().hex[:8]}"
+
+
+async def get_or_create_session(session_id: str, user_id: str) -> AgentState:
+    """
+    Look up a chat session, creating it if needed.
+
+    Call with the session's lock held.
+
+    Args:
+        session_id: Session identifier
+        user_id: User the session belongs to
+
+    Returns:
+        Session state
+    """
+    state = await session_store.get(session_id)
+    if state is None:
+        # Create new session
+        state = AgentState(
+            messages=[],
+            agent_data={},
+            user_id=user_id,
+            current_agent="intake",
+            session_id=session_id
+        )
+
+    return state
+
+
+def workflow_flags(state: AgentState) -> dict:
+    """Boolean workflow flags from agent_data (e.g. intake_complete)"""
+    return {key: value for key, value in state.agent_data.items() if isinstance(value, bool)}
+
+
+def history_start(request: ChatRequest, turn_start: int) -> int:
+    """
+    First message index to send back for a chat request.
+
+    Args:
+        request: Chat request carrying the client's cursor
+        turn_start: Index of this turn's user message
+
+    Returns:
+        0 for full history, the client's cursor if given, else turn_start
+    """
+    if request.full_history:
+        return 0
+    if request.since is not None:
+        return max(0, min(request.since, turn_start))
+    return turn_start
+
+
+class TurnCheckpoint:
+    """
+    A session's state before a turn, to undo the turn if it doesn't complete.
+
+    The session store hands out its cached state object, so a turn that
+    fails or is cancelled part-way would otherwise leave its user message
+    (and any agent_data it changed) behind for the next turn.
+    """
+
+    def __init__(self, state: AgentState):
+        self.state = state
+        self.message_count = len(state.messages)
+        self.agent_data = copy.deepcopy(state.agent_data)
+        self.current_agent = state.current_agent
+
+    def restore(self) -> None:
+        """Put the session back as it was before the turn"""
+        del self.state.messages[self.message_count:]
+        self.state.agent_data = self.agent_data
+        self.state.current_agent = self.current_agent
+
+
+def turn_result(session_id: str, state: AgentState, turn_start: int) -> dict:
+    """Final payload for a streamed turn (SSE "done" / WebSocket "turn_complete")"""
+    return {
+        "session_id": session_id,
+        "messages": [msg.dict() for msg in state.messages[turn_start:]],
+        "history_start": turn_start,
+        "cursor": len(state.messages),
+        "current_agent": state.current_agent,
+        "workflow_complete": state.agent_data.get("workflow_complete", False),
+        "agent_data": workflow_flags(state),
+        "crisis_level": state.agent_data.get("crisis_level"),
+        "suggested_category": state.agent_data.get("suggested_category")
+    }
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     Main chat endpoint - handles conversation with multi-agent system.
 
+    Send an idempotency key (body field or Idempotency-Key header) to make
+    retries safe: a repeated request with the same key returns the first
+    result instead of running the turn again. A keyed turn keeps running if
+    its client disconnects, so the retry can pick up the result.
+
     Args:
         request: User message and session info
+        http_request: Raw request, used to detect client disconnects
 
     Returns:
         AI response with conversation state
     """
-    try:
-        # Get or create session
-        session_id = request.session_id or f"session_{request.user_id}_{len(sessions)}"
-
-        if session_id not in sessions:
-            # Create new session
-            sessions[session_id] = AgentState(
-                messages=[],
-                agent_data={},
-                user_id=request.user_id,
-                current_agent="intake"
-            )
-
-        # Get current state
-        state = sessions[session_id]
-
-        # Add user message
-        state.messages.append(AgentMessage(
-            role="user",
-            content=request.message
-        ))
-
-        # Process with coordinator
-        state = await coordinator.process(state)
-
-        # Save state
-        sessions[session_id] = state
-
-        # Build response
+    idempotency_key = request.idempotency_key or http_request.headers.get("Idempotency-Key")
+
+    async def run_turn() -> ChatResponse:
+        session_id = request.session_id or new_session_id(request.user_id)
+
+        async with session_locks.hold(session_id):
+            # Get or create session
+            state = await get_or_create_session(session_id, request.user_id)
+            start = history_start(request, len(state.messages))
+            checkpoint = TurnCheckpoint(state)
+
+            # Add user message
+            state.messages.append(AgentMessage(
+                role="user",
+                content=request.message
+            ))
+
+            # Process with coordinator (cancelled if the client goes away,
+            # agents fall back once the turn's deadline has passed). A turn
+            # with an idempotency key runs to completion regardless, so the
+            # client's retry gets its result instead of running it again.
+            try:
+                with deadline.scope():
+                    if idempotency_key:
+                        state = await coordinator.process(state)
+                    else:
+                        state = await run_until_disconnected(http_request, coordinator.process(state))
+            except BaseException:
+                checkpoint.restore()
+                raise
+
+            # Save state
+            await session_store.save(session_id, state)
+
+        # Build response - only messages the client hasn't seen
         return ChatResponse(
             session_id=session_id,
-            messages=[msg.dict() for msg in state.messages],
+            messages=[msg.dict() for msg in state.messages[start:]],
             current_agent=state.current_agent,
-            workflow_complete=state.agent_data.get("workflow_complete", False)
+            workflow_complete=state.agent_data.get("workflow_complete", False),
+            history_start=start,
+            cursor=len(state.messages)
+        )
+
+    try:
+        if not idempotency_key:
+            return await run_turn()
+
+        fingerprint = hashlib.sha256(
+            json.dumps([request.session_id, request.message]).encode("utf-8")
+        ).hexdigest()
+        return await idempotency_store.run(
+            (request.user_id, idempotency_key), fingerprint, run_turn
         )
 
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    except asyncio.CancelledError:
+        # 499 = client closed request; nobody is listening for the body
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def format_sse(event: str, data: dict) -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint - same workflow as /chat, delivered as SSE.
+
+    Events:
+        token: {"agent", "text"} - Gemini output as it is generated
+        agent: {"agent"} - coordinator routing decision
+        done: {"session_id", "messages", "history_start", "cursor",
+               "current_agent", "workflow_complete", "agent_data",
+               "crisis_level", "suggested_category"} - final turn result;
+               messages follows the same cursor rules as /chat and is
+               authoritative (e.g. if a streamed reply was replaced by a
+               fallback)
+        error: {"detail"} - the turn failed
+
+    Args:
+        request: User message and session info
+
+    Returns:
+        text/event-stream response
+    """
+    session_id = request.session_id or new_session_id(request.user_id)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run_turn(state: AgentState) -> AgentState:
+        # Runs in its own task, so the listener only sees this turn's events
+        with events.listen(queue), deadline.scope():
+            try:
+                return await coordinator.process(state)
+            finally:
+                queue.put_nowait(None)
+
+    async def event_stream():
+        # The session stays locked for the whole streamed turn
+        async with session_locks.hold(session_id):
+            state = await get_or_create_session(session_id, request.user_id)
+
+            turn_start = history_start(request, len(state.messages))
+            checkpoint = TurnCheckpoint(state)
+            state.messages.append(AgentMessage(
+                role="user",
+                content=request.message
+            ))
+
+            task = asyncio.create_task(run_turn(state))
+            saved = False
+            try:
+                while True:
+                    event = await queue.get()
+                    if event is None:
+                        break
+                    yield format_sse(event["event"], event["data"])
+
+                try:
+                    final_state = task.result()
+                except Exception as e:
+                    yield format_sse("error", {"detail": str(e)})
+                    return
+
+                await session_store.save(session_id, final_state)
+                saved = True
+                yield format_sse("done", turn_result(session_id, final_state, turn_start))
+            finally:
+                # Client disconnected mid-stream - stop the Gemini call too
+                if not task.done():
+                    task.cancel()
+                if not saved:
+                    checkpoint.restore()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws/session/{session_id}")
+async def session_socket(websocket: WebSocket, session_id: str, user_id: str = "anonymous"):
+    """
+    Bidirectional conversation channel for the voice interface.
+
+    Client → server:
+        {"type": "message", "message": "..."}
+
+    Server → client ({"event": ..., "data": ...}):
+        token: {"agent", "text"} - Gemini output as it is generated
+        agent: {"agent"} - coordinator routing decision
+        contributions: {"contributions"} - updated agent contributions
+        turn_complete: same payload as the SSE "done" event
+        error: {"detail"}
+
+    Turns are processed one at a time in arrival order. Closing the socket
+    cancels the turn in progress.
+
+    Args:
+        websocket: Client connection
+        session_id: Session identifier (created on first message)
+        user_id: User the session belongs to (query parameter)
+    """
+    await websocket.accept()
+
+    inbox: asyncio.Queue = asyncio.Queue()
+    outbox: asyncio.Queue = asyncio.Queue()
+
+    async def send_events():
+        while True:
+            await websocket.send_json(await outbox.get())
+
+    async def process_turns():
+        last_contributions = None
+        while True:
+            message = await inbox.get()
+
+            async with session_locks.hold(session_id):
+                state = await get_or_create_session(session_id, user_id)
+
+                turn_start = len(state.messages)
+                checkpoint = TurnCheckpoint(state)
+                state.messages.append(AgentMessage(role="user", content=message))
+
+                try:
+                    with events.listen(outbox), deadline.scope():
+                        state = await coordinator.process(state)
+                except Exception as e:
+                    checkpoint.restore()
+                    outbox.put_nowait({"event": "error", "data": {"detail": str(e)}})
+                    continue
+                except asyncio.CancelledError:
+                    # Socket closed mid-turn
+                    checkpoint.restore()
+                    raise
+
+                await session_store.save(session_id, state)
+
+            contributions = build_contributions(state)
+            if contributions != last_contributions:
+                last_contributions = contributions
+                outbox.put_nowait({"event": "contributions", "data": {"contributions": contributions}})
+
+            outbox.put_nowait({"event": "turn_complete", "data": turn_result(session_id, state, turn_start)})
+
+    sender = asyncio.create_task(send_events())
+    worker = asyncio.create_task(process_turns())
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            if payload.get("type") == "message" and payload.get("message"):
+                inbox.put_nowait(payload["message"])
+            else:
+                outbox.put_nowait({"event": "error", "data": {"detail": "Expected {\"type\": \"message\", \"message\": ...}"}})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
+        sender.cancel()
+
+
 @app.get("/session/{session_id}")
 async def get_session(session_id: str):
     """
@@ -170,10 +603,7 @@ async def get_session(session_id: str):
     Returns:
         Current session state
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[session_id]
+    state = await load_session(session_id)
 
     return {
         "session_id": session_id,
@@ -187,7 +617,31 @@ async def get_session(session_id: str):
     }
 
 
+@app.get("/session/{session_id}/messages")
+async def get_session_messages(session_id: str, since: int = 0):
+    """
+    Get conversation messages from a cursor onwards.
+
+    Args:
+        session_id: Session identifier
+        since: Number of messages the client already has (0 = full history)
+
+    Returns:
+        Messages after the cursor and the new cursor
+    """
+    state = await load_session(session_id)
+    start = max(0, min(since, len(state.messages)))
+
+    return {
+        "session_id": session_id,
+        "messages": [msg.dict() for msg in state.messages[start:]],
+        "history_start": start,
+        "cursor": len(state.messages)
+    }
+
+
 @app.delete("/session/{session_id}")
+@with_session_lock
 async def delete_session(session_id: str):
     """
     Delete a session.
@@ -198,8 +652,9 @@ async def delete_session(session_id: str):
     Returns:
         Confirmation message
     """
-    if session_id in sessions:
-        del sessions[session_id]
+    memory.forget(session_id)
+    speculation.forget(session_id)
+    if await session_store.delete(session_id):
         return {"message": "Session deleted"}
 
     raise HTTPException(status_code=404, detail="Session not found")
@@ -216,10 +671,7 @@ async def get_habits(session_id: str):
     Returns:
         List of recommended habits
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[session_id]
+    state = await load_session(session_id)
     habits = state.agent_data.get("recommended_habits", [])
 
     return {
@@ -238,6 +690,7 @@ class HabitCompletionRequest(BaseModel):
 
 
 @app.post("/habits/complete")
+@with_session_lock
 async def complete_habit(request: HabitCompletionRequest):
     """
     Mark a habit as completed.
@@ -248,10 +701,7 @@ async def complete_habit(request: HabitCompletionRequest):
     Returns:
         Updated habit data with streak information
     """
-    if request.session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[request.session_id]
+    state = await load_session(request.session_id)
 
     # Initialize habit completions if not exists
     if "habit_completions" not in state.agent_data:
@@ -286,7 +736,7 @@ async def complete_habit(request: HabitCompletionRequest):
         "notes": request.notes
     })
 
-    sessions[request.session_id] = state
+    await session_store.save(request.session_id, state)
 
     # Check for milestone achievements
     milestones = [7, 14, 30, 60, 90, 180, 365]
@@ -317,10 +767,7 @@ async def get_habit_stats(session_id: str, habit_id: Optional[str] = None):
     Returns:
         Habit statistics
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[session_id]
+    state = await load_session(session_id)
 
     habit_completions = state.agent_data.get("habit_completions", {})
 
@@ -383,10 +830,7 @@ async def get_habit_history(session_id: str, habit_id: str, limit: int = 30):
     Returns:
         Habit completion history
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[session_id]
+    state = await load_session(session_id)
 
     habit_completions = state.agent_data.get("habit_completions", {})
 
@@ -415,6 +859,7 @@ class BookingRequest(BaseModel):
 
 
 @app.post("/book-session")
+@with_session_lock
 async def book_session(request: BookingRequest):
     """
     Book a therapy session with matched therapist.
@@ -425,17 +870,11 @@ async def book_session(request: BookingRequest):
     Returns:
         Booking confirmation with therapist details
     """
-    if request.session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    state = sessions[request.session_id]
-    
-    # Get matched therapists for the category
-    from agents.resource_agent import ResourceAgent
-    resource_agent = ResourceAgent()
+    state = await load_session(request.session_id)
     
-    # Get therapists for the selected category
-    therapists = resource_agent._get_available_therapists(request.category)
+    # Get therapists for the selected category (bounded like a chat turn)
+    with deadline.scope():
+        therapists = coordinator.resource_agent._get_available_therapists(request.category)
     
     if not therapists:
         raise HTTPException(status_code=404, detail="No therapists available")
@@ -468,7 +907,7 @@ async def book_session(request: BookingRequest):
     state.agent_data["therapist_match_found"] = True
     state.agent_data["matched_therapist_id"] = selected_therapist.id
     
-    sessions[request.session_id] = state
+    await session_store.save(request.session_id, state)
     
     return {
         "success": True,
@@ -493,6 +932,7 @@ class SupportGroupRequest(BaseModel):
 
 
 @app.post("/support-group")
+@with_session_lock
 async def match_support_group(request: SupportGroupRequest):
     """
     Match user with an anonymous peer support group using intelligent matching.
@@ -503,15 +943,7 @@ async def match_support_group(request: SupportGroupRequest):
     Returns:
         Matched support group details with personalized recommendations
     """
-    if request.session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[request.session_id]
-    
-    # Use Support Group Agent for intelligent matching
-    from agents.support_group_agent import SupportGroupAgent
-    
-    support_agent = SupportGroupAgent()
+    state = await load_session(request.session_id)
     
     # Store user preferences in state
     state.agent_data["support_group_preferences"] = {
@@ -520,8 +952,9 @@ async def match_support_group(request: SupportGroupRequest):
         "anonymous": request.anonymous
     }
     
-    # Process with support group agent
-    state = await support_agent.process(state)
+    # Process with support group agent (falls back once the deadline has passed)
+    with deadline.scope():
+        state = await support_group_agent.process(state)
     
     # Get matched groups from agent
     matched_groups = state.agent_data.get("available_support_groups", [])
@@ -546,7 +979,7 @@ async def match_support_group(request: SupportGroupRequest):
         state.agent_data["support_groups"] = []
     
     state.agent_data["support_groups"].append(match)
-    sessions[request.session_id] = state
+    await session_store.save(request.session_id, state)
 
     # Get the agent's recommendation message
     last_message = state.messages[-1] if state.messages else None
@@ -572,10 +1005,7 @@ async def get_appointments(session_id: str):
     Returns:
         List of appointments
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[session_id]
+    state = await load_session(session_id)
 
     # Get scheduled appointment from scheduling agent
     scheduled_appointment = state.agent_data.get("scheduled_appointment")
@@ -605,6 +1035,7 @@ class AppointmentRequest(BaseModel):
 
 
 @app.post("/appointments/create")
+@with_session_lock
 async def create_appointment(request: AppointmentRequest):
     """
     Create a new appointment with a therapist.
@@ -615,10 +1046,7 @@ async def create_appointment(request: AppointmentRequest):
     Returns:
         Created appointment
     """
-    if request.session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[request.session_id]
+    state = await load_session(request.session_id)
 
     # Create appointment
     from models.appointment import Appointment, AppointmentStatus
@@ -646,7 +1074,7 @@ async def create_appointment(request: AppointmentRequest):
         state.agent_data["appointments"] = []
 
     state.agent_data["appointments"].append(appointment)
-    sessions[request.session_id] = state
+    await session_store.save(request.session_id, state)
 
     return {
         "success": True,
@@ -666,10 +1094,7 @@ async def get_available_slots(session_id: str, therapist_id: Optional[str] = Non
     Returns:
         List of available time slots
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[session_id]
+    state = await load_session(session_id)
 
     # Get available slots from scheduling agent
     available_slots = state.agent_data.get("available_slots", [])
@@ -693,6 +1118,7 @@ class AppointmentUpdateRequest(BaseModel):
 
 
 @app.put("/appointments/update")
+@with_session_lock
 async def update_appointment(request: AppointmentUpdateRequest):
     """
     Update appointment status.
@@ -703,10 +1129,7 @@ async def update_appointment(request: AppointmentUpdateRequest):
     Returns:
         Updated appointment
     """
-    if request.session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-
-    state = sessions[request.session_id]
+    state = await load_session(request.session_id)
 
     # Find and update appointment
     appointments = state.agent_data.get("appointments", [])
@@ -727,7 +1150,7 @@ async def update_appointment(request: AppointmentUpdateRequest):
     if not updated_appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    sessions[request.session_id] = state
+    await session_store.save(request.session_id, state)
 
     return {
         "success": True,
@@ -743,6 +1166,7 @@ class PrivacyRequest(BaseModel):
 
 
 @app.post("/privacy/set")
+@with_session_lock
 async def set_privacy(request: PrivacyRequest):
     """
     Set user privacy tier.
@@ -759,10 +1183,10 @@ async def set_privacy(request: PrivacyRequest):
         raise HTTPException(status_code=400, detail="Invalid privacy tier")
 
     # If session exists, update it
-    if request.session_id and request.session_id in sessions:
-        state = sessions[request.session_id]
+    state = await session_store.get(request.session_id) if request.session_id else None
+    if state is not None:
         state.agent_data["privacy_tier"] = request.privacy_tier
-        sessions[request.session_id] = state
+        await session_store.save(request.session_id, state)
 
     return {
         "success": True,
@@ -782,10 +1206,15 @@ async def get_agent_contributions(session_id: str):
     Returns:
         List of agent contributions
     """
-    if session_id not in sessions:
+    state = await session_store.get(session_id)
+    if state is None:
         return {"contributions": []}
 
-    state = sessions[session_id]
+    return {"contributions": build_contributions(state)}
+
+
+def build_contributions(state: AgentState) -> List[dict]:
+    """Summarize what each completed agent contributed to the session"""
     contributions = []
 
     # Intake Agent contribution
@@ -825,7 +1254,7 @@ async def get_agent_contributions(session_id: str):
             "content": f"Recommended {habits_count} evidence-based habits"
         })
 
-    return {"contributions": contributions}
+    return contributions
 
 
 # For local development
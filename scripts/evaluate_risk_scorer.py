@@ -0,0 +1,97 @@
+"""
+Evaluate the local risk screen
+==============================
+
+Runs the risk scorer over a labeled JSONL set and reports, per true level:
+- settled: decided locally without the LLM
+- deferred: sent to the LLM (with the scorer's floor applied afterwards)
+- under-called: settled below the true level - the failure that matters
+- over-called: settled above the true level (a third-person, past or
+  quoted mention taken for the user's own intent)
+- floor below: deferred with a floor under the true level, i.e. only the
+  LLM stands between the example and an under-call
+- recall: share of examples not under-called, i.e. that end up at least
+  at their true level locally or go to the LLM for assessment
+
+data/risk_eval.jsonl is a small regression set, not a benchmark: it
+catches phrases the lexicons lose, it can't vouch for unseen phrasing.
+
+Each line: {"messages": ["user message", ...], "level": "none|low|moderate|high|immediate"}
+
+Usage:
+    python scripts/evaluate_risk_scorer.py [--data data/risk_eval.jsonl] [--model data/risk_model.json] [-v]
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents import risk_scorer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    root = Path(__file__).resolve().parent.parent
+    parser.add_argument("--data", type=Path, default=root / "data" / "risk_eval.jsonl")
+    parser.add_argument("--model", type=Path, default=risk_scorer.MODEL_PATH)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every under- and over-called example")
+    args = parser.parse_args()
+
+    model = risk_scorer.load(args.model)
+    if model is None:
+        sys.exit(1)
+
+    with open(args.data) as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+
+    counts = {
+        level: {"n": 0, "settled": 0, "exact": 0, "deferred": 0, "floor_below": 0, "under": 0, "over": 0}
+        for level in risk_scorer.LEVELS
+    }
+    elapsed = 0.0
+    for example in examples:
+        truth = example["level"]
+        started = time.perf_counter()
+        verdict = model.score(example["messages"])
+        elapsed += time.perf_counter() - started
+
+        row = counts[truth]
+        row["n"] += 1
+        if not verdict.settled:
+            row["deferred"] += 1
+            if risk_scorer.level_index(verdict.floor) < risk_scorer.level_index(truth):
+                row["floor_below"] += 1
+            continue
+        row["settled"] += 1
+        if verdict.level == truth:
+            row["exact"] += 1
+        if risk_scorer.level_index(verdict.level) < risk_scorer.level_index(truth):
+            row["under"] += 1
+            if args.verbose:
+                print(f"UNDER-CALLED {truth} as {verdict.level}: {example['messages']}")
+        elif risk_scorer.level_index(verdict.level) > risk_scorer.level_index(truth):
+            row["over"] += 1
+            if args.verbose:
+                print(f"OVER-CALLED {truth} as {verdict.level}: {example['messages']}")
+
+    print(f"{'level':<10} {'n':>4} {'settled':>8} {'exact':>6} {'deferred':>9} {'floor below':>12} "
+          f"{'under':>6} {'over':>5} {'recall':>7}")
+    for level, row in counts.items():
+        if not row["n"]:
+            continue
+        recall = 1 - row["under"] / row["n"]
+        print(f"{level:<10} {row['n']:>4} {row['settled']:>8} {row['exact']:>6} "
+              f"{row['deferred']:>9} {row['floor_below']:>12} {row['under']:>6} {row['over']:>5} {recall:>7.1%}")
+
+    total = len(examples)
+    settled = sum(row["settled"] for row in counts.values())
+    print(f"\n{settled}/{total} settled locally ({settled / total:.0%} fewer LLM calls), "
+          f"avg {elapsed / total * 1e6:.0f}µs per conversation")
+
+
+if __name__ == "__main__":
+    main()
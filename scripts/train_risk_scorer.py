@@ -0,0 +1,84 @@
+"""
+Fit the risk scorer's linear weights
+====================================
+
+Fits logistic regression (plain batch gradient descent with L2) on the
+lexicon features of a labeled JSONL set and writes the weights back into
+the model file. Lexicons, categories and thresholds are left untouched.
+
+Feature weights are kept non-negative (projected after every step): risk
+language may only ever raise the probability, so a pile of mild words
+("stressed", "tired") can't cancel a serious phrase.
+
+Each line: {"messages": ["user message", ...], "level": "none|low|moderate|high|immediate"}
+The target is "at least moderate".
+
+Usage:
+    python scripts/train_risk_scorer.py [--data data/risk_train.jsonl] [--model data/risk_model.json]
+"""
+
+from pathlib import Path
+import argparse
+import json
+import math
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents import risk_scorer  # noqa: E402
+
+
+def load_examples(path: Path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def fit(rows, targets, epochs: int, learning_rate: float, l2: float):
+    weights = {name: 0.0 for name in ["bias"] + risk_scorer.FEATURES}
+    n = len(rows)
+    for _ in range(epochs):
+        grads = {name: 0.0 for name in weights}
+        for values, y in zip(rows, targets):
+            z = weights["bias"] + sum(weights[f] * values[f] for f in risk_scorer.FEATURES)
+            error = 1.0 / (1.0 + math.exp(-z)) - y
+            grads["bias"] += error
+            for f in risk_scorer.FEATURES:
+                grads[f] += error * values[f]
+        for name in weights:
+            penalty = 0.0 if name == "bias" else l2 * weights[name]
+            weights[name] -= learning_rate * (grads[name] / n + penalty)
+            if name != "bias":
+                weights[name] = max(0.0, weights[name])
+    return {name: round(value, 4) for name, value in weights.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    root = Path(__file__).resolve().parent.parent
+    parser.add_argument("--data", type=Path, default=root / "data" / "risk_train.jsonl")
+    parser.add_argument("--model", type=Path, default=risk_scorer.MODEL_PATH)
+    parser.add_argument("--epochs", type=int, default=3000)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with open(args.model) as f:
+        spec = json.load(f)
+    model = risk_scorer.RiskModel(spec)
+
+    examples = load_examples(args.data)
+    rows = [model.features(example["messages"])["values"] for example in examples]
+    moderate = risk_scorer.level_index("moderate")
+    targets = [1.0 if risk_scorer.level_index(example["level"]) >= moderate else 0.0 for example in examples]
+
+    spec["weights"] = fit(rows, targets, args.epochs, args.learning_rate, args.l2)
+    with open(args.model, "w") as f:
+        json.dump(spec, f, indent=2)
+        f.write("\n")
+
+    print(f"Trained on {len(examples)} examples -> {args.model}")
+    print(json.dumps(spec["weights"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
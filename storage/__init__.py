@@ -0,0 +1,71 @@
+"""
+NimaCare Session Storage
+"""
+
+import os
+
+from .lru_cache import LRUCache
+from .locks import SessionLockManager
+from .idempotency import IdempotencyStore, IdempotencyConflict
+from .session_store import SessionStore, InMemorySessionStore
+from .sqlite_store import SQLiteSessionStore
+from .redis_store import RedisSessionStore
+
+
+def create_session_store() -> SessionStore:
+    """
+    Build the session store selected by environment variables.
+
+    SESSION_STORE: backend name ("memory", "sqlite" or "redis")
+    SESSION_MAX_ENTRIES: max cached sessions
+    SESSION_MAX_BYTES: approximate memory budget for cached sessions
+    SESSION_TTL_SECONDS: idle time before a session leaves memory
+    SESSION_DB_PATH: SQLite file (sqlite backend)
+    SESSION_FLUSH_INTERVAL: seconds between write-behind flushes (sqlite)
+    SESSION_RETENTION_SECONDS: prune sessions older than this on startup (sqlite)
+    REDIS_URL: server to connect to (redis backend)
+    """
+    backend = os.getenv("SESSION_STORE", "memory").lower()
+
+    max_entries = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+    max_bytes = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+    ttl_seconds = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+
+    if backend == "sqlite":
+        retention = os.getenv("SESSION_RETENTION_SECONDS")
+        return SQLiteSessionStore(
+            path=os.getenv("SESSION_DB_PATH", "sessions.db"),
+            flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", "0.5")),
+            retention_seconds=float(retention) if retention else None,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds
+        )
+
+    if backend == "redis":
+        return RedisSessionStore(
+            url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            ttl_seconds=ttl_seconds
+        )
+
+    if backend != "memory":
+        print(f"⚠️  Unknown SESSION_STORE '{backend}' - using in-memory sessions")
+
+    return InMemorySessionStore(
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        ttl_seconds=ttl_seconds
+    )
+
+
+__all__ = [
+    "LRUCache",
+    "SessionLockManager",
+    "IdempotencyStore",
+    "IdempotencyConflict",
+    "SessionStore",
+    "InMemorySessionStore",
+    "SQLiteSessionStore",
+    "RedisSessionStore",
+    "create_session_store",
+]
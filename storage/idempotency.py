@@ -0,0 +1,104 @@
+"""
+Idempotency Store - Replay results of retried requests
+======================================================
+
+Clients send an idempotency key with a request they may retry (the voice
+interface after a dropped connection, a double-tapped send button). The
+first request with a key runs; its result is kept for ttl_seconds and any
+retry with the same key gets that result back without running again. A
+retry that arrives while the first request is still running waits for it.
+
+Failed or abandoned requests store nothing, so their retries run normally.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+
+from .lru_cache import LRUCache
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request"""
+
+
+class IdempotencyStore:
+    """
+    Completed results per idempotency key, plus coalescing of in-flight ones.
+
+    Results are kept in process memory, so a retry that lands on another
+    instance runs again.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10000, ttl_seconds: Optional[float] = 86400):
+        # key -> (fingerprint, result)
+        self._results = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # key -> (fingerprint, future resolved with the result)
+        self._in_flight: Dict[Hashable, Tuple[str, asyncio.Future]] = {}
+
+        # Metrics
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+        self.conflicts = 0
+
+    async def run(self, key: Hashable, fingerprint: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the stored result for key, or run fn() and store its result.
+
+        Args:
+            key: Idempotency key (scope it per user)
+            fingerprint: Hash of the request body; reusing a key with a
+                different body is rejected
+            fn: Produces the result
+
+        Raises:
+            IdempotencyConflict: If the key belongs to a different request
+        """
+        while True:
+            stored = self._results.get(key)
+            if stored is not None:
+                self._check(stored[0], fingerprint)
+                self.replayed += 1
+                return stored[1]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+
+            self._check(in_flight[0], fingerprint)
+            self.joined += 1
+            future = in_flight[1]
+            await asyncio.wait({future})
+            if not future.cancelled():
+                return future.result()
+            # The first attempt failed - loop round and run it ourselves
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+        try:
+            result = await fn()
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        self.executed += 1
+        self._results.set(key, (fingerprint, result))
+        future.set_result(result)
+        return result
+
+    def _check(self, stored_fingerprint: str, fingerprint: str) -> None:
+        if stored_fingerprint != fingerprint:
+            self.conflicts += 1
+            raise IdempotencyConflict("Idempotency key was already used for a different request")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stored": len(self._results),
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "joined": self.joined,
+            "conflicts": self.conflicts,
+        }
@@ -0,0 +1,55 @@
+"""
+Session Locks - Serialize writes to the same session
+====================================================
+
+Each session gets its own asyncio.Lock, so overlapping requests for one
+session (a double-sent utterance, /chat racing /habits/complete) run one
+after another, while different sessions proceed fully in parallel.
+
+Locks live in a weak-value registry: once no request holds or waits on a
+session's lock, it is garbage-collected, so idle sessions cost nothing.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+import asyncio
+import weakref
+
+
+class SessionLockManager:
+    """Registry of per-session asyncio locks"""
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+        # Metrics
+        self.acquisitions = 0
+        self.contended = 0
+
+    def get_lock(self, session_id: str) -> asyncio.Lock:
+        """Return the lock for a session, creating it on first use"""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        """Hold a session's lock for the duration of the block"""
+        # Strong reference keeps the lock alive while we wait on / hold it
+        lock = self.get_lock(session_id)
+        if lock.locked():
+            self.contended += 1
+
+        async with lock:
+            self.acquisitions += 1
+            yield
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "active_locks": len(self._locks),
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+        }
@@ -0,0 +1,148 @@
+"""
+LRU Cache - Bounded in-memory cache with idle TTL and a byte budget
+===================================================================
+
+Entries are kept in access order, so the least recently used entry is
+always at the front. That makes both LRU eviction and idle-TTL expiry
+cheap: expired entries are swept from the front until a live one is found.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import time
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by entry count and/or total bytes.
+
+    Every entry also expires after ttl_seconds without being read or written.
+    Eviction counts are kept per reason for metrics.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof or (lambda value: 0)
+        self.clock = clock
+
+        # key -> (value, size_bytes, last_access)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"expired": 0, "capacity": 0, "memory": 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry and mark it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, size, last_access = entry
+        now = self.clock()
+        if self._is_expired(last_access, now):
+            self._remove(key, "expired")
+            self.misses += 1
+            return default
+
+        self._entries[key] = (value, size, now)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry without touching recency or hit counters"""
+        entry = self._entries.get(key)
+        if entry is None or self._is_expired(entry[2], self.clock()):
+            return default
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace an entry, then enforce the bounds"""
+        now = self.clock()
+        size = self.sizeof(value)
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+
+        self._entries[key] = (value, size, now)
+        self._bytes += size
+
+        self._sweep_expired(now)
+        self._enforce_bounds(keep=key)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry without counting it as an eviction"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self._bytes -= entry[1]
+        return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._is_expired(entry[2], self.clock())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": dict(self.evictions),
+        }
+
+    def _is_expired(self, last_access: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - last_access > self.ttl_seconds
+
+    def _sweep_expired(self, now: float) -> None:
+        # Access order == expiry order, so stop at the first live entry
+        while self._entries:
+            key, (_, _, last_access) = next(iter(self._entries.items()))
+            if not self._is_expired(last_access, now):
+                break
+            self._remove(key, "expired")
+
+    def _enforce_bounds(self, keep: Hashable) -> None:
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            if not self._evict_oldest("capacity", keep):
+                break
+        while self.max_bytes is not None and self._bytes > self.max_bytes:
+            if not self._evict_oldest("memory", keep):
+                break
+
+    def _evict_oldest(self, reason: str, keep: Hashable) -> bool:
+        for key in self._entries:
+            if key != keep:
+                self._remove(key, reason)
+                return True
+        # Only the entry being written is left - keep it even if oversized
+        return False
+
+    def _remove(self, key: Hashable, reason: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        self.evictions[reason] += 1
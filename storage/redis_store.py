@@ -0,0 +1,193 @@
+"""
+Redis Session Store - Shared sessions for multi-instance deployments
+====================================================================
+
+Any uvicorn worker or Cloud Run instance can serve any turn, so no sticky
+sessions are needed.
+
+Layout per session:
+- {prefix}{session_id}            hash: user_id, current_agent, data:<key> (JSON)
+- {prefix}{session_id}:messages   list: one JSON message per entry
+
+Each request costs one round trip to load (pipelined HGETALL + LRANGE)
+and one to save (MULTI/EXEC of only the changed hash fields and the new
+messages). Both keys share a sliding idle TTL.
+
+Sessions on the No Records privacy tier are never written to Redis: they
+stay in this process's memory (so only the instance that served them can
+continue them), and picking that tier deletes what was already stored.
+
+Works with any Redis-protocol server, or with fakeredis by passing
+client=fakeredis.aioredis.FakeRedis(decode_responses=True).
+"""
+
+from typing import Any, Dict, Optional
+import json
+
+from agents.base_agent import AgentState, AgentMessage
+from .lru_cache import LRUCache
+from .session_store import SessionStore, StateSnapshot, is_retained
+
+
+DATA_PREFIX = "data:"
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store backed by Redis (or any Redis-protocol server).
+
+    Per-session locking is process-local, so two instances writing the
+    same session at the same moment can interleave appended messages.
+    Clients that keep one conversation on one connection (the voice
+    interface's WebSocket) don't hit this.
+    """
+
+    backend_name = "redis"
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        client: Any = None,
+        ttl_seconds: Optional[float] = 3600,
+        key_prefix: str = "nimacare:session:",
+        max_snapshots: int = 10000
+    ):
+        if client is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError as e:
+                raise RuntimeError(
+                    "SESSION_STORE=redis requires the 'redis' package (pip install redis)"
+                ) from e
+            client = redis_asyncio.from_url(url, decode_responses=True)
+
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds) if ttl_seconds else None
+        self.key_prefix = key_prefix
+
+        # What each loaded state looked like in Redis, so saves send deltas.
+        # Keyed by session; entries are (state, snapshot).
+        self._snapshots = LRUCache(max_entries=max_snapshots, ttl_seconds=ttl_seconds)
+        # Sessions that must not leave the process (No Records tier)
+        self._local = LRUCache(max_entries=max_snapshots, ttl_seconds=ttl_seconds)
+
+        # Metrics
+        self.loads = 0
+        self.misses = 0
+        self.saves = 0
+        self.round_trips = 0
+
+    def _hash_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}:messages"
+
+    async def close(self) -> None:
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+    async def get(self, session_id: str) -> Optional[AgentState]:
+        local = self._local.get(session_id)
+        if local is not None:
+            return local
+
+        hash_key = self._hash_key(session_id)
+        messages_key = self._messages_key(session_id)
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(hash_key)
+        pipe.lrange(messages_key, 0, -1)
+        if self.ttl_seconds:
+            # Reading a session counts as activity
+            pipe.expire(hash_key, self.ttl_seconds)
+            pipe.expire(messages_key, self.ttl_seconds)
+        fields, raw_messages, *_ = await pipe.execute()
+        self.round_trips += 1
+
+        if not fields:
+            self.misses += 1
+            return None
+
+        state = AgentState(
+            messages=[AgentMessage(**json.loads(raw)) for raw in raw_messages],
+            agent_data={
+                field[len(DATA_PREFIX):]: json.loads(value)
+                for field, value in fields.items()
+                if field.startswith(DATA_PREFIX)
+            },
+            user_id=fields.get("user_id") or None,
+            current_agent=fields.get("current_agent") or None,
+            session_id=session_id
+        )
+
+        self.loads += 1
+        self._snapshots.set(session_id, (state, StateSnapshot.capture(state)))
+        return state
+
+    async def save(self, session_id: str, state: AgentState) -> None:
+        state.session_id = session_id
+
+        if not is_retained(state):
+            if session_id not in self._local:
+                # Drop whatever was stored before the tier was picked
+                self._snapshots.pop(session_id)
+                await self.client.delete(self._hash_key(session_id), self._messages_key(session_id))
+                self.round_trips += 1
+            self._local.set(session_id, state)
+            return
+        # Left the No Records tier: the full state is written below
+        self._local.pop(session_id)
+
+        entry = self._snapshots.peek(session_id)
+        if entry is not None and entry[0] is state:
+            delta, snapshot = entry[1].diff(state)
+        else:
+            delta, snapshot = StateSnapshot().diff(state, rewrite=True)
+
+        hash_key = self._hash_key(session_id)
+        messages_key = self._messages_key(session_id)
+
+        pipe = self.client.pipeline(transaction=True)
+        if delta.rewrite:
+            pipe.delete(hash_key, messages_key)
+
+        mapping = {
+            "user_id": delta.user_id or "",
+            "current_agent": delta.current_agent or "",
+        }
+        mapping.update({DATA_PREFIX + key: value for key, value in delta.changed_data.items()})
+        pipe.hset(hash_key, mapping=mapping)
+
+        if delta.removed_keys:
+            pipe.hdel(hash_key, *[DATA_PREFIX + key for key in delta.removed_keys])
+        if delta.new_messages:
+            pipe.rpush(messages_key, *[json.dumps(msg) for msg in delta.new_messages])
+        if self.ttl_seconds:
+            pipe.expire(hash_key, self.ttl_seconds)
+            pipe.expire(messages_key, self.ttl_seconds)
+
+        await pipe.execute()
+        self.round_trips += 1
+        self.saves += 1
+
+        self._snapshots.set(session_id, (state, snapshot))
+
+    async def delete(self, session_id: str) -> bool:
+        self._snapshots.pop(session_id)
+        local = self._local.pop(session_id) is not None
+        removed = await self.client.delete(self._hash_key(session_id), self._messages_key(session_id))
+        self.round_trips += 1
+        return local or removed > 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend_name,
+            "loads": self.loads,
+            "misses": self.misses,
+            "saves": self.saves,
+            "round_trips": self.round_trips,
+            "tracked_snapshots": len(self._snapshots),
+            "memory_only_sessions": len(self._local),
+        }
@@ -0,0 +1,214 @@
+"""
+Session Store - Pluggable storage for conversation state
+========================================================
+
+Every endpoint reads and writes AgentState through a SessionStore instead
+of a module-level dict, so the backend can be swapped without touching the
+API layer.
+
+Backends:
+- InMemorySessionStore: bounded LRU with idle TTL and a byte budget
+- SQLiteSessionStore: durable, write-behind (storage/sqlite_store.py)
+- RedisSessionStore: shared across instances (storage/redis_store.py)
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+
+from agents import response_cache
+from agents.base_agent import AgentState
+from .lru_cache import LRUCache
+
+
+# Rough per-message bookkeeping cost on top of the text itself
+MESSAGE_OVERHEAD_BYTES = 64
+
+
+def estimate_state_size(state: AgentState) -> int:
+    """Approximate memory footprint of a session in bytes"""
+    message_bytes = sum(
+        len(msg.content) + len(msg.role) + MESSAGE_OVERHEAD_BYTES
+        for msg in state.messages
+    )
+    data_bytes = len(json.dumps(state.agent_data, default=str))
+    return message_bytes + data_bytes
+
+
+def is_retained(state: AgentState) -> bool:
+    """
+    False for sessions whose privacy tier forbids keeping their content.
+
+    Durable backends keep such sessions in memory only (the same tiers the
+    response cache bypasses), so they are gone once evicted or restarted.
+    """
+    return response_cache.allows_caching(state.agent_data)
+
+
+def dump_value(key: str, value: Any) -> str:
+    """
+    Serialize one agent_data value for a durable backend.
+
+    No default= fallback: a value that isn't plain JSON would come back
+    as a different type after a reload, so it fails here instead.
+    """
+    try:
+        return json.dumps(value)
+    except TypeError as e:
+        raise TypeError(f"agent_data[{key!r}] is not JSON-serializable: {e}") from e
+
+
+class StateDelta:
+    """Changes to a session since it was last persisted"""
+
+    def __init__(
+        self,
+        user_id: Optional[str],
+        current_agent: Optional[str],
+        message_start: int,
+        new_messages: List[Dict[str, str]],
+        changed_data: Dict[str, str],
+        removed_keys: List[str],
+        agent_changed: bool = False,
+        rewrite: bool = False
+    ):
+        self.user_id = user_id
+        self.current_agent = current_agent
+        self.message_start = message_start  # seq of new_messages[0]
+        self.new_messages = new_messages
+        self.changed_data = changed_data  # agent_data key -> JSON value
+        self.removed_keys = removed_keys
+        self.agent_changed = agent_changed
+        self.rewrite = rewrite  # replace everything stored for the session
+
+    def is_empty(self) -> bool:
+        return not (self.new_messages or self.changed_data or self.removed_keys
+                    or self.rewrite or self.agent_changed)
+
+
+class StateSnapshot:
+    """
+    What a backend has already persisted for a session.
+
+    Messages are append-only, so only the count is tracked. agent_data is
+    tracked per key as serialized JSON, so a save only writes the keys
+    that actually changed.
+    """
+
+    def __init__(self, message_count: int = 0, data: Optional[Dict[str, str]] = None,
+                 current_agent: Optional[str] = None):
+        self.message_count = message_count
+        self.data = data or {}
+        self.current_agent = current_agent
+
+    @classmethod
+    def capture(cls, state: AgentState) -> "StateSnapshot":
+        return cls(
+            message_count=len(state.messages),
+            data={key: dump_value(key, value) for key, value in state.agent_data.items()},
+            current_agent=state.current_agent
+        )
+
+    def diff(self, state: AgentState, rewrite: bool = False):
+        """
+        Compute the delta from this snapshot to state.
+
+        Args:
+            state: Current session state
+            rewrite: Ignore the snapshot and emit the full state
+
+        Returns:
+            Tuple of (StateDelta, snapshot after applying it)
+        """
+        # History was rewritten rather than appended to - start over
+        if len(state.messages) < self.message_count:
+            rewrite = True
+
+        base = StateSnapshot() if rewrite else self
+        current = {key: dump_value(key, value) for key, value in state.agent_data.items()}
+
+        delta = StateDelta(
+            user_id=state.user_id,
+            current_agent=state.current_agent,
+            message_start=base.message_count,
+            new_messages=[
+                {"role": msg.role, "content": msg.content}
+                for msg in state.messages[base.message_count:]
+            ],
+            changed_data={key: value for key, value in current.items() if base.data.get(key) != value},
+            removed_keys=[key for key in base.data if key not in current],
+            agent_changed=state.current_agent != base.current_agent,
+            rewrite=rewrite
+        )
+
+        return delta, StateSnapshot(len(state.messages), current, state.current_agent)
+
+
+class SessionStore:
+    """
+    Base class for session storage backends.
+
+    All operations are async so network- and disk-backed stores fit the
+    same interface as the in-memory one.
+    """
+
+    backend_name = "base"
+
+    async def get(self, session_id: str) -> Optional[AgentState]:
+        """Load a session, or None if it doesn't exist (or has expired)"""
+        raise NotImplementedError("Each store must implement get()")
+
+    async def save(self, session_id: str, state: AgentState) -> None:
+        """Persist the current state of a session"""
+        raise NotImplementedError("Each store must implement save()")
+
+    async def delete(self, session_id: str) -> bool:
+        """Remove a session. Returns False if it didn't exist."""
+        raise NotImplementedError("Each store must implement delete()")
+
+    async def start(self) -> None:
+        """Open connections / start background work (app startup)"""
+
+    async def close(self) -> None:
+        """Flush and release resources (app shutdown)"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Metrics for the /metrics endpoint"""
+        return {"backend": self.backend_name}
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store with LRU eviction.
+
+    Sessions expire after ttl_seconds of inactivity, and the least recently
+    used sessions are evicted once max_entries or max_bytes is exceeded.
+    """
+
+    backend_name = "memory"
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 10000,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600
+    ):
+        self._cache = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds,
+            sizeof=estimate_state_size
+        )
+
+    async def get(self, session_id: str) -> Optional[AgentState]:
+        return self._cache.get(session_id)
+
+    async def save(self, session_id: str, state: AgentState) -> None:
+        state.session_id = session_id
+        # Re-inserting refreshes the size estimate and the idle timer
+        self._cache.set(session_id, state)
+
+    async def delete(self, session_id: str) -> bool:
+        return self._cache.pop(session_id) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend_name, **self._cache.stats()}
@@ -0,0 +1,352 @@
+"""
+SQLite Session Store - Durable sessions with write-behind batching
+==================================================================
+
+Sessions survive restarts and redeploys (point SESSION_DB_PATH at a
+mounted volume on Cloud Run).
+
+Hot path:
+- Reads are served from an in-memory LRU; a miss loads the session lazily
+- save() only diffs the state against what was last persisted and queues
+  the delta (new messages, changed agent_data keys) - no disk I/O
+
+Background:
+- A flusher task writes all queued deltas in one transaction every
+  flush_interval seconds on a dedicated thread
+- The database runs in WAL mode with synchronous=NORMAL, so commits don't
+  fsync; a crash can lose at most the last unflushed batch
+
+Recovery is just opening the file: there is no log to replay, sessions
+are loaded on first access.
+
+Sessions on the No Records privacy tier never reach the database: they
+live in the LRU only, and picking that tier mid-conversation deletes
+whatever was already written.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import sqlite3
+import time
+
+from agents.base_agent import AgentState, AgentMessage
+from .lru_cache import LRUCache
+from .session_store import SessionStore, StateDelta, StateSnapshot, estimate_state_size, is_retained
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    current_agent TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS session_data (
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (session_id, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+"""
+
+
+class _CachedSession:
+    """Cache entry: live state plus what has been queued for disk"""
+
+    __slots__ = ("state", "snapshot", "durable")
+
+    def __init__(self, state: AgentState, snapshot: StateSnapshot, durable: bool = True):
+        self.state = state
+        self.snapshot = snapshot
+        self.durable = durable  # False: memory only, nothing of it on disk
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store backed by a local SQLite database in WAL mode.
+
+    Messages and agent_data keys are stored as rows, so each save appends
+    or replaces only what changed instead of rewriting the whole session.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(
+        self,
+        path: str = "sessions.db",
+        flush_interval: float = 0.5,
+        retention_seconds: Optional[float] = None,
+        max_entries: Optional[int] = 10000,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retention_seconds = retention_seconds
+
+        # Idle TTL here only drops sessions from memory - they stay on disk
+        self._cache = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds,
+            sizeof=lambda entry: estimate_state_size(entry.state)
+        )
+
+        # All database access happens on this one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-sessions")
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # Queued writes: ("upsert", session_id, StateDelta) or ("delete", session_id, None)
+        self._pending: List[Tuple[str, str, Optional[StateDelta]]] = []
+        self._pending_ids: set = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        # Metrics
+        self.flushes = 0
+        self.flush_errors = 0
+        self.ops_written = 0
+        self.disk_loads = 0
+        self.memory_only = 0
+        self.last_flush_ms = 0.0
+
+    async def start(self) -> None:
+        await self._run(self._open)
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        await self.flush()
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=True)
+
+    async def get(self, session_id: str) -> Optional[AgentState]:
+        entry = self._cache.get(session_id)
+        if entry is not None:
+            return entry.state
+
+        # Deltas for this session may still be queued - land them first
+        if session_id in self._pending_ids:
+            await self.flush()
+
+        state = await self._run(self._load, session_id)
+        if state is None:
+            return None
+
+        self.disk_loads += 1
+        self._cache.set(session_id, _CachedSession(state, StateSnapshot.capture(state)))
+        return state
+
+    async def save(self, session_id: str, state: AgentState) -> None:
+        state.session_id = session_id
+
+        entry = self._cache.peek(session_id)
+
+        if not is_retained(state):
+            # Keep it in memory only; drop anything persisted before the tier was picked
+            if entry is None or entry.durable:
+                self._pending.append(("delete", session_id, None))
+                self._pending_ids.add(session_id)
+                self.memory_only += 1
+            self._cache.set(session_id, _CachedSession(state, StateSnapshot(), durable=False))
+            return
+
+        if entry is not None and entry.state is state:
+            delta, snapshot = entry.snapshot.diff(state)
+        else:
+            # New session, or the cached copy was evicted/replaced while
+            # this request held the state - persist it in full
+            delta, snapshot = StateSnapshot().diff(state, rewrite=True)
+
+        self._cache.set(session_id, _CachedSession(state, snapshot))
+
+        if not delta.is_empty():
+            self._pending.append(("upsert", session_id, delta))
+            self._pending_ids.add(session_id)
+
+    async def delete(self, session_id: str) -> bool:
+        cached = self._cache.pop(session_id) is not None
+
+        if session_id in self._pending_ids:
+            await self.flush()
+        existed = cached or await self._run(self._exists, session_id)
+
+        if existed:
+            self._pending.append(("delete", session_id, None))
+            self._pending_ids.add(session_id)
+        return existed
+
+    async def flush(self) -> None:
+        """Write all queued deltas in a single transaction"""
+        async with self._flush_lock:
+            if not self._pending or self._conn is None:
+                return
+
+            batch, self._pending = self._pending, []
+            self._pending_ids = set()
+
+            started = time.perf_counter()
+            try:
+                await self._run(self._write_batch, batch)
+            except Exception as e:
+                # Put the batch back in front of anything queued meanwhile
+                self.flush_errors += 1
+                self._pending = batch + self._pending
+                self._pending_ids.update(session_id for _, session_id, _ in self._pending)
+                print(f"❌ Session flush failed ({len(batch)} ops): {e}")
+                return
+
+            self.flushes += 1
+            self.ops_written += len(batch)
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend_name,
+            **self._cache.stats(),
+            "pending_ops": len(self._pending),
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "ops_written": self.ops_written,
+            "disk_loads": self.disk_loads,
+            "memory_only_sessions": self.memory_only,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # --- Runs on the database thread -------------------------------------
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+
+        if self.retention_seconds:
+            cutoff = time.time() - self.retention_seconds
+            stale = [row[0] for row in conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,)
+            )]
+            if stale:
+                conn.execute("BEGIN")
+                for session_id in stale:
+                    self._delete_rows(conn, session_id)
+                conn.execute("COMMIT")
+                print(f"🧹 Pruned {len(stale)} expired sessions")
+
+        self._conn = conn
+
+    def _close_connection(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _exists(self, session_id: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row is not None
+
+    def _load(self, session_id: str) -> Optional[AgentState]:
+        conn = self._conn
+        row = conn.execute(
+            "SELECT user_id, current_agent FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        messages = [
+            AgentMessage(role=role, content=content)
+            for role, content in conn.execute(
+                "SELECT role, content FROM session_messages WHERE session_id = ? ORDER BY seq",
+                (session_id,)
+            )
+        ]
+        agent_data = {
+            key: json.loads(value)
+            for key, value in conn.execute(
+                "SELECT key, value FROM session_data WHERE session_id = ?", (session_id,)
+            )
+        }
+
+        return AgentState(
+            messages=messages,
+            agent_data=agent_data,
+            user_id=row[0],
+            current_agent=row[1],
+            session_id=session_id
+        )
+
+    def _write_batch(self, batch: List[Tuple[str, str, Optional[StateDelta]]]) -> None:
+        conn = self._conn
+        now = time.time()
+
+        conn.execute("BEGIN")
+        try:
+            for op, session_id, delta in batch:
+                if op == "delete":
+                    self._delete_rows(conn, session_id)
+                    continue
+
+                if delta.rewrite:
+                    self._delete_rows(conn, session_id)
+
+                conn.execute(
+                    "INSERT INTO sessions (session_id, user_id, current_agent, updated_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(session_id) DO UPDATE SET "
+                    "user_id = excluded.user_id, current_agent = excluded.current_agent, "
+                    "updated_at = excluded.updated_at",
+                    (session_id, delta.user_id, delta.current_agent, now)
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO session_messages (session_id, seq, role, content) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (session_id, delta.message_start + i, msg["role"], msg["content"])
+                        for i, msg in enumerate(delta.new_messages)
+                    ]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO session_data (session_id, key, value) VALUES (?, ?, ?)",
+                    [(session_id, key, value) for key, value in delta.changed_data.items()]
+                )
+                conn.executemany(
+                    "DELETE FROM session_data WHERE session_id = ? AND key = ?",
+                    [(session_id, key) for key in delta.removed_keys]
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _delete_rows(conn: sqlite3.Connection, session_id: str) -> None:
+        conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM session_data WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
@@ -0,0 +1,47 @@
+"""
+Stand-ins for Gemini models in tests
+"""
+
+import asyncio
+from types import SimpleNamespace
+from typing import List, Optional
+
+
+class FakeResponse:
+    """Just enough of a GenerateContentResponse for BaseAgent"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.candidates = [SimpleNamespace(
+            content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+            finish_reason=None,
+            safety_ratings=None
+        )]
+        self.prompt_feedback = None
+
+
+class FakeModel:
+    """Answers every prompt with the same text after an optional delay"""
+
+    def __init__(self, text: str, delay: float = 0.0, error: Optional[Exception] = None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.prompts: List[str] = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.prompts)
+
+    async def generate_content_async(self, prompt, stream: bool = False):
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if stream:
+            return self._stream()
+        return FakeResponse(self.text)
+
+    async def _stream(self):
+        for word in self.text.split(" "):
+            yield SimpleNamespace(text=word + " ")
@@ -0,0 +1,183 @@
+"""
+Chat turns that fail or are abandoned leave the session as they found it
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from agents.base_agent import AgentMessage
+from storage import IdempotencyStore
+from storage.session_store import InMemorySessionStore
+
+
+SESSION = "session_turns"
+
+
+class FakeCoordinator:
+    """Replies "ok" after a delay, or fails when told to"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.error = None
+        self.calls = 0
+
+    async def process(self, state):
+        self.calls += 1
+        state.agent_data["turns"] = state.agent_data.get("turns", 0) + 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        state.messages.append(AgentMessage(role="assistant", content="ok"))
+        return state
+
+
+class FakeHTTPRequest:
+    """Client connection that can be dropped"""
+
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeCoordinator()
+    monkeypatch.setattr(main, "coordinator", fake)
+    monkeypatch.setattr(main, "session_store", InMemorySessionStore())
+    monkeypatch.setattr(main, "idempotency_store", IdempotencyStore())
+    monkeypatch.setattr(main, "DISCONNECT_POLL_SECONDS", 0.01)
+    return fake
+
+
+def chat(message, http_request=None, **fields):
+    request = main.ChatRequest(user_id="u", session_id=SESSION, message=message, **fields)
+    return main.chat(request, http_request or FakeHTTPRequest())
+
+
+async def roles():
+    state = await main.session_store.get(SESSION)
+    return [message.role for message in state.messages]
+
+
+def test_failed_turn_leaves_no_user_message(fake):
+    async def turns():
+        await chat("hello")
+
+        fake.error = RuntimeError("model down")
+        with pytest.raises(HTTPException) as failed:
+            await chat("are you there?")
+        assert failed.value.status_code == 500
+
+        fake.error = None
+        await chat("are you there?")
+        return await roles(), await main.session_store.get(SESSION)
+
+    roles_after, state = asyncio.run(turns())
+
+    assert roles_after == ["user", "assistant", "user", "assistant"]
+    # agent_data changes of the failed turn are undone too
+    assert state.agent_data["turns"] == 2
+
+
+def test_disconnected_turn_leaves_no_user_message(fake):
+    async def turns():
+        await chat("hello")
+
+        fake.delay = 1.0
+        client = FakeHTTPRequest()
+        pending = asyncio.create_task(chat("still there?", client))
+        await asyncio.sleep(0.05)
+        client.disconnected = True
+        with pytest.raises(HTTPException) as dropped:
+            await pending
+        assert dropped.value.status_code == 499
+        return await roles()
+
+    assert asyncio.run(turns()) == ["user", "assistant"]
+
+
+def test_retry_after_disconnect_gets_the_keyed_turn(fake):
+    async def turns():
+        await chat("hello")
+
+        fake.delay = 0.2
+        client = FakeHTTPRequest()
+        first = asyncio.create_task(chat("still there?", client, idempotency_key="k1"))
+        await asyncio.sleep(0.05)
+        client.disconnected = True
+
+        # The retry joins the turn still running for the dropped client...
+        retry = await chat("still there?", idempotency_key="k1")
+        # ...and a later one replays its result
+        replay = await chat("still there?", idempotency_key="k1")
+        await first
+        return retry, replay, await roles()
+
+    retry, replay, roles_after = asyncio.run(turns())
+
+    assert fake.calls == 2
+    assert retry == replay
+    assert [message["role"] for message in retry.messages] == ["user", "assistant"]
+    assert roles_after == ["user", "assistant", "user", "assistant"]
+
+
+def stream(message):
+    request = main.ChatRequest(user_id="u", session_id=SESSION, message=message)
+    return main.chat_stream(request)
+
+
+async def read_events(response):
+    return [chunk.split("\n", 1)[0] async for chunk in response.body_iterator]
+
+
+def test_failed_stream_leaves_no_user_message(fake):
+    async def turns():
+        assert await read_events(await stream("hello")) == ["event: done"]
+
+        fake.error = RuntimeError("model down")
+        assert await read_events(await stream("are you there?")) == ["event: error"]
+        return await roles()
+
+    assert asyncio.run(turns()) == ["user", "assistant"]
+
+
+def test_abandoned_stream_leaves_no_user_message(fake):
+    async def turns():
+        await read_events(await stream("hello"))
+
+        fake.delay = 1.0
+        response = await stream("still there?")
+        reading = asyncio.create_task(read_events(response))
+        await asyncio.sleep(0.05)
+        reading.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await reading
+        return await roles()
+
+    assert asyncio.run(turns()) == ["user", "assistant"]
+
+
+def test_failed_socket_turn_leaves_no_user_message(fake):
+    with TestClient(main.app).websocket_connect(f"/ws/session/{SESSION}?user_id=u") as socket:
+        socket.send_json({"type": "message", "message": "hello"})
+        while socket.receive_json()["event"] != "turn_complete":
+            pass
+
+        fake.error = RuntimeError("model down")
+        socket.send_json({"type": "message", "message": "are you there?"})
+        assert socket.receive_json()["event"] == "error"
+
+        fake.error = None
+        socket.send_json({"type": "message", "message": "are you there?"})
+        while (event := socket.receive_json())["event"] != "turn_complete":
+            pass
+
+    assert [message["role"] for message in event["data"]["messages"]] == ["user", "assistant"]
+    assert event["data"]["cursor"] == 4
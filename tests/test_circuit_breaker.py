@@ -0,0 +1,128 @@
+"""
+Circuit breaker state transitions: closed -> open -> half-open -> closed/open
+"""
+
+import asyncio
+
+import pytest
+
+from agents.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def succeed(breaker):
+    with breaker.call() as call:
+        call.start()
+
+
+def fail(breaker, started=True):
+    with pytest.raises(RuntimeError):
+        with breaker.call() as call:
+            if started:
+                call.start()
+            raise RuntimeError("model error")
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test-model", min_calls=4, failure_rate=0.5, open_seconds=30, clock=clock)
+
+
+def open_breaker(breaker):
+    for _ in range(2):
+        succeed(breaker)
+    for _ in range(2):
+        fail(breaker)
+    assert breaker.state == OPEN
+
+
+def test_opens_once_the_failure_rate_is_reached(breaker):
+    succeed(breaker)
+    fail(breaker)
+    fail(breaker)
+    # Below min_calls: still closed
+    assert breaker.state == CLOSED
+
+    succeed(breaker)
+
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+
+
+def test_open_breaker_refuses_calls(breaker):
+    open_breaker(breaker)
+
+    with pytest.raises(CircuitOpenError):
+        succeed(breaker)
+    assert breaker.short_circuited == 1
+
+
+def test_half_open_lets_a_single_trial_through(breaker, clock):
+    open_breaker(breaker)
+    clock.now = 30
+    assert breaker.current_state() == HALF_OPEN
+
+    with breaker.call() as trial:
+        trial.start()
+        with pytest.raises(CircuitOpenError):
+            succeed(breaker)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["recent_calls"] == 0
+
+
+def test_failed_trial_opens_the_breaker_again(breaker, clock):
+    open_breaker(breaker)
+    clock.now = 30
+
+    fail(breaker)
+
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+    clock.now = 59
+    assert breaker.current_state() == OPEN
+
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = CircuitBreaker("test-model", min_calls=2, slow_call_seconds=0.0, clock=clock)
+
+    succeed(breaker)
+    succeed(breaker)
+
+    assert breaker.state == OPEN
+    assert breaker.slow_calls == 2
+
+
+def test_calls_that_never_reached_the_model_are_not_counted(breaker):
+    for _ in range(4):
+        fail(breaker, started=False)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["recent_calls"] == 0
+
+
+def test_abandoned_trial_frees_the_trial_slot(breaker, clock):
+    open_breaker(breaker)
+    clock.now = 30
+
+    with pytest.raises(asyncio.CancelledError):
+        with breaker.call() as trial:
+            trial.start()
+            raise asyncio.CancelledError()
+
+    # Nothing was learned about the model - the next call is the trial
+    assert breaker.state == HALF_OPEN
+    succeed(breaker)
+    assert breaker.state == CLOSED
@@ -0,0 +1,89 @@
+"""
+Concurrent crisis screen: model calls across intake, privacy and crisis
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from agents import coordinator, speculation
+from agents.base_agent import AgentMessage, AgentState
+from tests.fakes import FakeModel
+
+
+ASSESSMENT = json.dumps({
+    "level": "moderate",
+    "category": "depression",
+    "reasoning": "Low mood and crying, no safety concerns",
+    "response": "That sounds really hard.",
+})
+OFFER = "Thanks for telling me. Would you like me to match you with a counselor?"
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(coordinator, "CONCURRENT_CRISIS_SCREEN", True)
+    monkeypatch.setattr(speculation, "ENABLED", False)
+    agent = coordinator.CoordinatorAgent()
+    agent.intake_agent.model = FakeModel(OFFER)
+    agent.crisis_agent.model = FakeModel(ASSESSMENT)
+    for sub in (agent.intake_agent, agent.crisis_agent):
+        sub.cache_responses = False
+    return agent
+
+
+def run(agent, messages):
+    async def turns():
+        state = AgentState(session_id="screen-test")
+        stages = []
+        for text in messages:
+            state.messages.append(AgentMessage(role="user", content=text))
+            state = await agent.process(state)
+            stages.append(state.current_agent)
+        return state, stages
+
+    return asyncio.run(turns())
+
+
+def test_crisis_stage_reuses_the_screen_across_privacy(agent):
+    state, stages = run(agent, [
+        "hi",
+        "I've been feeling really depressed and crying a lot",
+        "yes please",
+        "what now?",
+        "full support",
+        "ok",
+    ])
+
+    assert stages[:2] == ["intake", "intake"]
+    assert "privacy" in stages and stages[-1] == "crisis"
+    assert state.agent_data["crisis_level"] == "moderate"
+    # One screen during intake, reused by the crisis stage two turns later
+    assert agent.crisis_agent.model.calls == 1
+    screens = agent.crisis_agent.screens
+    assert screens["model"] == 1 and screens["reused"] == 1
+
+
+def test_turns_without_risk_language_make_no_screen_call(agent):
+    run(agent, ["hi", "work has been busy", "I'd like to talk to someone"])
+
+    assert agent.crisis_agent.model.calls == 0
+    assert agent.crisis_agent.screens["clear"] == 3
+
+
+def test_new_evidence_after_the_screen_is_assessed_again(agent):
+    state, stages = run(agent, [
+        "hi",
+        "I've been feeling really depressed and crying a lot",
+        "yes please",
+        "what now?",
+        "I feel hopeless and worthless",
+        "full support",
+        "ok",
+    ])
+
+    assert stages[-1] == "crisis"
+    # The screen of turn 2 no longer covers the evidence, so the stage asks again
+    assert agent.crisis_agent.model.calls == 2
+    assert agent.crisis_agent.screens["reused"] == 0
@@ -0,0 +1,27 @@
+"""
+Streamed generations feed the latency window hedging is based on
+"""
+
+import asyncio
+
+from agents import events, model_registry
+from agents.base_agent import AgentMessage, AgentState, BaseAgent
+from tests.fakes import FakeModel
+
+
+def test_streamed_call_records_its_latency():
+    agent = BaseAgent("Streamer", model_name="test-streamed-model")
+    agent.model = FakeModel("one two three", delay=0.05)
+    state = AgentState(session_id="s", messages=[AgentMessage(role="user", content="hi")])
+
+    async def generate():
+        queue = asyncio.Queue()
+        with events.listen(queue):
+            text = await agent.agenerate_response(state)
+        return text, queue.qsize()
+
+    text, tokens = asyncio.run(generate())
+
+    assert text == "one two three"
+    assert tokens == 3
+    assert model_registry.latency_percentile("test-streamed-model", 0.5) >= 0.05
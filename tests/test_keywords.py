@@ -0,0 +1,15 @@
+"""
+Keyword vocabulary: labels that describe the same thing match the same words
+"""
+
+import pytest
+
+from agents import keywords
+
+
+@pytest.mark.parametrize("text", ["work is awful", "I'm working nights", "my workplace", "lost my job", "career change"])
+def test_career_category_and_topic_match_the_same_words(text):
+    labels = keywords.scan(text)
+
+    assert "category:career" in labels
+    assert "topic:career" in labels
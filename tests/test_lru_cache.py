@@ -0,0 +1,119 @@
+"""
+LRU cache bounds: entry count, byte budget and idle TTL
+"""
+
+import asyncio
+
+from agents.base_agent import AgentMessage, AgentState
+from storage.lru_cache import LRUCache
+from storage.session_store import InMemorySessionStore, estimate_state_size
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions["capacity"] == 1
+
+
+def test_byte_budget_evicts_until_it_fits():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.set("c", "xxxxxxxx")
+
+    assert "a" not in cache and "b" not in cache
+    assert cache.total_bytes == 8
+    assert cache.evictions["memory"] == 2
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("a", "xx")
+    cache.set("b", "xxxxxxxx")
+
+    assert cache.total_bytes == 10
+    assert "a" in cache
+
+
+def test_oversized_entry_is_kept_alone():
+    cache = LRUCache(max_bytes=4, sizeof=len)
+    cache.set("a", "xx")
+    cache.set("big", "xxxxxxxx")
+
+    assert "a" not in cache
+    assert cache.get("big") == "xxxxxxxx"
+
+
+def test_idle_entries_expire_and_reads_keep_them_alive():
+    clock = Clock()
+    cache = LRUCache(ttl_seconds=10, clock=clock)
+    cache.set("read", 1)
+    cache.set("idle", 2)
+
+    clock.now = 8
+    cache.get("read")
+    clock.now = 15
+
+    assert cache.get("idle") is None
+    assert cache.get("read") == 1
+    assert cache.evictions["expired"] == 1
+
+
+def test_peek_does_not_refresh_the_idle_timer():
+    clock = Clock()
+    cache = LRUCache(ttl_seconds=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 8
+    assert cache.peek("a") == 1
+    clock.now = 15
+
+    assert cache.peek("a") is None
+    assert cache.hits == 0
+
+
+def test_writes_sweep_expired_entries():
+    clock = Clock()
+    cache = LRUCache(ttl_seconds=10, sizeof=len, clock=clock)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+
+    clock.now = 20
+    cache.set("c", "xx")
+
+    assert len(cache) == 1
+    assert cache.total_bytes == 2
+
+
+def test_session_store_evicts_by_estimated_size():
+    def state(text):
+        return AgentState(messages=[AgentMessage(role="user", content=text)])
+
+    budget = estimate_state_size(state("x" * 100)) * 2
+
+    async def scenario():
+        store = InMemorySessionStore(max_entries=None, max_bytes=budget, ttl_seconds=None)
+        await store.save("s1", state("x" * 100))
+        await store.save("s2", state("x" * 100))
+        await store.save("s3", state("x" * 100))
+        return [await store.get(session_id) is not None for session_id in ("s1", "s2", "s3")], store.stats()
+
+    present, stats = asyncio.run(scenario())
+
+    assert present == [False, True, True]
+    assert stats["evictions"]["memory"] == 1
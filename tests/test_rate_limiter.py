@@ -0,0 +1,101 @@
+"""
+Gemini admission: priority order, crisis reserve and token buckets
+"""
+
+import asyncio
+
+from agents.rate_limiter import ModelRateLimiter, Priority, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def call(limiter, priority, log, release):
+    async with limiter.admit(priority):
+        log.append(priority.name.lower())
+        await release.wait()
+
+
+def test_waiting_calls_are_served_by_priority_then_arrival():
+    limiter = ModelRateLimiter(max_concurrency=1)
+
+    async def scenario():
+        log, release = [], asyncio.Event()
+        first = asyncio.create_task(call(limiter, Priority.BACKGROUND, log, release))
+        await asyncio.sleep(0)
+        waiting = []
+        for priority in (Priority.BACKGROUND, Priority.CONVERSATION, Priority.CRISIS, Priority.CONVERSATION):
+            waiting.append(asyncio.create_task(call(limiter, priority, log, release)))
+            await asyncio.sleep(0)
+        depth = limiter.queue_depth()
+        release.set()
+        await asyncio.gather(first, *waiting)
+        return log, depth
+
+    log, depth = asyncio.run(scenario())
+
+    assert depth == 4
+    assert log == ["background", "crisis", "conversation", "conversation", "background"]
+
+
+def test_crisis_reserve_admits_crisis_calls_past_other_traffic():
+    limiter = ModelRateLimiter(max_concurrency=2, crisis_reserve=1)
+
+    async def scenario():
+        log, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(call(limiter, Priority.CONVERSATION, log, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        crisis = asyncio.create_task(call(limiter, Priority.CRISIS, log, release))
+        await asyncio.sleep(0)
+        admitted = list(log)
+        release.set()
+        await asyncio.gather(crisis, *tasks)
+        return admitted
+
+    # One conversation slot; the reserved one goes to the crisis call
+    assert asyncio.run(scenario()) == ["conversation", "crisis"]
+
+
+def test_crisis_reserve_always_leaves_a_slot_for_everyone_else():
+    assert ModelRateLimiter(max_concurrency=2, crisis_reserve=5).crisis_reserve == 1
+    assert ModelRateLimiter(max_concurrency=1, crisis_reserve=1).crisis_reserve == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    limiter = ModelRateLimiter(max_concurrency=1)
+
+    async def scenario():
+        log, release = [], asyncio.Event()
+        first = asyncio.create_task(call(limiter, Priority.CONVERSATION, log, release))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(call(limiter, Priority.CRISIS, log, release))
+        later = asyncio.create_task(call(limiter, Priority.BACKGROUND, log, release))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, later)
+        return log, limiter.stats()
+
+    log, stats = asyncio.run(scenario())
+
+    assert log == ["conversation", "background"]
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+
+def test_token_bucket_refills_at_its_rate():
+    clock = Clock()
+    bucket = TokenBucket(60, clock)
+
+    bucket.take(60)
+    assert bucket.wait_time(30) == 30.0
+
+    clock.now = 30
+    assert bucket.wait_time(30) == 0.0
+    # A request larger than the bucket waits for a full bucket, not forever
+    assert bucket.wait_time(1000) == 30.0
@@ -0,0 +1,134 @@
+"""
+Redis session store round trips against fakeredis
+"""
+
+import asyncio
+import json
+
+import fakeredis
+import pytest
+
+from agents.base_agent import AgentMessage, AgentState
+from storage.redis_store import RedisSessionStore
+
+
+HASH = "nimacare:session:s1"
+MESSAGES = "nimacare:session:s1:messages"
+
+
+def new_store(client):
+    return RedisSessionStore(client=client, ttl_seconds=3600)
+
+
+def new_state(*contents):
+    return AgentState(
+        user_id="u",
+        current_agent="intake",
+        messages=[AgentMessage(role="user", content=text) for text in contents],
+        agent_data={"intake_complete": False, "notes": ["a"]}
+    )
+
+
+@pytest.fixture
+def client():
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+def test_save_and_get_round_trip(client):
+    async def run():
+        await new_store(client).save("s1", new_state("hi", "hello"))
+        # A second instance has no snapshot and reads everything from Redis
+        return await new_store(client).get("s1")
+
+    state = asyncio.run(run())
+
+    assert state.session_id == "s1" and state.user_id == "u"
+    assert state.current_agent == "intake"
+    assert [m.content for m in state.messages] == ["hi", "hello"]
+    assert state.agent_data == {"intake_complete": False, "notes": ["a"]}
+
+
+def test_save_sends_only_the_delta(client):
+    async def run():
+        store = new_store(client)
+        await store.save("s1", new_state("hi"))
+
+        state = await store.get("s1")
+        # Marks the stored copy: a full rewrite would replace it
+        await client.lset(MESSAGES, 0, json.dumps({"role": "user", "content": "stored"}))
+        await client.hset(HASH, "data:untouched", json.dumps("stored"))
+
+        state.messages.append(AgentMessage(role="assistant", content="hello"))
+        state.agent_data["intake_complete"] = True
+        del state.agent_data["notes"]
+        await store.save("s1", state)
+
+        return await client.lrange(MESSAGES, 0, -1), await client.hgetall(HASH)
+
+    messages, fields = asyncio.run(run())
+
+    assert [json.loads(raw)["content"] for raw in messages] == ["stored", "hello"]
+    assert fields["data:intake_complete"] == "true"
+    assert "data:notes" not in fields
+    assert fields["data:untouched"] == '"stored"'
+
+
+def test_delete_removes_both_keys(client):
+    async def run():
+        store = new_store(client)
+        await store.save("s1", new_state("hi"))
+        deleted = await store.delete("s1")
+        return deleted, await client.exists(HASH, MESSAGES), await store.delete("s1"), await store.get("s1")
+
+    deleted, remaining, deleted_again, state = asyncio.run(run())
+
+    assert deleted and not deleted_again
+    assert remaining == 0
+    assert state is None
+
+
+def test_get_refreshes_the_idle_ttl(client):
+    async def run():
+        store = new_store(client)
+        await store.save("s1", new_state("hi"))
+        await client.expire(HASH, 10)
+        await client.expire(MESSAGES, 10)
+
+        await store.get("s1")
+        return await client.ttl(HASH), await client.ttl(MESSAGES)
+
+    for ttl in asyncio.run(run()):
+        assert 3500 < ttl <= 3600
+
+
+def test_no_records_session_is_never_written(client):
+    async def run():
+        store = new_store(client)
+        state = new_state("hi")
+        state.agent_data["privacy_tier"] = "no_records"
+        await store.save("s1", state)
+
+        state.messages.append(AgentMessage(role="assistant", content="hello"))
+        await store.save("s1", state)
+        return await client.keys("*"), await store.get("s1") is state
+
+    keys, served_from_memory = asyncio.run(run())
+
+    assert keys == []
+    assert served_from_memory
+
+
+def test_switching_to_no_records_deletes_the_stored_session(client):
+    async def run():
+        store = new_store(client)
+        await store.save("s1", new_state("hi"))
+
+        state = await store.get("s1")
+        state.agent_data["privacy_tier"] = "no_records"
+        await store.save("s1", state)
+        return await client.exists(HASH, MESSAGES), await new_store(client).get("s1")
+
+    remaining, elsewhere = asyncio.run(run())
+
+    assert remaining == 0
+    assert elsewhere is None
@@ -0,0 +1,140 @@
+"""
+Risk screen regressions: disclosures must never be settled below the LLM,
+and mentions that aren't the user's own intent must never be settled
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from agents import risk_scorer, risk_state
+from agents.base_agent import AgentMessage, AgentState
+
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+
+# Reported disclosures that matched no lexicon phrase and were settled NONE
+DISCLOSURES = [
+    "I've been thinking about ending my life",
+    "I'm planning to jump off a bridge tonight",
+    "I bought a gun and wrote a note",
+    "I have pills saved up",
+    "I've been hurting myself again",
+    "i wish i could just go to sleep and never wake up",
+    "I'm so stressed and tired, I have pills saved up",
+]
+
+
+# Serious words the user isn't using about themselves, now
+NOT_INTENT = [
+    "my brother died by suicide",
+    "my brother died by suicide and I miss him",
+    "I think he died by suicide",
+    "my friend told me she wants to die",
+    "I watched a movie about suicide",
+    "I read an article on suicide prevention",
+    "I used to self harm years ago",
+    "I was suicidal when I was 15",
+    "the song 'I want to die' is stuck in my head",
+    'the lyrics "I want to end it all" are so dark',
+]
+
+
+@pytest.fixture(scope="module")
+def model():
+    model = risk_scorer.load()
+    assert model is not None, "data/risk_model.json failed to load"
+    return model
+
+
+@pytest.mark.parametrize("message", DISCLOSURES)
+def test_disclosures_settle_immediate(model, message):
+    verdict = model.score([message])
+
+    assert verdict.settled
+    assert verdict.level == "immediate"
+
+
+@pytest.mark.parametrize("message", NOT_INTENT)
+def test_mentions_that_are_not_intent_are_not_settled(model, message):
+    verdict = model.score([message])
+
+    assert not verdict.settled
+    # Not held at HIGH either: the LLM decides
+    assert verdict.floor in ("none", "low", "moderate")
+    assert not any(match.startswith("immediate:") for match in verdict.matches)
+
+
+@pytest.mark.parametrize("message", ["I have a few pills left", "my grandpa keeps a gun", "I wrote a note to my boss"])
+def test_broad_phrases_do_not_raise_a_high_floor(model, message):
+    assert model.score([message]).floor != "high"
+
+
+def test_unattributed_immediate_language_goes_to_the_llm_with_high_floor(model):
+    verdict = model.score(["thinking about suicide a lot"])
+
+    assert not verdict.settled
+    assert verdict.floor == "high"
+
+
+@pytest.mark.parametrize("message", ["hello", "I feel a bit stressed and tired lately", "all good, thanks"])
+def test_levels_below_immediate_are_never_settled(model, message):
+    verdict = model.score([message])
+
+    assert not verdict.settled
+    assert verdict.level == verdict.floor
+
+
+def test_mild_words_do_not_lower_the_probability(model):
+    risky = model.score(["I have a few pills left"]).probability
+    diluted = model.score(["I'm so stressed and tired and sad, I have a few pills left"]).probability
+
+    assert diluted >= risky
+
+
+def test_feature_weights_are_non_negative(model):
+    assert all(model.weights[feature] >= 0 for feature in risk_scorer.FEATURES)
+
+
+def test_eval_set_has_no_under_calls(model):
+    with open(DATA / "risk_eval.jsonl") as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+
+    for example in examples:
+        verdict = model.score(example["messages"])
+        if verdict.settled:
+            assert risk_scorer.level_index(verdict.level) >= risk_scorer.level_index(example["level"]), example
+
+
+def test_floor_resets_once_an_assessment_weighed_the_evidence(model):
+    state = AgentState(messages=[AgentMessage(role="user", content="thinking about suicide a lot")])
+    risk_state.update(state)
+    assert model.decide(risk_state.features(state.agent_data)).floor == "high"
+
+    risk_state.mark_assessed(state.agent_data)
+    state.messages.append(AgentMessage(role="user", content="ok, which counselor?"))
+    risk_state.update(state)
+    assert model.decide(risk_state.features(state.agent_data)).floor == "none"
+
+    # New first-person intent still settles
+    state.messages.append(AgentMessage(role="user", content="I have pills saved up"))
+    risk_state.update(state)
+    assert model.decide(risk_state.features(state.agent_data)).settled
+
+
+def test_eval_set_has_no_over_calls(model):
+    with open(DATA / "risk_eval.jsonl") as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+
+    for example in examples:
+        verdict = model.score(example["messages"])
+        if verdict.settled:
+            assert verdict.level == example["level"], example
+
+
+def test_apply_floor_never_lowers_the_level(model):
+    verdict = model.score(["I wrote a note and I'm giving away my things"])
+
+    assert risk_scorer.apply_floor("none", verdict) == verdict.floor
+    assert risk_scorer.apply_floor("immediate", verdict) == "immediate"
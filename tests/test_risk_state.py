@@ -0,0 +1,67 @@
+"""
+Running risk state: what the screen decides on across turns
+"""
+
+import json
+from pathlib import Path
+
+from agents import risk_scorer, risk_state
+from agents.base_agent import AgentMessage, AgentState
+
+
+DATA = Path(__file__).resolve().parent.parent / "data"
+
+
+def converse(*texts):
+    state = AgentState()
+    for text in texts:
+        state.messages.append(AgentMessage(role="user", content=text))
+        risk_state.update(state)
+    return state
+
+
+def test_negative_weight_in_model_file_is_clamped():
+    with open(DATA / "risk_model.json") as f:
+        spec = json.load(f)
+    spec["weights"]["low"] = -2.0
+
+    assert risk_scorer.RiskModel(spec).weights["low"] == 0.0
+
+
+def test_disclosure_stays_in_the_screen_after_calm_turns():
+    state = converse("I have pills saved up", "ok", "I'm fine, just tired", "whatever")
+
+    verdict = risk_scorer.get_model().decide(risk_state.features(state.agent_data))
+    assert verdict.level == "immediate"
+
+
+def test_scores_decay_but_totals_do_not():
+    state = converse("I have pills saved up", "ok", "ok")
+    risk = risk_state.get(state.agent_data)
+
+    assert risk["turn"] == 3
+    assert risk["totals"]["immediate"] > risk["scores"]["immediate"] > 0
+
+
+def test_messages_already_folded_in_are_skipped():
+    state = converse("I have pills saved up")
+    before = json.dumps(risk_state.get(state.agent_data), sort_keys=True)
+
+    state.messages.append(AgentMessage(role="assistant", content="I'm here with you."))
+    risk_state.update(state)
+    risk_state.update(state)
+
+    risk = risk_state.get(state.agent_data)
+    assert risk["turn"] == 1
+    assert risk["messages_seen"] == 2
+    assert {k: v for k, v in risk.items() if k != "messages_seen"} == \
+        {k: v for k, v in json.loads(before).items() if k != "messages_seen"}
+
+
+def test_intent_evidence_is_bounded_and_described():
+    state = converse(*["I have pills saved up"] * (risk_state.EVIDENCE_PER_CLASS + 2))
+    risk = risk_state.get(state.agent_data)
+
+    assert len(risk["intent"]) == risk_state.EVIDENCE_PER_CLASS
+    assert risk["intent"][-1][0] == risk["turn"]
+    assert "First-person intent or plan" in risk_state.describe(state.agent_data)
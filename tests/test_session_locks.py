@@ -0,0 +1,76 @@
+"""
+Per-session locks: one turn at a time per session, sessions in parallel
+"""
+
+import asyncio
+import gc
+
+from storage import SessionLockManager
+
+
+async def turn(locks, session_id, log, delay=0.02):
+    async with locks.hold(session_id):
+        log.append(("start", session_id))
+        await asyncio.sleep(delay)
+        log.append(("end", session_id))
+
+
+def test_same_session_runs_one_turn_at_a_time():
+    locks = SessionLockManager()
+    log = []
+
+    async def scenario():
+        await asyncio.gather(turn(locks, "s1", log), turn(locks, "s1", log))
+
+    asyncio.run(scenario())
+
+    assert log == [("start", "s1"), ("end", "s1"), ("start", "s1"), ("end", "s1")]
+    assert locks.acquisitions == 2 and locks.contended == 1
+
+
+def test_different_sessions_run_in_parallel():
+    locks = SessionLockManager()
+    log = []
+
+    async def scenario():
+        await asyncio.gather(turn(locks, "s1", log), turn(locks, "s2", log))
+
+    asyncio.run(scenario())
+
+    assert [event for event, _ in log[:2]] == ["start", "start"]
+    assert locks.contended == 0
+
+
+def test_idle_locks_are_released():
+    locks = SessionLockManager()
+
+    async def scenario():
+        async with locks.hold("s1"):
+            held = locks.stats()["active_locks"]
+        return held
+
+    held = asyncio.run(scenario())
+    gc.collect()
+
+    assert held == 1
+    assert locks.stats()["active_locks"] == 0
+
+
+def test_cancelled_waiter_does_not_take_the_lock():
+    locks = SessionLockManager()
+
+    async def scenario():
+        log = []
+        first = asyncio.create_task(turn(locks, "s1", log, delay=0.05))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(turn(locks, "s1", log))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(first, waiter, return_exceptions=True)
+        # The lock is free again for the next turn
+        await asyncio.wait_for(turn(locks, "s1", log), timeout=1)
+        return log
+
+    log = asyncio.run(scenario())
+
+    assert log == [("start", "s1"), ("end", "s1"), ("start", "s1"), ("end", "s1")]
@@ -0,0 +1,74 @@
+"""
+Concurrent generations: equivalent cacheable prompts share one Gemini call
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from agents import single_flight
+from agents.base_agent import AgentMessage, AgentState, BaseAgent
+from tests.fakes import FakeModel
+
+
+class CachedAgent(BaseAgent):
+    cache_responses = True
+
+
+class UncachedAgent(BaseAgent):
+    cache_responses = False
+
+
+def session(session_id, **agent_data):
+    return AgentState(
+        session_id=session_id,
+        messages=[AgentMessage(role="user", content="hi")],
+        agent_data=agent_data
+    )
+
+
+def generate_concurrently(agent, states):
+    # A fresh context keeps earlier tests' cached answers out of the way
+    context = f"test {uuid.uuid4().hex}"
+
+    async def generate():
+        return await asyncio.gather(*(agent.agenerate_response(state, context, stream=False) for state in states))
+
+    return asyncio.run(generate())
+
+
+@pytest.fixture
+def model():
+    return FakeModel("hello there", delay=0.05)
+
+
+def test_sessions_share_an_in_flight_cacheable_prompt(model):
+    agent = CachedAgent("Cached")
+    agent.model = model
+    coalesced = single_flight.generations.coalesced
+
+    replies = generate_concurrently(agent, [session("a"), session("b"), session("c")])
+
+    assert replies == ["hello there"] * 3
+    assert model.calls == 1
+    assert single_flight.generations.coalesced == coalesced + 2
+
+
+def test_no_records_sessions_never_share_a_call(model):
+    agent = CachedAgent("Cached")
+    agent.model = model
+
+    generate_concurrently(agent, [session("a", privacy_tier="no_records"),
+                                  session("b", privacy_tier="no_records")])
+
+    assert model.calls == 2
+
+
+def test_uncached_agents_never_share_a_call(model):
+    agent = UncachedAgent("Uncached")
+    agent.model = model
+
+    generate_concurrently(agent, [session("a"), session("b")])
+
+    assert model.calls == 2
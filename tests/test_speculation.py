@@ -0,0 +1,104 @@
+"""
+Speculation: parts a stage computes itself stop running in the background
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from agents import speculation
+from agents.base_agent import AgentState
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(speculation, "ENABLED", True)
+
+
+def new_state(category="anxiety"):
+    return AgentState(session_id=f"spec-{uuid.uuid4().hex[:8]}", agent_data={"suggested_category": category})
+
+
+class Job:
+    """Background part that finishes after delay, recording whether it was cancelled"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.cancelled = False
+
+    async def __call__(self, snapshot, category):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"category": category}
+
+
+def test_stage_taking_an_unbuilt_part_cancels_only_that_part():
+    state = new_state()
+    slow, quick = Job(delay=1.0), Job()
+
+    async def scenario():
+        task = speculation.schedule(state, {"resource": slow, "habit": quick})
+        await asyncio.sleep(0.01)
+
+        # The resource stage got there first and computes the part itself
+        assert speculation.take(state, "resource", "anxiety") is None
+        await asyncio.wait_for(task, timeout=0.5)
+        speculation.apply_pending(state)
+
+    asyncio.run(scenario())
+
+    assert slow.cancelled and not quick.cancelled
+    assert state.agent_data["speculative"]["parts"] == {"habit": {"category": "anxiety"}}
+    assert speculation.take(state, "habit", "anxiety") == {"category": "anxiety"}
+
+
+def test_new_category_cancels_the_running_speculation():
+    state = new_state()
+    old = Job(delay=1.0)
+
+    async def scenario():
+        first = speculation.schedule(state, {"resource": old})
+        await asyncio.sleep(0.01)
+        state.agent_data["selected_category"] = "depression"
+        second = speculation.schedule(state, {"resource": Job()})
+        await asyncio.gather(first, second, return_exceptions=True)
+        speculation.apply_pending(state)
+
+    asyncio.run(scenario())
+
+    assert old.cancelled
+    assert state.agent_data["speculative"]["category"] == "depression"
+
+
+def test_taking_a_part_for_another_category_discards_the_speculation():
+    state = new_state()
+
+    async def scenario():
+        await speculation.schedule(state, {"resource": Job(), "habit": Job()})
+        speculation.apply_pending(state)
+
+    asyncio.run(scenario())
+    state.agent_data["selected_category"] = "grief"
+
+    assert speculation.take(state, "resource", "grief") is None
+    assert "speculative" not in state.agent_data
+
+
+def test_forget_cancels_in_flight_speculation():
+    state = new_state()
+    job = Job(delay=1.0)
+
+    async def scenario():
+        task = speculation.schedule(state, {"resource": job})
+        await asyncio.sleep(0.01)
+        speculation.forget(state.session_id)
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert job.cancelled
+    assert not speculation.apply_pending(state)
@@ -0,0 +1,179 @@
+"""
+SQLite session store: write-behind deltas, eviction and recovery
+"""
+
+import asyncio
+
+import pytest
+
+from agents.base_agent import AgentMessage, AgentState
+from storage.sqlite_store import SQLiteSessionStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def new_store(path, **kwargs):
+    # Flushed by hand, never by the background task
+    return SQLiteSessionStore(path=path, flush_interval=3600, **kwargs)
+
+
+def new_state(*contents, **agent_data):
+    return AgentState(
+        user_id="u",
+        current_agent="intake",
+        messages=[AgentMessage(role="user", content=text) for text in contents],
+        agent_data={"intake_complete": False, **agent_data}
+    )
+
+
+async def reopened(path, session_id):
+    """The session as a freshly started store reads it from disk"""
+    store = new_store(path)
+    await store.start()
+    try:
+        return await store.get(session_id)
+    finally:
+        await store.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sessions_survive_close_and_reopen(path):
+    async def scenario():
+        store = new_store(path)
+        await store.start()
+        await store.save("s1", new_state("hi", "hello", notes=["a"]))
+        # close() flushes what is still queued
+        await store.close()
+        return await reopened(path, "s1")
+
+    state = run(scenario())
+
+    assert [m.content for m in state.messages] == ["hi", "hello"]
+    assert state.agent_data == {"intake_complete": False, "notes": ["a"]}
+    assert state.user_id == "u" and state.current_agent == "intake"
+
+
+def test_removed_keys_are_deleted_from_disk(path):
+    async def scenario():
+        store = new_store(path)
+        await store.start()
+        state = new_state("hi", notes=["a"])
+        await store.save("s1", state)
+        await store.flush()
+
+        del state.agent_data["notes"]
+        state.agent_data["intake_complete"] = True
+        state.messages.append(AgentMessage(role="assistant", content="hello"))
+        await store.save("s1", state)
+        await store.close()
+        return await reopened(path, "s1")
+
+    state = run(scenario())
+
+    assert state.agent_data == {"intake_complete": True}
+    assert [m.content for m in state.messages] == ["hi", "hello"]
+
+
+def test_state_evicted_while_held_is_rewritten_in_full(path):
+    async def scenario():
+        store = new_store(path, max_entries=1)
+        await store.start()
+        await store.save("s1", new_state("hi", notes=["a"]))
+        await store.flush()
+
+        state = await store.get("s1")
+        # Another session pushes s1 out of the cache mid-request
+        await store.save("s2", new_state("other"))
+        del state.agent_data["notes"]
+        state.messages.append(AgentMessage(role="assistant", content="hello"))
+        await store.save("s1", state)
+        await store.close()
+        return await reopened(path, "s1")
+
+    state = run(scenario())
+
+    assert state.agent_data == {"intake_complete": False}
+    assert [m.content for m in state.messages] == ["hi", "hello"]
+
+
+def test_get_lands_pending_deltas_before_loading(path):
+    async def scenario():
+        store = new_store(path, max_entries=1)
+        await store.start()
+        await store.save("s1", new_state("hi"))
+        # Evicted before its delta was flushed
+        await store.save("s2", new_state("other"))
+        pending = store.stats()["pending_ops"]
+
+        state = await store.get("s1")
+        stats = store.stats()
+        await store.close()
+        return pending, state, stats
+
+    pending, state, stats = run(scenario())
+
+    assert pending == 2
+    assert [m.content for m in state.messages] == ["hi"]
+    assert stats["disk_loads"] == 1 and stats["pending_ops"] == 0
+
+
+def test_switching_to_no_records_queues_a_delete(path):
+    async def scenario():
+        store = new_store(path)
+        await store.start()
+        state = new_state("hi")
+        await store.save("s1", state)
+        await store.flush()
+
+        state.agent_data["privacy_tier"] = "no_records"
+        state.messages.append(AgentMessage(role="assistant", content="hello"))
+        await store.save("s1", state)
+        stats = store.stats()
+        in_memory = await store.get("s1")
+        await store.close()
+        return stats, in_memory is state, await reopened(path, "s1")
+
+    stats, in_memory, on_disk = run(scenario())
+
+    assert stats["pending_ops"] == 1 and stats["memory_only_sessions"] == 1
+    assert in_memory
+    assert on_disk is None
+
+
+def test_failed_batch_is_requeued_ahead_of_newer_writes(path):
+    async def scenario():
+        store = new_store(path)
+        await store.start()
+        state = new_state("hi")
+        await store.save("s1", state)
+
+        write_batch = store._write_batch
+
+        def fail(batch):
+            raise OSError("disk full")
+
+        store._write_batch = fail
+        await store.flush()
+        failed = store.stats()
+
+        # Queued after the failure; must land after the requeued batch
+        state.messages.append(AgentMessage(role="assistant", content="hello"))
+        await store.save("s1", state)
+
+        store._write_batch = write_batch
+        await store.flush()
+        flushed = store.stats()
+        await store.close()
+        return failed, flushed, await reopened(path, "s1")
+
+    failed, flushed, state = run(scenario())
+
+    assert failed["flush_errors"] == 1 and failed["pending_ops"] == 1
+    assert flushed["pending_ops"] == 0 and flushed["ops_written"] == 2
+    assert [m.content for m in state.messages] == ["hi", "hello"]
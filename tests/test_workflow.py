@@ -0,0 +1,137 @@
+"""
+Workflow table: stage order, re-entry and the crisis fast lane
+"""
+
+import pytest
+
+from agents import keywords
+from agents.workflow import ANY, STAGE_KEY, WORKFLOW, Stage, Transition, Workflow, flag
+
+
+ALL_DONE = ("intake_complete", "privacy_complete", "crisis_complete",
+            "resource_complete", "scheduling_complete", "habit_complete")
+
+
+def done(*flags):
+    return {name: True for name in flags}
+
+
+@pytest.mark.parametrize("agent_data, expected", [
+    ({}, "intake"),
+    (done("intake_complete"), "privacy"),
+    (done("intake_complete", "privacy_complete"), "crisis"),
+    (done(*ALL_DONE[:3]), "resource"),
+    (done(*ALL_DONE[:4]), "scheduling"),
+    (done(*ALL_DONE[:5]), "habit"),
+    (done(*ALL_DONE), "complete"),
+    # Stages are walked in order: an unfinished earlier stage comes first
+    (done("privacy_complete", "crisis_complete"), "intake"),
+])
+def test_resolve_follows_stage_order(agent_data, expected):
+    assert WORKFLOW.resolve(agent_data) == expected
+    assert agent_data[STAGE_KEY] == expected
+
+
+@pytest.mark.parametrize("current", ["scheduling", "habit", "complete"])
+def test_rematch_returns_to_resource_matching(current):
+    agent_data = {**done(*ALL_DONE), "therapists_presented": True, "workflow_complete": True,
+                  STAGE_KEY: current}
+    labels = keywords.scan("Could I see a different counselor?")
+
+    assert WORKFLOW.resolve(agent_data, labels) == "resource"
+    assert "resource_complete" not in agent_data
+    assert "therapists_presented" not in agent_data
+    assert "workflow_complete" not in agent_data
+    # Stages before resource stay done
+    assert agent_data["crisis_complete"]
+
+
+@pytest.mark.parametrize("current", ["intake", "privacy", "crisis", "resource"])
+def test_rematch_is_ignored_before_scheduling(current):
+    agent_data = {**done(*ALL_DONE[:4]), STAGE_KEY: current}
+    labels = keywords.scan("another therapist please")
+
+    assert WORKFLOW.resolve(agent_data, labels) == "scheduling"
+    assert agent_data["resource_complete"]
+
+
+@pytest.mark.parametrize("current", [None, "intake", "privacy", "resource", "scheduling", "habit", "complete"])
+def test_fast_lane_enters_crisis_from_any_stage(current):
+    agent_data = {**done(*ALL_DONE), "crisis_preempted": True, "force_crisis": True,
+                  "crisis_category_suggested": True}
+    if current is not None:
+        agent_data[STAGE_KEY] = current
+
+    assert WORKFLOW.resolve(agent_data) == "crisis"
+    for name in ("crisis_preempted", "force_crisis", "crisis_category_suggested", "crisis_complete"):
+        assert name not in agent_data
+    # Only the crisis assessment is redone
+    assert agent_data["resource_complete"]
+
+
+def test_fast_lane_wins_over_rematch():
+    agent_data = {**done(*ALL_DONE), "crisis_preempted": True, STAGE_KEY: "habit"}
+    labels = keywords.scan("I want a different counselor")
+
+    assert WORKFLOW.resolve(agent_data, labels) == "crisis"
+    assert agent_data["resource_complete"]
+
+
+def test_after_fast_lane_the_stage_order_resumes():
+    agent_data = {**done(*ALL_DONE), "crisis_preempted": True, STAGE_KEY: "scheduling"}
+    assert WORKFLOW.resolve(agent_data) == "crisis"
+
+    agent_data["crisis_complete"] = True
+    assert WORKFLOW.resolve(agent_data) == "complete"
+
+
+def test_skip_guard_passes_over_a_stage():
+    workflow = Workflow([
+        Stage("a", done=flag("a_done"), skip=flag("skip_a")),
+        Stage("b", done=flag("b_done")),
+        Stage("end"),
+    ])
+    assert workflow.resolve({"skip_a": True}) == "b"
+    assert workflow.resolve({}) == "a"
+
+
+def test_unknown_transition_stage_is_rejected():
+    with pytest.raises(ValueError):
+        Workflow([Stage("a"), Stage("end")], [Transition([ANY], "missing", flag("x"))])
+
+
+def test_table_lists_every_stage_and_transition_once():
+    table = WORKFLOW.table()
+
+    assert [row["stage"] for row in table["stages"]] == WORKFLOW.names
+    assert table["stages"][-1]["done_when"] is None
+    assert table["transitions"] == [
+        {
+            "from": [ANY],
+            "to": "crisis",
+            "when": "crisis_preempted",
+            "resets": ["crisis_preempted", "force_crisis", "crisis_category_suggested", "crisis_complete"],
+        },
+        {
+            "from": ["scheduling", "habit", "complete"],
+            "to": "resource",
+            "when": "said(workflow:rematch)",
+            "resets": ["resource_complete", "therapists_presented", "workflow_complete"],
+        },
+    ]
+
+
+def test_resolve_logs_one_line_per_stage_change(capsys):
+    agent_data = {}
+    WORKFLOW.resolve(agent_data)
+    WORKFLOW.resolve(agent_data)
+    agent_data["intake_complete"] = True
+    WORKFLOW.resolve(agent_data)
+    agent_data["crisis_preempted"] = True
+    WORKFLOW.resolve(agent_data)
+
+    assert capsys.readouterr().out.splitlines() == [
+        "➡️  Workflow: start -> intake",
+        "➡️  Workflow: intake -> privacy",
+        "↩️  Workflow: privacy -> crisis (crisis_preempted)",
+    ]